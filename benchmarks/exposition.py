@@ -0,0 +1,53 @@
+"""
+Compares the text exposition encoder of asgi-monitor with prometheus_client.generate_latest.
+
+Usage: python benchmarks/exposition.py [label sets ...]
+"""
+
+import sys
+import timeit
+
+from prometheus_client import CollectorRegistry, generate_latest
+
+from asgi_monitor.metrics.container import MetricsContainer
+from asgi_monitor.metrics.exposition import TextExpositionEncoder
+from asgi_monitor.metrics.manager import MetricsManager
+
+LABEL_SETS_PER_ROUTE = 4  # requests, responses, requests in progress and request duration
+
+
+def build_registry(series: int) -> CollectorRegistry:
+    registry = CollectorRegistry()
+    manager = MetricsManager(app_name="benchmark", container=MetricsContainer("benchmark", registry))
+
+    for index in range(series // LABEL_SETS_PER_ROUTE):
+        path = f"/api/v1/items/{index}"
+        manager.inc_requests_count(method="GET", path=path)
+        manager.inc_responses_count(method="GET", path=path, status_code=200)
+        manager.add_request_in_progress(method="GET", path=path)
+        manager.observe_request_duration(method="GET", path=path, duration=0.042, exemplar=None)
+
+    return registry
+
+
+def bench(series: int, repeat: int = 5) -> None:
+    registry = build_registry(series)
+    encoder = TextExpositionEncoder()
+
+    assert encoder.encode(registry) == generate_latest(registry)  # noqa: S101
+
+    baseline = min(timeit.repeat(lambda: generate_latest(registry), number=1, repeat=repeat))
+    encoded = min(timeit.repeat(lambda: encoder.encode(registry), number=1, repeat=repeat))
+    lines = generate_latest(registry).count(b"\n")
+
+    print(  # noqa: T201
+        f"{series:>7} label sets, {lines:>8} lines: "
+        f"generate_latest {baseline * 1000:8.1f} ms, "
+        f"TextExpositionEncoder {encoded * 1000:8.1f} ms, "
+        f"x{baseline / encoded:.2f}",
+    )
+
+
+if __name__ == "__main__":
+    for series in map(int, sys.argv[1:] or ["10000", "100000"]):
+        bench(series)
@@ -0,0 +1,41 @@
+"""
+Compares the cost of a disabled debug() call of the structlog logger configured by configure_logging
+with the stdlib BoundLogger, which runs the processors before the record is dropped by the level of the handler.
+
+Usage: python benchmarks/log_level.py [calls]
+"""
+
+import logging
+import sys
+import timeit
+from collections.abc import Callable
+from functools import partial
+
+import structlog
+
+from asgi_monitor.logging import configure_logging
+
+
+def build_logger(wrapper_class: type | None) -> Callable[..., None]:
+    structlog.reset_defaults()
+    logging.getLogger().handlers.clear()
+    configure_logging(level=logging.INFO, json_format=True, include_trace=False)
+    if wrapper_class is not None:
+        structlog.configure(wrapper_class=wrapper_class)
+    return structlog.get_logger("benchmark").debug
+
+
+def bench(calls: int) -> None:
+    results = {
+        "stdlib logging": logging.getLogger("benchmark").debug,
+        "stdlib BoundLogger": build_logger(structlog.stdlib.BoundLogger),
+        "filtering logger": build_logger(None),
+    }
+
+    for name, debug in results.items():
+        duration = timeit.timeit(partial(debug, "hot loop %s", 42), number=calls)
+        print(f"{name:>18}: {duration / calls * 1e9:8.1f} ns per disabled debug() call")  # noqa: T201
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
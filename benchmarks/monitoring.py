@@ -0,0 +1,101 @@
+"""
+Compares the overhead of the stacked tracing and metrics middlewares with the combined monitoring middleware.
+
+Usage: python benchmarks/monitoring.py [requests]
+"""
+
+import asyncio
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from opentelemetry.sdk.trace import TracerProvider
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from asgi_monitor.integrations.starlette import (
+    MetricsConfig,
+    MonitoringConfig,
+    TracingConfig,
+    setup_metrics,
+    setup_monitoring,
+    setup_tracing,
+)
+
+
+async def index(request: Request) -> PlainTextResponse:
+    return PlainTextResponse("ok")
+
+
+def build_app(setup: Callable[[Starlette], None] | None) -> Starlette:
+    app = Starlette(routes=[Route("/items/{item_id}", endpoint=index)])
+    if setup is not None:
+        setup(app)
+    return app
+
+
+def stacked(app: Starlette) -> None:
+    setup_metrics(app, MetricsConfig(app_name="benchmark", include_metrics_endpoint=False))
+    setup_tracing(app, TracingConfig(tracer_provider=TracerProvider()))
+
+
+def combined(app: Starlette) -> None:
+    setup_monitoring(
+        app,
+        MonitoringConfig(
+            metrics=MetricsConfig(app_name="benchmark", include_metrics_endpoint=False),
+            tracing=TracingConfig(tracer_provider=TracerProvider()),
+            access_log=False,
+        ),
+    )
+
+
+async def run(app: Starlette, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/items/42",
+        "raw_path": b"/items/42",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        pass
+
+    await app(dict(scope), receive, send)  # builds the middleware stack
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+def bench(requests: int) -> None:
+    baseline = asyncio.run(run(build_app(None), requests))
+    results = {
+        "tracing + metrics": asyncio.run(run(build_app(stacked), requests)),
+        "monitoring": asyncio.run(run(build_app(combined), requests)),
+    }
+
+    print(f"{'no middleware':>18}: {baseline * 1e6:8.1f} us per request")  # noqa: T201
+    for name, duration in results.items():
+        print(  # noqa: T201
+            f"{name:>18}: {duration * 1e6:8.1f} us per request, overhead {(duration - baseline) * 1e6:8.1f} us",
+        )
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
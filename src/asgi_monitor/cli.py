@@ -1,13 +1,20 @@
 import json
 import logging
+import threading
 from pathlib import Path
 from typing import Any
 
 import click
+from structlog.processors import CallsiteParameter
 
+from asgi_monitor.logging import LogQueueConfig
 from asgi_monitor.logging.uvicorn import build_uvicorn_log_config
+from asgi_monitor.metrics.aggregator import start_metrics_aggregator
 
-__all__ = ("uvicorn_log_config",)
+__all__ = (
+    "uvicorn_log_config",
+    "metrics_aggregator",
+)
 
 
 TRACE_LOG_LEVEL = 5
@@ -20,6 +27,7 @@ LOG_LEVELS: dict[str, int] = {
     "trace": TRACE_LOG_LEVEL,
 }
 LEVEL_CHOICES = click.Choice(list(LOG_LEVELS.keys()))
+CALLSITE_PARAMETER_CHOICES = click.Choice([parameter.value for parameter in CallsiteParameter])
 
 
 def _save_json_config(path: str, log_config: dict[str, Any]) -> None:
@@ -37,22 +45,102 @@ def main() -> None:
 @click.option("--level", type=LEVEL_CHOICES, default="info", help="Logging level")
 @click.option("--json-format", is_flag=True, help="Render log as JSON")
 @click.option("--include-trace", is_flag=True, help="Include tracing information")
-def uvicorn_log_config(
+@click.option(
+    "--access-logger-name",
+    help="Logger of the access log of the monitoring middleware, replaces the Uvicorn access log",
+)
+@click.option("--queue-size", type=int, help="Write logs from a background thread through a queue of this size")
+@click.option("--queue-block", is_flag=True, help="Wait for a free place in a full queue instead of dropping the log")
+@click.option("--queue-deferred-rendering", is_flag=True, help="Render logs in the background thread of the queue")
+@click.option(
+    "--callsite-parameter",
+    "callsite_parameters",
+    type=CALLSITE_PARAMETER_CHOICES,
+    multiple=True,
+    help="Callsite parameter to add to logs, can be repeated. Default are pathname, filename, module, func_name, "
+    "thread, thread_name, process and process_name",
+)
+def uvicorn_log_config(  # noqa: PLR0913
     *,
     path: str,
     level: str,
     json_format: bool,
     include_trace: bool,
+    access_logger_name: str | None,
+    queue_size: int | None,
+    queue_block: bool,
+    queue_deferred_rendering: bool,
+    callsite_parameters: tuple[str, ...],
 ) -> None:
     """Write uvicorn config in file."""
 
     if not path.endswith(".json"):
         raise click.exceptions.BadParameter("Support only JSON format")
 
-    log_config = build_uvicorn_log_config(level=LOG_LEVELS[level], json_format=json_format, include_trace=include_trace)
+    log_config = build_uvicorn_log_config(
+        level=LOG_LEVELS[level],
+        json_format=json_format,
+        include_trace=include_trace,
+        access_logger_name=access_logger_name,
+        queue=(
+            LogQueueConfig(max_size=queue_size, block=queue_block, deferred_rendering=queue_deferred_rendering)
+            if queue_size is not None
+            else None
+        ),
+        callsite_parameters=(
+            {CallsiteParameter(parameter) for parameter in callsite_parameters} if callsite_parameters else None
+        ),
+    )
     _save_json_config(path, log_config)
 
     click.echo(f"Successfully wrote log config in {path}")
 
 
+@click.command()
+@click.option(
+    "--multiproc-dir",
+    type=click.Path(exists=True, file_okay=False),
+    envvar="PROMETHEUS_MULTIPROC_DIR",
+    required=True,
+    help="Multiprocess metrics directory. Default is PROMETHEUS_MULTIPROC_DIR",
+)
+@click.option("--host", default="0.0.0.0", help="Host to bind the port to")  # noqa: S104
+@click.option("--port", type=int, help="Port to serve metrics on")
+@click.option("--unix-socket", type=click.Path(dir_okay=False), help="Unix socket to serve metrics on")
+@click.option("--openmetrics-format", is_flag=True, help="Render metrics in OpenMetrics format")
+@click.option("--interval", type=float, default=1.0, show_default=True, help="Snapshot refresh interval, in seconds")
+def metrics_aggregator(  # noqa: PLR0913
+    *,
+    multiproc_dir: str,
+    host: str,
+    port: int | None,
+    unix_socket: str | None,
+    openmetrics_format: bool,
+    interval: float,
+) -> None:
+    """Serve merged multiprocess metrics from a standalone process."""
+
+    if (port is None) == (unix_socket is None):
+        raise click.exceptions.UsageError("Specify exactly one of --port or --unix-socket")
+
+    aggregator, server = start_metrics_aggregator(
+        multiproc_dir,
+        host=host,
+        port=port,
+        unix_socket=unix_socket,
+        openmetrics_format=openmetrics_format,
+        interval=interval,
+    )
+    click.echo(f"Serving metrics on {server.address}")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        aggregator.stop()
+
+
 main.add_command(uvicorn_log_config)
+main.add_command(metrics_aggregator)
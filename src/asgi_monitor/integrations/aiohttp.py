@@ -1,30 +1,38 @@
+import logging
 import time
 from dataclasses import dataclass, field
 from timeit import default_timer
 from typing import Any, Callable, Coroutine
 
-from aiohttp.web import Application, Request, Response, middleware
+from aiohttp.web import Application, Request, Response, StreamResponse, middleware
 from aiohttp.web_exceptions import HTTPException, HTTPInternalServerError
 from aiohttp.web_urldispatcher import MatchInfoError
 from opentelemetry import trace
-from opentelemetry.instrumentation.utils import http_status_to_status_code
 from opentelemetry.metrics import Meter, MeterProvider, get_meter_provider
 from opentelemetry.propagate import extract
 from opentelemetry.propagators.textmap import Getter
 from opentelemetry.semconv.metrics import MetricInstruments
 from opentelemetry.semconv.trace import SpanAttributes
-from opentelemetry.trace import Status, Tracer, TracerProvider
+from opentelemetry.trace import Tracer, TracerProvider
 
-from asgi_monitor.metrics import get_latest_metrics
+from asgi_monitor.logging.access import AccessLogSampler, AccessLogSummarizer
 from asgi_monitor.metrics.config import BaseMetricsConfig
 from asgi_monitor.metrics.manager import MetricsManager, build_metrics_manager
+from asgi_monitor.metrics.remote_write import start_remote_write
+from asgi_monitor.metrics.renderer import MetricsRenderer, build_metrics_renderer
+from asgi_monitor.metrics.server import start_metrics_server
+from asgi_monitor.monitoring import BaseMonitoringConfig
+from asgi_monitor.monitoring.middleware import _build_access_log_summarizer, set_span_status_code
 
 __all__ = (
     "MetricsConfig",
     "get_metrics",
+    "stream_metrics",
     "setup_metrics",
     "TracingConfig",
     "setup_tracing",
+    "MonitoringConfig",
+    "setup_monitoring",
 )
 
 
@@ -67,9 +75,7 @@ def _get_default_span_details(request: Request) -> tuple[str, dict[str, Any]]:
 
 
 def _set_status_code(span: trace.Span, status_code: int) -> None:
-    status_code = int(status_code)
-    span.set_attribute(SpanAttributes.HTTP_STATUS_CODE, status_code)
-    span.set_status(Status(http_status_to_status_code(status_code, server_span=True)))
+    set_span_status_code(span, int(status_code))
 
 
 @dataclass(slots=True, frozen=True)
@@ -85,6 +91,26 @@ class MetricsConfig(BaseMetricsConfig):
     openmetrics_format: bool = field(default=False)
     """A flag indicating whether to generate metrics in OpenMetrics format."""
 
+    render_workers: int = field(default=1)
+    """The number of threads used to render the /metrics endpoint outside the event loop."""
+
+    stream_metrics: bool = field(default=False)
+    """Stream the /metrics response one metric family at a time, so the whole exposition is never held in memory."""
+
+    metrics_host: str = field(default="0.0.0.0")  # noqa: S104
+    """The host of the dedicated metrics server."""
+
+    metrics_port: int | None = field(default=None)
+    """
+    Serve the metrics on this port from a daemon thread instead of the /metrics route of the application,
+    so scrapes bypass the middlewares and keep working when the event loop is blocked.
+    Every worker binds the port, so with several workers the second one fails with EADDRINUSE,
+    use the metrics aggregator or a unix socket per worker instead.
+    """
+
+    metrics_unix_socket: str | None = field(default=None)
+    """Serve the metrics on this unix socket from a daemon thread instead of the /metrics route of the application."""
+
 
 @dataclass(slots=True, frozen=True)
 class TracingConfig:
@@ -103,6 +129,17 @@ class TracingConfig:
     """Optional tracer provider to use."""
 
 
+@dataclass(slots=True, frozen=True)
+class MonitoringConfig(BaseMonitoringConfig):
+    """Configuration class for the combined monitoring middleware."""
+
+    metrics: MetricsConfig | None = field(default=None)
+    """Configuration for the metrics, the metrics are disabled if it is not specified."""
+
+    tracing: TracingConfig | None = field(default=None)
+    """Configuration for the tracing, the tracing is disabled if it is not specified."""
+
+
 def build_metrics_middleware(
     metrics_manager: MetricsManager,
     *,
@@ -215,10 +252,198 @@ def build_tracing_middleware(config: TracingConfig) -> Callable[..., Coroutine]:
     return tracing_middleware
 
 
+def _get_route(request: Request) -> tuple[str, bool]:
+    match_info = request.match_info
+    if isinstance(match_info, MatchInfoError):
+        return request.path, False
+    if match_info.route and match_info.route.resource:
+        return match_info.route.resource.canonical, True
+    return request.url.path, True
+
+
+class _MonitoringMiddleware:
+    __slots__ = (
+        "_metrics",
+        "_include_exemplar",
+        "_tracer",
+        "_tracing",
+        "_access_logger",
+        "_access_log_sampler",
+        "_access_log_summarizer",
+        "_getter",
+    )
+
+    def __init__(
+        self,
+        config: MonitoringConfig,
+        metrics: MetricsManager | None,
+        access_log_summarizer: AccessLogSummarizer | None,
+    ) -> None:
+        self._metrics = metrics
+        self._include_exemplar = config.metrics is not None and config.metrics.include_trace_exemplar
+        self._tracing = config.tracing
+        self._tracer = _get_tracer(config.tracing.tracer_provider) if config.tracing is not None else None
+        self._access_logger = logging.getLogger(config.access_logger_name) if config.access_log else None
+        self._access_log_sampler = None
+        if config.access_log_sampling is not None:
+            self._access_log_sampler = AccessLogSampler(config.access_log_sampling)
+        self._access_log_summarizer = access_log_summarizer
+        self._getter = AiohttpGetter()
+
+    async def __call__(self, request: Request, handler: Callable) -> Any:
+        route, is_handled_route = _get_route(request)
+
+        if self._tracer is None or self._tracing is None:
+            return await self._call(request, handler, route, is_handled_route=is_handled_route, span=None)
+
+        span_name, attributes = self._tracing.scope_span_details_extractor(request)
+        with self._tracer.start_as_current_span(
+            span_name,
+            context=extract(request, getter=self._getter),
+            kind=trace.SpanKind.SERVER,
+            attributes=attributes,
+        ) as span:
+            request.span = span
+            return await self._call(request, handler, route, is_handled_route=is_handled_route, span=span)
+
+    async def _call(
+        self,
+        request: Request,
+        handler: Callable,
+        route: str,
+        *,
+        is_handled_route: bool,
+        span: trace.Span | None,
+    ) -> Any:
+        metrics = self._metrics if is_handled_route else None
+        status_code = HTTPInternalServerError.status_code
+        response_size = 0
+        exception_type: str | None = None
+
+        if metrics is not None:
+            metrics.inc_requests_count(method=request.method, path=route)
+            metrics.add_request_in_progress(method=request.method, path=route)
+
+        start = time.perf_counter()
+        try:
+            response = await handler(request)
+        except Exception as exc:
+            if isinstance(exc, HTTPException):
+                status_code = exc.status_code
+            exception_type = type(exc).__name__
+            raise
+        else:
+            status_code = response.status
+            # The streamed responses are already written, the others are written after the middlewares
+            response_size = response.body_length if response.prepared else response.content_length or 0
+            return response
+        finally:
+            duration = time.perf_counter() - start
+
+            if span is not None:
+                _set_status_code(span, status_code)
+            if metrics is not None:
+                self._observe(metrics, request.method, route, status_code, duration, exception_type, span)
+            if self._access_logger is not None:
+                self._log_access(request, route, status_code, duration, response_size, span)
+
+    def _observe(  # noqa: PLR0913
+        self,
+        metrics: MetricsManager,
+        method: str,
+        route: str,
+        status_code: int,
+        duration: float,
+        exception_type: str | None,
+        span: trace.Span | None,
+    ) -> None:
+        if exception_type is not None:
+            metrics.inc_requests_exceptions_count(method=method, path=route, exception_type=exception_type)
+        else:
+            exemplar: dict[str, str] | None = None
+            if self._include_exemplar and span is not None:
+                exemplar = {"TraceID": trace.format_trace_id(span.get_span_context().trace_id)}
+
+            metrics.observe_request_duration(method=method, path=route, duration=duration, exemplar=exemplar)
+
+        metrics.inc_responses_count(method=method, path=route, status_code=status_code)
+        metrics.remove_request_in_progress(method=method, path=route)
+
+    def _log_access(  # noqa: PLR0913
+        self,
+        request: Request,
+        route: str,
+        status_code: int,
+        duration: float,
+        response_size: int,
+        span: trace.Span | None,
+    ) -> None:
+        if self._access_log_summarizer is not None:
+            self._access_log_summarizer.record(request.method, route, status_code, int(duration * 1e9), response_size)
+            return
+
+        logger = self._access_logger
+        if logger is None or not logger.isEnabledFor(logging.INFO):
+            return
+
+        sample_rate: float | None = None
+        if self._access_log_sampler is not None:
+            sample_rate = self._access_log_sampler.sample(status_code, int(duration * 1e9))
+            if sample_rate is None:
+                return
+
+        client_addr = request.remote or "-"
+        http_version = f"{request.version.major}.{request.version.minor}"
+        extra = {
+            "client_addr": client_addr,
+            "method": request.method,
+            "path": request.path,
+            "route": route,
+            "http_version": http_version,
+            "status_code": status_code,
+            "duration": round(duration * 1000, 3),
+            "response_size": response_size,
+        }
+        if sample_rate is not None:
+            extra["sample_rate"] = sample_rate
+        if span is not None:
+            span_context = span.get_span_context()
+            extra["trace_id"] = trace.format_trace_id(span_context.trace_id)
+            extra["span_id"] = trace.format_span_id(span_context.span_id)
+
+        logger.info(
+            '%s - "%s %s HTTP/%s" %d',
+            client_addr,
+            request.method,
+            request.path,
+            http_version,
+            status_code,
+            extra=extra,
+        )
+
+
+def build_monitoring_middleware(
+    config: MonitoringConfig,
+    metrics: MetricsManager | None,
+    access_log_summarizer: AccessLogSummarizer | None = None,
+) -> Callable[..., Coroutine]:
+    monitoring = _MonitoringMiddleware(config, metrics, access_log_summarizer)
+
+    @middleware
+    async def monitoring_middleware(request: Request, handler: Callable) -> Any:
+        return await monitoring(request, handler)
+
+    return monitoring_middleware
+
+
 async def get_metrics(request: Request) -> Response:
-    registry = request.app.metrics_registry  # type: ignore[attr-defined]
-    openmetrics_format = request.app.openmetrics_format  # type: ignore[attr-defined]
-    response = get_latest_metrics(registry, openmetrics_format=openmetrics_format)
+    renderer: MetricsRenderer = request.app.metrics_renderer  # type: ignore[attr-defined]
+    response = await renderer.render(
+        accept_encoding=request.headers.get("Accept-Encoding"),
+        names=request.query.getall("name[]", []),
+        if_none_match=request.headers.get("If-None-Match"),
+        accept=request.headers.get("Accept"),
+    )
     return Response(
         body=response.payload,
         status=response.status_code,
@@ -226,6 +451,48 @@ async def get_metrics(request: Request) -> Response:
     )
 
 
+async def stream_metrics(request: Request) -> StreamResponse:
+    renderer: MetricsRenderer = request.app.metrics_renderer  # type: ignore[attr-defined]
+    response = renderer.stream(
+        accept_encoding=request.headers.get("Accept-Encoding"),
+        names=request.query.getall("name[]", []),
+        accept=request.headers.get("Accept"),
+    )
+
+    stream = StreamResponse(status=response.status_code, headers=response.headers)
+    await stream.prepare(request)
+    async for chunk in response.chunks:
+        await stream.write(chunk)
+    await stream.write_eof()
+    return stream
+
+
+async def _shutdown_remote_write(app: Application) -> None:
+    # The final push runs in a thread, so it does not block the event loop
+    await app.remote_write_exporter.shutdown()  # type: ignore[attr-defined]
+
+
+async def _close_metrics_renderer(app: Application) -> None:
+    app.metrics_renderer.close()  # type: ignore[attr-defined]
+
+
+async def _stop_metrics_server(app: Application) -> None:
+    app.metrics_server.stop()  # type: ignore[attr-defined]
+
+
+async def _close_metrics(app: Application) -> None:
+    app.metrics_manager.close()  # type: ignore[attr-defined]
+
+
+async def _close_access_log_summarizer(app: Application) -> None:
+    app.access_log_summarizer.close()  # type: ignore[attr-defined]
+
+
+def _close_metrics_on_cleanup(app: Application, metrics: MetricsManager) -> None:
+    app.metrics_manager = metrics
+    app.on_cleanup.append(_close_metrics)  # type: ignore[arg-type]
+
+
 def setup_metrics(app: Application, config: MetricsConfig) -> None:
     """
     Set up metrics for an Aiohttp application.
@@ -238,16 +505,68 @@ def setup_metrics(app: Application, config: MetricsConfig) -> None:
 
     metrics = build_metrics_manager(config)
     metrics.add_app_info()
+    _close_metrics_on_cleanup(app, metrics)
 
     metrics_middleware = build_metrics_middleware(
         metrics_manager=metrics, include_trace_exemplar=config.include_trace_exemplar
     )
     app.middlewares.append(metrics_middleware)
+    _setup_metrics_endpoints(app, config)
+
 
+def _setup_metrics_endpoints(app: Application, config: MetricsConfig) -> None:
     if config.include_metrics_endpoint:
-        app.metrics_registry = config.registry
-        app.openmetrics_format = config.openmetrics_format
-        app.router.add_get(path="/metrics", handler=get_metrics)
+        renderer = build_metrics_renderer(
+            config.registry,
+            metrics_prefix=config.metrics_prefix,
+            openmetrics_format=config.openmetrics_format,
+            max_workers=config.render_workers,
+        )
+        app.metrics_renderer = renderer
+        app.on_cleanup.append(_close_metrics_renderer)  # type: ignore[arg-type]
+        if config.metrics_port is None and config.metrics_unix_socket is None:
+            app.router.add_get(path="/metrics", handler=stream_metrics if config.stream_metrics else get_metrics)
+
+        else:
+            app.metrics_server = start_metrics_server(
+                renderer.render_sync,
+                host=config.metrics_host,
+                port=config.metrics_port,
+                unix_socket=config.metrics_unix_socket,
+            )
+            app.on_cleanup.append(_stop_metrics_server)  # type: ignore[arg-type]
+
+    if config.remote_write is not None:
+        app.remote_write_exporter = start_remote_write(config.registry, config.remote_write)
+        app.on_cleanup.append(_shutdown_remote_write)  # type: ignore[arg-type]
+
+
+def setup_monitoring(app: Application, config: MonitoringConfig) -> None:
+    """
+    Set up tracing, metrics and the access log for an Aiohttp application with one middleware,
+    which resolves the route and reads the clock once for all of them, instead of the tracing and metrics middlewares.
+
+    :param Aiohttp app: The Aiohttp application instance.
+    :param MonitoringConfig config: Configuration for the monitoring.
+    :returns: None
+    """
+
+    metrics: MetricsManager | None = None
+    if config.metrics is not None:
+        metrics = build_metrics_manager(config.metrics)
+        metrics.add_app_info()
+        _close_metrics_on_cleanup(app, metrics)
+
+    access_log_summarizer = _build_access_log_summarizer(config)
+    if access_log_summarizer is not None:
+        # The summaries of the last interval are logged on the cleanup
+        app.access_log_summarizer = access_log_summarizer
+        app.on_cleanup.append(_close_access_log_summarizer)  # type: ignore[arg-type]
+
+    app.middlewares.append(build_monitoring_middleware(config, metrics, access_log_summarizer))
+
+    if config.metrics is not None:
+        _setup_metrics_endpoints(app, config.metrics)
 
 
 def setup_tracing(app: Application, config: TracingConfig) -> None:
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, Callable
 
-from asgi_monitor.metrics.manager import build_metrics_manager
+from asgi_monitor.metrics.manager import MetricsManager, build_metrics_manager
 
 if TYPE_CHECKING:
     from fastapi import FastAPI
@@ -12,9 +13,12 @@ from asgi_monitor.integrations.starlette import (
     MetricsMiddleware,
     TracingMiddleware,
     _get_default_span_details,
-    get_metrics,
+    _get_route,
+    _setup_metrics_endpoints,
 )
 from asgi_monitor.metrics.config import BaseMetricsConfig
+from asgi_monitor.monitoring import BaseMonitoringConfig, MonitoringMiddleware
+from asgi_monitor.monitoring.middleware import _build_access_log_summarizer
 from asgi_monitor.tracing import BaseTracingConfig
 
 __all__ = (
@@ -24,6 +28,8 @@ __all__ = (
     "MetricsConfig",
     "MetricsMiddleware",
     "setup_metrics",
+    "MonitoringConfig",
+    "setup_monitoring",
 )
 
 
@@ -40,6 +46,26 @@ class MetricsConfig(BaseMetricsConfig):
     openmetrics_format: bool = field(default=False)
     """A flag indicating whether to generate metrics in OpenMetrics format."""
 
+    render_workers: int = field(default=1)
+    """The number of threads used to render the /metrics endpoint outside the event loop."""
+
+    stream_metrics: bool = field(default=False)
+    """Stream the /metrics response one metric family at a time, so the whole exposition is never held in memory."""
+
+    metrics_host: str = field(default="0.0.0.0")  # noqa: S104
+    """The host of the dedicated metrics server."""
+
+    metrics_port: int | None = field(default=None)
+    """
+    Serve the metrics on this port from a daemon thread instead of the /metrics route of the application,
+    so scrapes bypass the middlewares and keep working when the event loop is blocked.
+    Every worker binds the port, so with several workers the second one fails with EADDRINUSE,
+    use the metrics aggregator or a unix socket per worker instead.
+    """
+
+    metrics_unix_socket: str | None = field(default=None)
+    """Serve the metrics on this unix socket from a daemon thread instead of the /metrics route of the application."""
+
 
 @dataclass(slots=True, frozen=True)
 class TracingConfig(BaseTracingConfig):
@@ -62,6 +88,17 @@ class TracingConfig(BaseTracingConfig):
     """
 
 
+@dataclass(slots=True, frozen=True)
+class MonitoringConfig(BaseMonitoringConfig):
+    """Configuration class for the combined monitoring middleware."""
+
+    metrics: MetricsConfig | None = field(default=None)
+    """Configuration for the metrics, the metrics are disabled if it is not specified."""
+
+    tracing: TracingConfig | None = field(default=None)
+    """Configuration for the tracing, the tracing is disabled if it is not specified."""
+
+
 def setup_tracing(app: FastAPI, config: TracingConfig) -> None:
     """
     Set up tracing for a FastAPI application.
@@ -87,19 +124,52 @@ def setup_metrics(app: FastAPI, config: MetricsConfig) -> None:
 
     metrics = build_metrics_manager(config)
     metrics.add_app_info()
+    app.add_event_handler("shutdown", metrics.close)
 
     app.add_middleware(
         MetricsMiddleware,
         metrics=metrics,
         include_trace_exemplar=config.include_trace_exemplar,
     )
-    if config.include_metrics_endpoint:
-        app.state.metrics_registry = config.registry
-        app.state.openmetrics_format = config.openmetrics_format
-        app.add_route(
-            path="/metrics",
-            route=get_metrics,
-            methods=["GET"],
-            name="Get Prometheus metrics",
-            include_in_schema=True,
-        )
+    _setup_metrics_endpoints(app, config)
+
+
+def setup_monitoring(app: FastAPI, config: MonitoringConfig) -> None:
+    """
+    Set up tracing, metrics and the access log for a FastAPI application with one middleware.
+    The MonitoringMiddleware resolves the route, reads the clock and wraps send once for all of them,
+    instead of stacking the TracingMiddleware and the MetricsMiddleware.
+
+    :param FastAPI app: The FastAPI application instance.
+    :param MonitoringConfig config: Configuration for the monitoring.
+    :returns: None
+    """
+
+    metrics: MetricsManager | None = None
+    if config.metrics is not None:
+        metrics = build_metrics_manager(config.metrics)
+        metrics.add_app_info()
+        app.add_event_handler("shutdown", metrics.close)
+
+    access_log_summarizer = _build_access_log_summarizer(config)
+    if access_log_summarizer is not None:
+        # The summaries of the last interval are logged on the shutdown
+        app.add_event_handler("shutdown", access_log_summarizer.close)
+
+    span_details_extractor = None
+    if config.tracing is not None and config.tracing.scope_span_details_extractor is not _get_default_span_details:
+        span_details_extractor = config.tracing.scope_span_details_extractor
+
+    app.add_middleware(
+        MonitoringMiddleware,
+        route_resolver=_get_route,
+        metrics=metrics,
+        include_trace_exemplar=config.metrics is not None and config.metrics.include_trace_exemplar,
+        tracing=config.tracing,
+        span_details_extractor=span_details_extractor,
+        access_logger=logging.getLogger(config.access_logger_name) if config.access_log else None,
+        access_log_sampling=config.access_log_sampling,
+        access_log_summarizer=access_log_summarizer,
+    )
+    if config.metrics is not None:
+        _setup_metrics_endpoints(app, config.metrics)
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+import logging
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import wraps
 from typing import TYPE_CHECKING, Any, Callable
 
 from litestar import Request, Response, get
 from litestar.enums import ScopeType
 from litestar.middleware.base import AbstractMiddleware, DefineMiddleware
+from litestar.response import Stream
 from litestar.status_codes import HTTP_500_INTERNAL_SERVER_ERROR
 from opentelemetry import trace
 from opentelemetry.semconv.trace import SpanAttributes
@@ -17,9 +19,13 @@ if TYPE_CHECKING:
     from litestar.types import ASGIApp, Message, Receive, Scope, Send
     from prometheus_client import CollectorRegistry
 
-from asgi_monitor.metrics import get_latest_metrics
 from asgi_monitor.metrics.config import BaseMetricsConfig
 from asgi_monitor.metrics.manager import MetricsManager, build_metrics_manager
+from asgi_monitor.metrics.remote_write import RemoteWriteConfig, start_remote_write
+from asgi_monitor.metrics.renderer import MetricsRenderer, build_metrics_renderer
+from asgi_monitor.metrics.server import start_metrics_server
+from asgi_monitor.monitoring import BaseMonitoringConfig, MonitoringMiddleware
+from asgi_monitor.monitoring.middleware import _build_access_log_summarizer
 from asgi_monitor.tracing.config import BaseTracingConfig
 from asgi_monitor.tracing.middleware import build_open_telemetry_middleware
 
@@ -29,6 +35,10 @@ __all__ = (
     "MetricsConfig",
     "build_metrics_middleware",
     "add_metrics_endpoint",
+    "add_remote_write",
+    "MonitoringConfig",
+    "build_monitoring_middleware",
+    "add_monitoring_shutdown",
 )
 
 
@@ -67,6 +77,21 @@ class MetricsConfig(BaseMetricsConfig):
     """The prefix to use for the metrics."""
 
 
+@dataclass(slots=True, frozen=True)
+class MonitoringConfig(BaseMonitoringConfig):
+    """Configuration class for the combined monitoring middleware."""
+
+    metrics: MetricsConfig | None = field(default=None)
+    """Configuration for the metrics, the metrics are disabled if it is not specified."""
+
+    tracing: TracingConfig | None = field(default=None)
+    """Configuration for the tracing, the tracing is disabled if it is not specified."""
+
+
+def _get_route(scope: Scope) -> tuple[str, bool]:
+    return scope.get("path_template") or scope["path"], True
+
+
 class TracingMiddleware(AbstractMiddleware):
     __slots__ = ("app", "open_telemetry_middleware")
 
@@ -154,9 +179,13 @@ class MetricsMiddleware(AbstractMiddleware):
 
 @get(path="/metrics", summary="Get Prometheus metrics", include_in_schema=True)
 async def get_metrics(request: Request) -> Response:
-    registry = request.app.state.metrics_registry
-    openmetrics_format = request.app.state.openmetrics_format
-    response = get_latest_metrics(registry, openmetrics_format=openmetrics_format)
+    renderer: MetricsRenderer = request.app.state.metrics_renderer
+    response = await renderer.render(
+        accept_encoding=request.headers.get("Accept-Encoding"),
+        names=request.query_params.getall("name[]", []),
+        if_none_match=request.headers.get("If-None-Match"),
+        accept=request.headers.get("Accept"),
+    )
     return Response(
         content=response.payload,
         status_code=response.status_code,
@@ -164,6 +193,21 @@ async def get_metrics(request: Request) -> Response:
     )
 
 
+@get(path="/metrics", summary="Get Prometheus metrics", include_in_schema=True)
+async def stream_metrics(request: Request) -> Stream:
+    renderer: MetricsRenderer = request.app.state.metrics_renderer
+    response = renderer.stream(
+        accept_encoding=request.headers.get("Accept-Encoding"),
+        names=request.query_params.getall("name[]", []),
+        accept=request.headers.get("Accept"),
+    )
+    return Stream(
+        content=response.chunks,
+        status_code=response.status_code,
+        headers=response.headers,
+    )
+
+
 def build_tracing_middleware(config: TracingConfig) -> DefineMiddleware:
     """
     Build TracingMiddleware for a Litestar application.
@@ -197,16 +241,116 @@ def build_metrics_middleware(config: MetricsConfig) -> DefineMiddleware:
     )
 
 
-def add_metrics_endpoint(app: Litestar, registry: CollectorRegistry, *, openmetrics_format: bool = False) -> None:
+def build_monitoring_middleware(config: MonitoringConfig) -> DefineMiddleware:
+    """
+    Build MonitoringMiddleware for a Litestar application.
+    It does the tracing, the metrics and the access log with one route resolution, one timer and one send wrapper,
+    instead of the TracingMiddleware and the MetricsMiddleware. Use add_metrics_endpoint to expose the metrics
+    and add_monitoring_shutdown to close the middleware on the shutdown of the application.
+
+    :param MonitoringConfig config: Configuration for the monitoring.
+    :returns: DefineMiddleware
     """
-    Add CollectorRegistry in state and register /metrics endpoint.
+
+    metrics: MetricsManager | None = None
+    if config.metrics is not None:
+        metrics = build_metrics_manager(config.metrics)
+        metrics.add_app_info()
+
+    span_details_extractor = None
+    if config.tracing is not None and config.tracing.scope_span_details_extractor is not _get_default_span_details:
+        span_details_extractor = config.tracing.scope_span_details_extractor
+
+    return DefineMiddleware(
+        MonitoringMiddleware,
+        route_resolver=_get_route,
+        metrics=metrics,
+        include_trace_exemplar=config.metrics is not None and config.metrics.include_trace_exemplar,
+        tracing=config.tracing,
+        span_details_extractor=span_details_extractor,
+        access_logger=logging.getLogger(config.access_logger_name) if config.access_log else None,
+        access_log_sampling=config.access_log_sampling,
+        access_log_summarizer=_build_access_log_summarizer(config),
+    )
+
+
+def add_monitoring_shutdown(app: Litestar, middleware: DefineMiddleware) -> None:
+    """
+    Close the metrics and the access log summarizer of the monitoring middleware on the shutdown of the application,
+    so the last StatsD datagram and the summaries of the last interval are not lost.
+
+    :param Litestar app: The Litestar application instance.
+    :param DefineMiddleware middleware: The middleware built by build_monitoring_middleware.
+    :returns: None
+    """
+
+    for name in ("metrics", "access_log_summarizer"):
+        resource = middleware.kwargs.get(name)
+        if resource is not None:
+            app.on_shutdown.append(resource.close)
+
+
+def add_metrics_endpoint(  # noqa: PLR0913
+    app: Litestar,
+    registry: CollectorRegistry,
+    *,
+    openmetrics_format: bool = False,
+    metrics_prefix: str = "litestar",
+    render_workers: int = 1,
+    stream_metrics_endpoint: bool = False,
+    metrics_host: str = "0.0.0.0",  # noqa: S104
+    metrics_port: int | None = None,
+    metrics_unix_socket: str | None = None,
+) -> None:
+    """
+    Add metrics renderer in state and register /metrics endpoint.
+    If metrics_port or metrics_unix_socket is specified, the metrics are served from a daemon thread instead,
+    so scrapes bypass the middlewares and keep working when the event loop is blocked.
 
     :param Litestar app: The Litestar application instance.
     :param CollectorRegistry registry: The registry for the metrics.
     :param bool openmetrics_format: A flag indicating whether to generate metrics in OpenMetrics format.
+    :param str metrics_prefix: The prefix to use for the metrics of the endpoint itself.
+    :param int render_workers: The number of threads used to render the /metrics endpoint outside the event loop.
+    :param bool stream_metrics_endpoint: Stream the /metrics response one metric family at a time.
+    :param str metrics_host: The host of the dedicated metrics server.
+    :param int | None metrics_port: The port of the dedicated metrics server, every worker binds it,
+        so with several workers use the metrics aggregator or a unix socket per worker instead.
+    :param str | None metrics_unix_socket: The unix socket of the dedicated metrics server.
+    :returns: None
+    """
+
+    renderer = build_metrics_renderer(
+        registry,
+        metrics_prefix=metrics_prefix,
+        openmetrics_format=openmetrics_format,
+        max_workers=render_workers,
+    )
+    app.on_shutdown.append(renderer.close)
+    if metrics_port is None and metrics_unix_socket is None:
+        app.state.metrics_renderer = renderer
+        app.register(stream_metrics if stream_metrics_endpoint else get_metrics)
+    else:
+        server = start_metrics_server(
+            renderer.render_sync,
+            host=metrics_host,
+            port=metrics_port,
+            unix_socket=metrics_unix_socket,
+        )
+        app.state.metrics_server = server
+        app.on_shutdown.append(server.stop)
+
+
+def add_remote_write(app: Litestar, registry: CollectorRegistry, config: RemoteWriteConfig) -> None:
+    """
+    Start pushing the registry to a Prometheus remote-write endpoint, and push the final state on the shutdown.
+
+    :param Litestar app: The Litestar application instance.
+    :param CollectorRegistry registry: The registry for the metrics.
+    :param RemoteWriteConfig config: Configuration of the remote-write exporter.
     :returns: None
     """
 
-    app.state.metrics_registry = registry
-    app.state.openmetrics_format = openmetrics_format
-    app.register(get_metrics)
+    exporter = start_remote_write(registry, config)
+    app.state.remote_write_exporter = exporter
+    app.on_shutdown.append(exporter.shutdown)
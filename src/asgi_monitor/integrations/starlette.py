@@ -1,24 +1,32 @@
 from __future__ import annotations
 
+import logging
 import time
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Callable
+from typing import TYPE_CHECKING, Any, Callable, Protocol
 
 from opentelemetry import trace
 from opentelemetry.semconv.trace import SpanAttributes
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 from starlette.routing import Match
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
 
 if TYPE_CHECKING:
+    from prometheus_client import CollectorRegistry
     from starlette.applications import Starlette
     from starlette.requests import Request
     from starlette.types import ASGIApp, Receive, Scope, Send
 
-from asgi_monitor.metrics import get_latest_metrics
+    from asgi_monitor.metrics.remote_write import RemoteWriteConfig
+
 from asgi_monitor.metrics.config import BaseMetricsConfig
 from asgi_monitor.metrics.manager import MetricsManager, build_metrics_manager
+from asgi_monitor.metrics.remote_write import start_remote_write
+from asgi_monitor.metrics.renderer import MetricsRenderer, build_metrics_renderer
+from asgi_monitor.metrics.server import start_metrics_server
+from asgi_monitor.monitoring import BaseMonitoringConfig, MonitoringMiddleware
+from asgi_monitor.monitoring.middleware import _build_access_log_summarizer
 from asgi_monitor.tracing.config import BaseTracingConfig
 from asgi_monitor.tracing.middleware import build_open_telemetry_middleware
 
@@ -29,6 +37,8 @@ __all__ = (
     "MetricsConfig",
     "MetricsMiddleware",
     "setup_metrics",
+    "MonitoringConfig",
+    "setup_monitoring",
 )
 
 
@@ -67,6 +77,14 @@ def _get_path(request: Request) -> tuple[str, bool]:
     return request.url.path, False
 
 
+def _get_route(scope: Scope) -> tuple[str, bool]:
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path, True
+    return scope["path"], False
+
+
 @dataclass(slots=True, frozen=True)
 class TracingConfig(BaseTracingConfig):
     """
@@ -101,6 +119,37 @@ class MetricsConfig(BaseMetricsConfig):
     openmetrics_format: bool = field(default=False)
     """A flag indicating whether to generate metrics in OpenMetrics format."""
 
+    render_workers: int = field(default=1)
+    """The number of threads used to render the /metrics endpoint outside the event loop."""
+
+    stream_metrics: bool = field(default=False)
+    """Stream the /metrics response one metric family at a time, so the whole exposition is never held in memory."""
+
+    metrics_host: str = field(default="0.0.0.0")  # noqa: S104
+    """The host of the dedicated metrics server."""
+
+    metrics_port: int | None = field(default=None)
+    """
+    Serve the metrics on this port from a daemon thread instead of the /metrics route of the application,
+    so scrapes bypass the middlewares and keep working when the event loop is blocked.
+    Every worker binds the port, so with several workers the second one fails with EADDRINUSE,
+    use the metrics aggregator or a unix socket per worker instead.
+    """
+
+    metrics_unix_socket: str | None = field(default=None)
+    """Serve the metrics on this unix socket from a daemon thread instead of the /metrics route of the application."""
+
+
+@dataclass(slots=True, frozen=True)
+class MonitoringConfig(BaseMonitoringConfig):
+    """Configuration class for the combined monitoring middleware."""
+
+    metrics: MetricsConfig | None = field(default=None)
+    """Configuration for the metrics, the metrics are disabled if it is not specified."""
+
+    tracing: TracingConfig | None = field(default=None)
+    """Configuration for the tracing, the tracing is disabled if it is not specified."""
+
 
 class TracingMiddleware:
     __slots__ = ("app", "open_telemetry_middleware")
@@ -181,9 +230,13 @@ class MetricsMiddleware(BaseHTTPMiddleware):
 
 
 async def get_metrics(request: Request) -> Response:
-    registry = request.app.state.metrics_registry
-    openmetrics_format = request.app.state.openmetrics_format
-    response = get_latest_metrics(registry, openmetrics_format=openmetrics_format)
+    renderer: MetricsRenderer = request.app.state.metrics_renderer
+    response = await renderer.render(
+        accept_encoding=request.headers.get("Accept-Encoding"),
+        names=request.query_params.getlist("name[]"),
+        if_none_match=request.headers.get("If-None-Match"),
+        accept=request.headers.get("Accept"),
+    )
     return Response(
         content=response.payload,
         status_code=response.status_code,
@@ -191,6 +244,20 @@ async def get_metrics(request: Request) -> Response:
     )
 
 
+async def stream_metrics(request: Request) -> Response:
+    renderer: MetricsRenderer = request.app.state.metrics_renderer
+    response = renderer.stream(
+        accept_encoding=request.headers.get("Accept-Encoding"),
+        names=request.query_params.getlist("name[]"),
+        accept=request.headers.get("Accept"),
+    )
+    return StreamingResponse(
+        content=response.chunks,
+        status_code=response.status_code,
+        headers=response.headers,
+    )
+
+
 def setup_tracing(app: Starlette, config: TracingConfig) -> None:
     """
     Set up tracing for a Starlette application.
@@ -216,19 +283,119 @@ def setup_metrics(app: Starlette, config: MetricsConfig) -> None:
 
     metrics = build_metrics_manager(config)
     metrics.add_app_info()
+    app.add_event_handler("shutdown", metrics.close)
 
     app.add_middleware(
         MetricsMiddleware,
         metrics=metrics,
         include_trace_exemplar=config.include_trace_exemplar,
     )
+    _setup_metrics_endpoints(app, config)
+
+
+def setup_monitoring(app: Starlette, config: MonitoringConfig) -> None:
+    """
+    Set up tracing, metrics and the access log for a Starlette application with one middleware.
+    The MonitoringMiddleware resolves the route, reads the clock and wraps send once for all of them,
+    instead of stacking the TracingMiddleware and the MetricsMiddleware.
+
+    :param Starlette app: The Starlette application instance.
+    :param MonitoringConfig config: Configuration for the monitoring.
+    :returns: None
+    """
+
+    metrics: MetricsManager | None = None
+    if config.metrics is not None:
+        metrics = build_metrics_manager(config.metrics)
+        metrics.add_app_info()
+        app.add_event_handler("shutdown", metrics.close)
+
+    access_log_summarizer = _build_access_log_summarizer(config)
+    if access_log_summarizer is not None:
+        # The summaries of the last interval are logged on the shutdown
+        app.add_event_handler("shutdown", access_log_summarizer.close)
+
+    span_details_extractor = None
+    if config.tracing is not None and config.tracing.scope_span_details_extractor is not _get_default_span_details:
+        span_details_extractor = config.tracing.scope_span_details_extractor
+
+    app.add_middleware(
+        MonitoringMiddleware,
+        route_resolver=_get_route,
+        metrics=metrics,
+        include_trace_exemplar=config.metrics is not None and config.metrics.include_trace_exemplar,
+        tracing=config.tracing,
+        span_details_extractor=span_details_extractor,
+        access_logger=logging.getLogger(config.access_logger_name) if config.access_log else None,
+        access_log_sampling=config.access_log_sampling,
+        access_log_summarizer=access_log_summarizer,
+    )
+    if config.metrics is not None:
+        _setup_metrics_endpoints(app, config.metrics)
+
+
+class _MetricsEndpointsConfig(Protocol):
+    # The fields of the MetricsConfig of Starlette and FastAPI, which are used by _setup_metrics_endpoints
+    @property
+    def registry(self) -> CollectorRegistry: ...
+
+    @property
+    def metrics_prefix(self) -> str: ...
+
+    @property
+    def include_metrics_endpoint(self) -> bool: ...
+
+    @property
+    def openmetrics_format(self) -> bool: ...
+
+    @property
+    def render_workers(self) -> int: ...
+
+    @property
+    def stream_metrics(self) -> bool: ...
+
+    @property
+    def metrics_host(self) -> str: ...
+
+    @property
+    def metrics_port(self) -> int | None: ...
+
+    @property
+    def metrics_unix_socket(self) -> str | None: ...
+
+    @property
+    def remote_write(self) -> RemoteWriteConfig | None: ...
+
+
+def _setup_metrics_endpoints(app: Starlette, config: _MetricsEndpointsConfig) -> None:
     if config.include_metrics_endpoint:
-        app.state.metrics_registry = config.registry
-        app.state.openmetrics_format = config.openmetrics_format
-        app.add_route(
-            path="/metrics",
-            route=get_metrics,
-            methods=["GET"],
-            name="Get Prometheus metrics",
-            include_in_schema=True,
+        renderer = build_metrics_renderer(
+            config.registry,
+            metrics_prefix=config.metrics_prefix,
+            openmetrics_format=config.openmetrics_format,
+            max_workers=config.render_workers,
         )
+        app.add_event_handler("shutdown", renderer.close)
+        if config.metrics_port is None and config.metrics_unix_socket is None:
+            app.state.metrics_renderer = renderer
+            app.add_route(
+                path="/metrics",
+                route=stream_metrics if config.stream_metrics else get_metrics,
+                methods=["GET"],
+                name="Get Prometheus metrics",
+                include_in_schema=True,
+            )
+        else:
+            server = start_metrics_server(
+                renderer.render_sync,
+                host=config.metrics_host,
+                port=config.metrics_port,
+                unix_socket=config.metrics_unix_socket,
+            )
+            app.state.metrics_server = server
+            app.add_event_handler("shutdown", server.stop)
+
+    if config.remote_write is not None:
+        exporter = start_remote_write(config.registry, config.remote_write)
+        app.state.remote_write_exporter = exporter
+        app.add_event_handler("shutdown", exporter.shutdown)
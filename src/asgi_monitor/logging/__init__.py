@@ -1,3 +1,14 @@
+from .access import AccessLogSamplingConfig, AccessLogSummaryConfig
+from .callsite import DEFAULT_CALLSITE_PARAMETERS, PRODUCTION_CALLSITE_PARAMETERS
 from .configure import configure_logging
+from .queue import LogQueueConfig, get_dropped_records
 
-__all__ = ("configure_logging",)
+__all__ = (
+    "AccessLogSamplingConfig",
+    "AccessLogSummaryConfig",
+    "DEFAULT_CALLSITE_PARAMETERS",
+    "LogQueueConfig",
+    "PRODUCTION_CALLSITE_PARAMETERS",
+    "configure_logging",
+    "get_dropped_records",
+)
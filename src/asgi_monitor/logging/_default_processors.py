@@ -1,33 +1,140 @@
+import logging
+import sys
+from collections.abc import Collection, Iterable
+from datetime import datetime, timezone
 from typing import Any
 
 import structlog
+from structlog.processors import CallsiteParameter
 
-__all__ = ("_build_default_processors",)
+from .callsite import DEFAULT_CALLSITE_PARAMETERS, CachedCallsiteParameterAdder
 
+__all__ = (
+    "_build_default_processors",
+    "_build_capture_processors",
+    "_build_render_processors",
+    "CAPTURED_CONTEXT_KEY",
+    "merge_captured_context",
+)
 
-def _build_default_processors(*, json_format: bool) -> list[Any]:
+CAPTURED_CONTEXT_KEY = "_asgi_monitor_context"
+
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def merge_captured_context(
+    wrapped_logger: logging.Logger | None,
+    method_name: str,
+    event_dict: dict[str, Any],
+) -> dict[str, Any]:
+    # The contextvars and the trace meta, which were captured by the queue handler in the thread of the log call
+    record = event_dict.get("_record")
+    context = record.__dict__.pop(CAPTURED_CONTEXT_KEY, None) if record is not None else None
+    if context:
+        for key, value in context.items():
+            event_dict.setdefault(key, value)
+    return event_dict
+
+
+def _add_record_timestamp(
+    wrapped_logger: logging.Logger | None,
+    method_name: str,
+    event_dict: dict[str, Any],
+) -> dict[str, Any]:
+    # The time of the log call, instead of the time of the rendering
+    record = event_dict.get("_record")
+    if record is not None:
+        event_dict["timestamp"] = datetime.fromtimestamp(record.created, tz=timezone.utc).strftime(_TIMESTAMP_FORMAT)
+    return event_dict
+
+
+def _resolve_exc_info(
+    wrapped_logger: logging.Logger | None,
+    method_name: str,
+    event_dict: dict[str, Any],
+) -> dict[str, Any]:
+    # The exception is formatted in the thread of the queue listener, where sys.exc_info() is empty,
+    # so exc_info=True and the exception instances are resolved to the tuple in the thread of the log call
+    exc_info = event_dict.get("exc_info")
+    if exc_info is True:
+        event_dict["exc_info"] = sys.exc_info()
+    elif isinstance(exc_info, BaseException):
+        event_dict["exc_info"] = (type(exc_info), exc_info, exc_info.__traceback__)
+    return event_dict
+
+
+class _StructlogRecordProcessors:
+    """Runs the processors only for the records of structlog, the foreign records are processed by the pre-chain."""
+
+    __slots__ = ("_processors",)
+
+    def __init__(self, processors: Iterable[Any]) -> None:
+        self._processors = tuple(processors)
+
+    def __call__(
+        self,
+        wrapped_logger: logging.Logger | None,
+        method_name: str,
+        event_dict: dict[str, Any],
+    ) -> dict[str, Any]:
+        if event_dict.get("_from_structlog"):
+            for processor in self._processors:
+                event_dict = processor(wrapped_logger, method_name, event_dict)
+        return event_dict
+
+
+def _build_callsite_processors(parameters: Collection[CallsiteParameter]) -> list[Any]:
+    return [CachedCallsiteParameterAdder(parameters)] if parameters else []
+
+
+def _build_default_processors(
+    *,
+    json_format: bool,
+    deferred: bool = False,
+    callsite_parameters: Collection[CallsiteParameter] = DEFAULT_CALLSITE_PARAMETERS,
+) -> list[Any]:
+    # In the deferred mode, the processors run in the thread of the queue listener,
+    # so the contextvars are taken from the record and the timestamp from the time of the log call
     pr = [
         structlog.stdlib.add_log_level,
         structlog.stdlib.add_logger_name,
-        structlog.contextvars.merge_contextvars,
+        merge_captured_context if deferred else structlog.contextvars.merge_contextvars,
         structlog.stdlib.ExtraAdder(),
         structlog.dev.set_exc_info,
-        structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M:%S.%f", utc=True),
+        _add_record_timestamp if deferred else structlog.processors.TimeStamper(fmt=_TIMESTAMP_FORMAT, utc=True),
         structlog.processors.dict_tracebacks,
-        structlog.processors.CallsiteParameterAdder(
-            {
-                structlog.processors.CallsiteParameter.PATHNAME,
-                structlog.processors.CallsiteParameter.FILENAME,
-                structlog.processors.CallsiteParameter.MODULE,
-                structlog.processors.CallsiteParameter.FUNC_NAME,
-                structlog.processors.CallsiteParameter.THREAD,
-                structlog.processors.CallsiteParameter.THREAD_NAME,
-                structlog.processors.CallsiteParameter.PROCESS,
-                structlog.processors.CallsiteParameter.PROCESS_NAME,
-            },
-        ),
+        *_build_callsite_processors(callsite_parameters),
     ]
     if json_format:
         pr.insert(0, structlog.processors.format_exc_info)
 
     return pr
+
+
+def _build_capture_processors(
+    callsite_parameters: Collection[CallsiteParameter] = DEFAULT_CALLSITE_PARAMETERS,
+) -> list[Any]:
+    # The structlog processors, which depend on the thread and the stack of the log call
+    return [
+        structlog.stdlib.add_log_level,
+        structlog.stdlib.add_logger_name,
+        structlog.contextvars.merge_contextvars,
+        structlog.dev.set_exc_info,
+        _resolve_exc_info,
+        structlog.processors.StackInfoRenderer(),
+        *_build_callsite_processors(callsite_parameters),
+    ]
+
+
+def _build_render_processors(*, json_format: bool) -> list[Any]:
+    # The rest of the structlog processors, which run in the thread of the queue listener
+    pr = [
+        _add_record_timestamp,
+        structlog.processors.dict_tracebacks,
+        structlog.stdlib.PositionalArgumentsFormatter(),
+        structlog.processors.UnicodeDecoder(),
+    ]
+    if json_format:
+        pr.insert(0, structlog.processors.format_exc_info)
+
+    return [_StructlogRecordProcessors(pr)]
@@ -0,0 +1,42 @@
+import json
+from collections.abc import Callable
+from typing import Any
+
+import structlog
+
+__all__ = (
+    "_build_json_renderer",
+    "_json_dumps",
+)
+
+_fast_dumps: Callable[[Any, Callable[[Any], Any] | None], bytes] | None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    try:
+        import msgspec
+    except ImportError:
+        _fast_dumps = None
+    else:
+        _fast_dumps = lambda obj, default: msgspec.json.encode(obj, enc_hook=default)  # noqa: E731
+else:
+    _fast_dumps = lambda obj, default: orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)  # noqa: E731
+
+
+def _json_dumps(obj: Any, default: Callable[[Any], Any] | None = None) -> str:
+    # orjson and msgspec serialize into UTF-8 bytes, which are decoded once,
+    # because the formatters of the logging module return str
+    if _fast_dumps is not None:
+        try:
+            return _fast_dumps(obj, default).decode()
+        except (TypeError, ValueError, OverflowError):
+            pass  # for example, an integer larger than 64 bits, stdlib json serializes it
+
+    # The same compact UTF-8 output as orjson and msgspec, so the lines do not depend on the installed backend
+    return json.dumps(obj, default=default, separators=(",", ":"), ensure_ascii=False)
+
+
+def _build_json_renderer() -> structlog.processors.JSONRenderer:
+    # The values, which can not be serialized, are rendered with repr by the default of structlog
+    return structlog.processors.JSONRenderer(serializer=_json_dumps)
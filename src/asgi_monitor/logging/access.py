@@ -0,0 +1,218 @@
+import math
+import os
+import random
+import threading
+import weakref
+from dataclasses import dataclass, field
+
+import structlog
+
+__all__ = (
+    "AccessLogSampler",
+    "AccessLogSamplingConfig",
+    "AccessLogSummarizer",
+    "AccessLogSummaryConfig",
+)
+
+_HTTP_500_INTERNAL_SERVER_ERROR = 500
+
+
+@dataclass(slots=True, frozen=True)
+class AccessLogSamplingConfig:
+    """
+    Policy of the access log of the monitoring middleware, which logs only a fraction of the successful fast requests.
+    The logged records have the sample_rate field, so the counts can be re-weighted downstream (count / sample_rate).
+    """
+
+    sample_rate: float = field(default=1.0)
+    """The fraction of the other requests to log, from 0 (none) to 1 (all)."""
+
+    slow_request_threshold: float | None = field(default=1.0)
+    """The duration in seconds, from which the requests are always logged. None to sample the slow requests too."""
+
+    always_log_server_errors: bool = field(default=True)
+    """Whether to always log the requests with a 5xx status code."""
+
+
+class AccessLogSampler:
+    """
+    Decides whether to log a request from its status code and duration,
+    before the access log record is built, so the dropped requests cost one comparison and one random number.
+    """
+
+    __slots__ = ("_sample_rate", "_slow_request_threshold_ns", "_always_log_server_errors", "_random")
+
+    def __init__(self, config: AccessLogSamplingConfig) -> None:
+        if not 0 <= config.sample_rate <= 1:
+            raise ValueError(f"The sample rate must be between 0 and 1, got {config.sample_rate}")
+
+        self._sample_rate = config.sample_rate
+        self._always_log_server_errors = config.always_log_server_errors
+        self._slow_request_threshold_ns: int | None = None
+        if config.slow_request_threshold is not None:
+            self._slow_request_threshold_ns = int(config.slow_request_threshold * 1e9)
+        self._random = random.random
+
+    def sample(self, status_code: int, duration_ns: int) -> float | None:
+        """
+        Returns the sample rate of a logged request or None, if the request is not logged.
+
+        :param int status_code: The status code of the response.
+        :param int duration_ns: The duration of the request, in nanoseconds.
+        :returns: float | None
+        """
+
+        if self._always_log_server_errors and status_code >= _HTTP_500_INTERNAL_SERVER_ERROR:
+            return 1.0
+        if self._slow_request_threshold_ns is not None and duration_ns >= self._slow_request_threshold_ns:
+            return 1.0
+        if self._sample_rate >= 1 or self._random() < self._sample_rate:
+            return self._sample_rate
+        return None
+
+
+@dataclass(slots=True, frozen=True)
+class AccessLogSummaryConfig:
+    """
+    Access log mode, in which the requests are aggregated per route
+    and one summary is logged per route and interval instead of a record per request.
+    """
+
+    interval: float = field(default=60.0)
+    """The interval in seconds, after which the summaries are logged."""
+
+    max_samples: int = field(default=1024)
+    """
+    The number of durations per route kept for the percentiles.
+    If more requests are made in an interval, a uniform random sample of them is kept.
+    """
+
+
+class _RouteSummary:
+    __slots__ = ("count", "errors", "response_size", "durations")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.response_size = 0
+        self.durations: list[int] = []
+
+
+class AccessLogSummarizer:
+    """
+    Aggregates the requests per method and route: the count, the count of 5xx responses, the response size
+    and the p50, p95 and p99 durations, which are taken from a reservoir sample of at most max_samples durations.
+    The summaries are logged with structlog by a background thread every interval, so they go through the same
+    processors as the other logs, and the request path only updates the counters under a lock.
+    """
+
+    __slots__ = ("_config", "_logger", "_lock", "_routes", "_thread", "_stop_event", "__weakref__")
+
+    def __init__(self, config: AccessLogSummaryConfig, logger_name: str) -> None:
+        self._config = config
+        self._logger = structlog.get_logger(logger_name)
+        self._lock = threading.Lock()
+        self._routes: dict[tuple[str, str], _RouteSummary] = {}
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        _summarizers.add(self)
+
+    def record(self, method: str, route: str, status_code: int, duration_ns: int, response_size: int) -> None:
+        """
+        Adds a request to the summary of its route.
+
+        :param str method: The method of the request.
+        :param str route: The route template of the request.
+        :param int status_code: The status code of the response.
+        :param int duration_ns: The duration of the request, in nanoseconds.
+        :param int response_size: The size of the response body, in bytes.
+        :returns: None
+        """
+
+        with self._lock:
+            if self._thread is None:
+                self._start()
+
+            summary = self._routes.get((method, route))
+            if summary is None:
+                summary = self._routes[method, route] = _RouteSummary()
+
+            summary.count += 1
+            summary.response_size += response_size
+            if status_code >= _HTTP_500_INTERNAL_SERVER_ERROR:
+                summary.errors += 1
+
+            if len(summary.durations) < self._config.max_samples:
+                summary.durations.append(duration_ns)
+            else:
+                # Reservoir sampling, each duration of the interval is kept with the same probability
+                index = random.randrange(summary.count)  # noqa: S311
+                if index < self._config.max_samples:
+                    summary.durations[index] = duration_ns
+
+    def flush(self) -> None:
+        """
+        Logs the summaries of the current interval and starts the next one.
+
+        :returns: None
+        """
+
+        with self._lock:
+            routes, self._routes = self._routes, {}
+
+        for (method, route), summary in routes.items():
+            durations = sorted(summary.durations)
+            self._logger.info(
+                "access summary",
+                method=method,
+                route=route,
+                count=summary.count,
+                errors=summary.errors,
+                response_size=summary.response_size,
+                p50=_percentile(durations, 0.5),
+                p95=_percentile(durations, 0.95),
+                p99=_percentile(durations, 0.99),
+                interval=self._config.interval,
+            )
+
+    def close(self) -> None:
+        """
+        Stops the background thread and logs the summaries of the current interval.
+
+        :returns: None
+        """
+
+        self._stop_event.set()
+        self.flush()
+
+    def _start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="asgi-monitor-access-summary", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._config.interval):
+            self.flush()
+
+    def _after_fork(self) -> None:
+        # The thread is not copied to the child process, and the lock may be held by it
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._thread = None
+
+
+_summarizers: weakref.WeakSet[AccessLogSummarizer] = weakref.WeakSet()
+
+
+def _after_fork() -> None:
+    for summarizer in _summarizers:
+        summarizer._after_fork()  # noqa: SLF001
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _percentile(durations: list[int], quantile: float) -> float:
+    # The nearest-rank percentile of the sorted durations, in milliseconds
+    index = max(0, math.ceil(quantile * len(durations)) - 1)
+    return round(durations[index] / 1e6, 3)
@@ -0,0 +1,106 @@
+import logging
+from collections.abc import Callable, Collection
+from typing import TYPE_CHECKING, Any
+
+from structlog.processors import CallsiteParameter, CallsiteParameterAdder
+from structlog.typing import EventDict
+
+try:
+    from structlog._frames import _find_first_app_frame_and_name
+except ImportError:  # pragma: no cover
+    # The private helper of structlog is gone, the parameters are collected by the public adder
+    _find_first_app_frame_and_name = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from types import CodeType, FrameType
+
+__all__ = (
+    "CachedCallsiteParameterAdder",
+    "DEFAULT_CALLSITE_PARAMETERS",
+    "PRODUCTION_CALLSITE_PARAMETERS",
+)
+
+DEFAULT_CALLSITE_PARAMETERS = frozenset(
+    {
+        CallsiteParameter.PATHNAME,
+        CallsiteParameter.FILENAME,
+        CallsiteParameter.MODULE,
+        CallsiteParameter.FUNC_NAME,
+        CallsiteParameter.THREAD,
+        CallsiteParameter.THREAD_NAME,
+        CallsiteParameter.PROCESS,
+        CallsiteParameter.PROCESS_NAME,
+    },
+)
+"""The callsite parameters, which are added to the logs by default."""
+
+PRODUCTION_CALLSITE_PARAMETERS = frozenset(
+    {
+        CallsiteParameter.MODULE,
+        CallsiteParameter.FUNC_NAME,
+        CallsiteParameter.LINENO,
+    },
+)
+"""The callsite parameters, which locate the log call and are cheap to collect."""
+
+# The parameters, which depend only on the code of the log call
+_STATIC_PARAMETERS = frozenset(
+    {
+        CallsiteParameter.PATHNAME,
+        CallsiteParameter.FILENAME,
+        CallsiteParameter.MODULE,
+        CallsiteParameter.FUNC_NAME,
+    },
+)
+
+_MAX_CACHE_SIZE = 4096
+
+
+class CachedCallsiteParameterAdder(CallsiteParameterAdder):
+    """
+    CallsiteParameterAdder, which caches the parameters of a code location (pathname, filename, module and func_name)
+    by the code object of the calling frame, so the repeated log calls only find the frame
+    and collect the line number, the thread and the process. The foreign records use their own attributes as before.
+    The adder falls back to CallsiteParameterAdder, if the private API of structlog it relies on is missing.
+    """
+
+    __slots__ = ("_static_handlers", "_dynamic_handlers", "_cache", "_cached")
+
+    def __init__(
+        self,
+        parameters: Collection[CallsiteParameter] = DEFAULT_CALLSITE_PARAMETERS,
+        additional_ignores: list[str] | None = None,
+    ) -> None:
+        """
+        :param Collection[CallsiteParameter] parameters: The parameters to add to the event dict.
+        :param list[str] | None additional_ignores: The names of the modules, which frames are skipped.
+        """
+
+        # The frame of this processor is skipped like the frames of structlog
+        super().__init__(parameters, [__name__, *(additional_ignores or [])])
+        self._static_handlers: list[tuple[str, Callable[[str, FrameType], Any]]] = []
+        self._dynamic_handlers: list[tuple[str, Callable[[str, FrameType], Any]]] = []
+        active_handlers = getattr(self, "_active_handlers", None)
+        self._cached = _find_first_app_frame_and_name is not None and active_handlers is not None
+        for parameter, handler in active_handlers or ():
+            handlers = self._static_handlers if parameter in _STATIC_PARAMETERS else self._dynamic_handlers
+            handlers.append((parameter.value, handler))
+        self._cache: dict[CodeType, tuple[tuple[str, Any], ...]] = {}
+
+    def __call__(self, logger: logging.Logger, name: str, event_dict: EventDict) -> EventDict:
+        if not self._cached or (event_dict.get("_record") is not None and not event_dict.get("_from_structlog")):
+            return super().__call__(logger, name, event_dict)
+
+        frame, module = _find_first_app_frame_and_name(additional_ignores=self._additional_ignores)
+
+        static = self._cache.get(frame.f_code)
+        if static is None:
+            if len(self._cache) >= _MAX_CACHE_SIZE:
+                self._cache.clear()
+            static = tuple((key, handler(module, frame)) for key, handler in self._static_handlers)
+            self._cache[frame.f_code] = static
+
+        event_dict.update(static)
+        for key, handler in self._dynamic_handlers:
+            event_dict[key] = handler(module, frame)
+        return event_dict
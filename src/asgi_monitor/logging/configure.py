@@ -1,19 +1,28 @@
 import logging
 import sys
+from collections.abc import Collection
 
 import structlog
+from structlog.processors import CallsiteParameter
 
-from ._default_processors import _build_default_processors
+from ._default_processors import _build_capture_processors, _build_default_processors, _build_render_processors
+from ._json import _build_json_renderer
+from .callsite import DEFAULT_CALLSITE_PARAMETERS
+from .queue import BoundedQueueHandler, LogQueueConfig
 from .trace_processor import extract_opentelemetry_trace_meta
 
 __all__ = ("configure_logging",)
 
+_STANDARD_LEVELS = (logging.NOTSET, logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL)
+
 
 def configure_logging(
     level: str | int = logging.INFO,
     *,
     json_format: bool,
     include_trace: bool,
+    queue: LogQueueConfig | None = None,
+    callsite_parameters: Collection[CallsiteParameter] = DEFAULT_CALLSITE_PARAMETERS,
 ) -> None:
     """
     Default logging setting for logging and structlog.
@@ -21,25 +30,52 @@ def configure_logging(
     :param str | int level: Logging level.
     :param bool json_format: The format of the logs. If True, the log will be rendered as JSON.
     :param bool include_trace: Include tracing information ("trace_id", "span_id", "parent_span_id", "service.name").
+    :param LogQueueConfig | None queue: Write the logs to stdout from a background thread through a bounded queue,
+        so a slow stdout does not block the event loop. By default, the logs are written by the calling thread.
+    :param Collection[CallsiteParameter] callsite_parameters: The callsite parameters to add to the logs,
+        PRODUCTION_CALLSITE_PARAMETERS (module, func_name and lineno) are cheaper than the default ones.
     :returns: None
     """
 
-    _configure_structlog(json_format=json_format, include_trace=include_trace)
-    _configure_default_logging(level=level, json_format=json_format, include_trace=include_trace)
+    deferred = queue is not None and queue.deferred_rendering
+    _configure_structlog(
+        level=level,
+        json_format=json_format,
+        include_trace=include_trace,
+        deferred=deferred,
+        callsite_parameters=callsite_parameters,
+    )
+    _configure_default_logging(
+        level=level,
+        json_format=json_format,
+        include_trace=include_trace,
+        queue=queue,
+        callsite_parameters=callsite_parameters,
+    )
 
 
 def _configure_structlog(
     *,
+    level: str | int,
     json_format: bool,
     include_trace: bool,
+    deferred: bool,
+    callsite_parameters: Collection[CallsiteParameter],
 ) -> None:
-    processors = [
-        *_build_default_processors(json_format=json_format),
-        structlog.processors.StackInfoRenderer(),
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.UnicodeDecoder(),  # convert bytes to str
-        structlog.stdlib.ProcessorFormatter.wrap_for_formatter,  # for integration with default logging
-    ]
+    if deferred:
+        # The rest of the processors run in the formatter, in the thread of the queue listener
+        processors = [
+            *_build_capture_processors(callsite_parameters),
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,  # for integration with default logging
+        ]
+    else:
+        processors = [
+            *_build_default_processors(json_format=json_format, callsite_parameters=callsite_parameters),
+            structlog.processors.StackInfoRenderer(),
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.UnicodeDecoder(),  # convert bytes to str
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,  # for integration with default logging
+        ]
 
     if include_trace:
         processors.insert(-1, extract_opentelemetry_trace_meta)  # after defaults
@@ -47,34 +83,74 @@ def _configure_structlog(
     structlog.configure_once(
         processors=processors,
         logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
+        # The methods of the levels below the level only return None, so the disabled logs skip the processors.
+        # The handler drops the records below the level anyway, so the level is not changed at runtime.
+        wrapper_class=structlog.make_filtering_bound_logger(_get_filtering_level(level)),
         cache_logger_on_first_use=True,
     )
 
 
+def _get_filtering_level(level: str | int) -> int:
+    # The filtering loggers exist only for the standard levels, so a custom level (for example, TRACE = 5)
+    # is rounded down to the nearest standard level, and the handler drops the rest of the records
+    number = _get_level_number(level)
+    return max((standard for standard in _STANDARD_LEVELS if standard <= number), default=logging.NOTSET)
+
+
+def _get_level_number(level: str | int) -> int:
+    if isinstance(level, int):
+        return level
+
+    # getLevelName returns the number of a registered level name, like logging.Logger.setLevel accepts
+    number = logging.getLevelName(level)
+    if isinstance(number, int):
+        return number
+    raise ValueError(f"Unknown level: {level!r}")
+
+
 def _configure_default_logging(
     *,
     level: str | int,
     json_format: bool,
     include_trace: bool,
+    queue: LogQueueConfig | None,
+    callsite_parameters: Collection[CallsiteParameter],
 ) -> None:
-    renderer_processor = structlog.processors.JSONRenderer() if json_format else structlog.dev.ConsoleRenderer()
-    default_processors = _build_default_processors(json_format=json_format)
+    deferred = queue is not None and queue.deferred_rendering
+    renderer_processor = _build_json_renderer() if json_format else structlog.dev.ConsoleRenderer()
+    default_processors = _build_default_processors(
+        json_format=json_format,
+        deferred=deferred,
+        callsite_parameters=callsite_parameters,
+    )
 
-    if include_trace:
+    if include_trace and not deferred:
+        # The queue handler captures the trace meta in the thread of the log call in the deferred mode
         default_processors.append(extract_opentelemetry_trace_meta)  # after defaults
 
     logging_processors = [
         structlog.stdlib.ProcessorFormatter.remove_processors_meta,
         renderer_processor,
     ]
+    if deferred:
+        logging_processors[:0] = _build_render_processors(json_format=json_format)
 
     formatter = structlog.stdlib.ProcessorFormatter(
         foreign_pre_chain=default_processors,
-        processors=logging_processors,  # type: ignore[arg-type]
+        processors=logging_processors,
     )
 
-    handler = logging.StreamHandler(stream=sys.stdout)
+    handler: logging.Handler
+    if queue is not None:
+        handler = BoundedQueueHandler(
+            sys.stdout,
+            max_size=queue.max_size,
+            block=queue.block,
+            deferred=queue.deferred_rendering,
+            include_trace=include_trace,
+        )
+    else:
+        handler = logging.StreamHandler(stream=sys.stdout)
     handler.set_name("default")
     handler.setLevel(level)
     handler.setFormatter(formatter)
@@ -1,13 +1,18 @@
+import os
 from typing import Any
 
 from gunicorn.app.base import BaseApplication
 
+from asgi_monitor.metrics.multiprocess import gunicorn_child_exit
+
 __all__ = ("GunicornStandaloneApplication",)
 
 
 class GunicornStandaloneApplication(BaseApplication):
     """
     Custom standalone application class for running a Gunicorn server with a ASGI application using Uvicorn worker.
+    If the PROMETHEUS_MULTIPROC_DIR environment variable is set and no child_exit hook is passed,
+    the metrics files of exited workers are compacted by the gunicorn_child_exit hook.
     """
 
     def __init__(
@@ -24,5 +29,8 @@ class GunicornStandaloneApplication(BaseApplication):
         for key, value in c.items():
             self.cfg.set(key.lower(), value)
 
+        if "child_exit" not in c and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            self.cfg.set("child_exit", gunicorn_child_exit)
+
     def load(self) -> Any:
         return self.application
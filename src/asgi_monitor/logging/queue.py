@@ -0,0 +1,155 @@
+import atexit
+import copy
+import logging
+import os
+import queue
+import sys
+import weakref
+from dataclasses import dataclass, field
+from logging.handlers import QueueHandler, QueueListener
+from typing import TextIO
+
+import structlog
+
+from ._default_processors import CAPTURED_CONTEXT_KEY
+from .trace_processor import extract_opentelemetry_trace_meta
+
+__all__ = (
+    "BoundedQueueHandler",
+    "LogQueueConfig",
+    "get_dropped_records",
+)
+
+_handlers: "weakref.WeakSet[BoundedQueueHandler]" = weakref.WeakSet()
+
+
+@dataclass(slots=True, frozen=True)
+class LogQueueConfig:
+    """
+    Configuration of the queue, through which the records are passed to a background thread,
+    which writes them to the stream, so a slow stream does not block the caller (and the event loop).
+    """
+
+    max_size: int = field(default=10_000)
+    """The maximum number of records in the queue."""
+
+    block: bool = field(default=False)
+    """Whether to wait for a free place, if the queue is full. Otherwise, the record is dropped and counted."""
+
+    deferred_rendering: bool = field(default=False)
+    """
+    Whether to run the structlog processors and the renderer in the background thread too.
+    The calling thread only captures the event, the contextvars, the trace meta and the callsite of the log call.
+    The values of the event are rendered later, so they should not be mutated after the log call.
+    """
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Renders the records with its formatter in the calling thread and puts them into a bounded queue,
+    and a QueueListener writes them to the stream from a background thread.
+    If the queue is full, the record is dropped and counted in dropped, unless block is set.
+
+    With deferred, the records are rendered by the listener thread, and the calling thread only attaches
+    the structlog contextvars and the trace meta to a copy of the record (see merge_captured_context).
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        *,
+        max_size: int = 10_000,
+        block: bool = False,
+        deferred: bool = False,
+        include_trace: bool = False,
+    ) -> None:
+        """
+        :param TextIO | None stream: The stream to write the records to, sys.stdout by default.
+        :param int max_size: The maximum number of records in the queue.
+        :param bool block: Whether to wait for a free place in a full queue instead of dropping the record.
+        :param bool deferred: Whether to render the records in the listener thread.
+        :param bool include_trace: Whether to capture the trace meta of the current span, if deferred.
+        """
+
+        self._queue: queue.Queue[logging.LogRecord | None] = queue.Queue(max_size)
+        super().__init__(self._queue)
+        self._stream = stream if stream is not None else sys.stdout
+        self._max_size = max_size
+        self._block = block
+        self._deferred = deferred
+        self._include_trace = include_trace
+        self._stream_handler = logging.StreamHandler(self._stream)
+        self.dropped = 0
+        self.listener = self._start_listener()
+        _handlers.add(self)
+        atexit.register(self._stop_listener)
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def setFormatter(self, fmt: logging.Formatter | None) -> None:  # noqa: N802
+        if self._deferred:
+            # The records are formatted by the stream handler in the listener thread
+            self._stream_handler.setFormatter(fmt)
+        else:
+            super().setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if not self._deferred:
+            prepared: logging.LogRecord = super().prepare(record)
+            return prepared
+
+        if isinstance(record.msg, dict):
+            # The records of structlog have the context from the processors, which run in the thread of the log call
+            return record
+
+        context = structlog.contextvars.get_contextvars()
+        if self._include_trace:
+            extract_opentelemetry_trace_meta(None, "", context)
+
+        record = copy.copy(record)
+        record.__dict__[CAPTURED_CONTEXT_KEY] = context
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._block:
+            self._queue.put(record)
+            return
+
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        self._stop_listener()
+        super().close()
+
+    def _start_listener(self) -> QueueListener:
+        # The records are rendered by prepare, unless deferred, then the stream handler has the formatter
+        listener = QueueListener(self._queue, self._stream_handler)
+        listener.start()
+        return listener
+
+    def _stop_listener(self) -> None:
+        # Writes the records left in the queue, the sentinel (None) waits for a free place in a full queue
+        thread = self.listener._thread  # noqa: SLF001
+        if thread is None:
+            return
+
+        self._queue.put(None)
+        thread.join()
+        self.listener._thread = None  # noqa: SLF001
+
+    def _after_fork(self) -> None:
+        # The listener thread is not copied to the child process, and the lock of the queue may be held by it
+        self._queue = self.queue = queue.Queue(self._max_size)
+        self.listener = self._start_listener()
+
+
+def get_dropped_records() -> int:
+    """
+    Returns the number of records dropped by all queue handlers, because their queues were full.
+
+    :returns: int
+    """
+
+    return sum(handler.dropped for handler in _handlers)
@@ -1,10 +1,15 @@
 import contextlib
 import logging
+from collections.abc import Collection
 from typing import Any
 
 import structlog
+from structlog.processors import CallsiteParameter
 
 from asgi_monitor.logging._default_processors import _build_default_processors
+from asgi_monitor.logging._json import _build_json_renderer
+from asgi_monitor.logging.callsite import DEFAULT_CALLSITE_PARAMETERS
+from asgi_monitor.logging.queue import BoundedQueueHandler, LogQueueConfig
 from asgi_monitor.logging.trace_processor import extract_opentelemetry_trace_meta
 
 __all__ = ("build_uvicorn_log_config",)
@@ -35,16 +40,42 @@ def _extract_uvicorn_request_meta(
     return event_dict
 
 
+def _callsite_parameters(names: Collection[str] | None) -> Collection[CallsiteParameter]:
+    # The names are the values of CallsiteParameter, so the config can be saved as JSON
+    return DEFAULT_CALLSITE_PARAMETERS if names is None else {CallsiteParameter(name) for name in names}
+
+
+def _trace_processors(*, deferred: bool) -> list[Any]:
+    # In the deferred mode, the trace meta is captured by the queue handler in the thread of the log call
+    return [] if deferred else [extract_opentelemetry_trace_meta]
+
+
 class UvicornDefaultConsoleFormatter(structlog.stdlib.ProcessorFormatter):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        *args: Any,
+        deferred: bool = False,
+        callsite_parameters: Collection[str] | None = None,
+        **kwargs: Any,
+    ) -> None:
         super().__init__(
             processor=structlog.dev.ConsoleRenderer(colors=True),
-            foreign_pre_chain=_build_default_processors(json_format=False),
+            foreign_pre_chain=_build_default_processors(
+                json_format=False,
+                deferred=deferred,
+                callsite_parameters=_callsite_parameters(callsite_parameters),
+            ),
         )
 
 
 class UvicornAccessConsoleFormatter(structlog.stdlib.ProcessorFormatter):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        *args: Any,
+        deferred: bool = False,
+        callsite_parameters: Collection[str] | None = None,
+        **kwargs: Any,
+    ) -> None:
         processors = [
             _extract_uvicorn_request_meta,
             structlog.stdlib.ProcessorFormatter.remove_processors_meta,
@@ -53,71 +84,164 @@ class UvicornAccessConsoleFormatter(structlog.stdlib.ProcessorFormatter):
 
         super().__init__(
             processors=processors,  # type: ignore[arg-type]
-            foreign_pre_chain=_build_default_processors(json_format=False),
+            foreign_pre_chain=_build_default_processors(
+                json_format=False,
+                deferred=deferred,
+                callsite_parameters=_callsite_parameters(callsite_parameters),
+            ),
             pass_foreign_args=True,  # for args from record.args in positional_args
         )
 
 
 class TraceUvicornAccessConsoleFormatter(structlog.stdlib.ProcessorFormatter):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        *args: Any,
+        deferred: bool = False,
+        callsite_parameters: Collection[str] | None = None,
+        **kwargs: Any,
+    ) -> None:
         processors = [
             _extract_uvicorn_request_meta,
-            extract_opentelemetry_trace_meta,
+            *_trace_processors(deferred=deferred),
             structlog.stdlib.ProcessorFormatter.remove_processors_meta,
             structlog.dev.ConsoleRenderer(),
         ]
 
         super().__init__(
-            processors=processors,  # type: ignore[arg-type]
-            foreign_pre_chain=_build_default_processors(json_format=False),
+            processors=processors,
+            foreign_pre_chain=_build_default_processors(
+                json_format=False,
+                deferred=deferred,
+                callsite_parameters=_callsite_parameters(callsite_parameters),
+            ),
             pass_foreign_args=True,  # for args from record.args in positional_args
         )
 
 
 class UvicornDefaultJSONFormatter(structlog.stdlib.ProcessorFormatter):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        *args: Any,
+        deferred: bool = False,
+        callsite_parameters: Collection[str] | None = None,
+        **kwargs: Any,
+    ) -> None:
         super().__init__(
-            processor=structlog.processors.JSONRenderer(),
-            foreign_pre_chain=_build_default_processors(json_format=True),
+            processor=_build_json_renderer(),
+            foreign_pre_chain=_build_default_processors(
+                json_format=True,
+                deferred=deferred,
+                callsite_parameters=_callsite_parameters(callsite_parameters),
+            ),
         )
 
 
 class UvicornAccessJSONFormatter(structlog.stdlib.ProcessorFormatter):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        *args: Any,
+        deferred: bool = False,
+        callsite_parameters: Collection[str] | None = None,
+        **kwargs: Any,
+    ) -> None:
         processors = [
             _extract_uvicorn_request_meta,
             structlog.stdlib.ProcessorFormatter.remove_processors_meta,
-            structlog.processors.JSONRenderer(),
+            _build_json_renderer(),
         ]
 
         super().__init__(
             processors=processors,  # type: ignore[arg-type]
-            foreign_pre_chain=_build_default_processors(json_format=True),
+            foreign_pre_chain=_build_default_processors(
+                json_format=True,
+                deferred=deferred,
+                callsite_parameters=_callsite_parameters(callsite_parameters),
+            ),
             pass_foreign_args=True,  # for args from record.args in positional_args
         )
 
 
 class TraceUvicornAccessJSONFormatter(structlog.stdlib.ProcessorFormatter):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        *args: Any,
+        deferred: bool = False,
+        callsite_parameters: Collection[str] | None = None,
+        **kwargs: Any,
+    ) -> None:
         processors = [
             _extract_uvicorn_request_meta,
-            extract_opentelemetry_trace_meta,
+            *_trace_processors(deferred=deferred),
             structlog.stdlib.ProcessorFormatter.remove_processors_meta,
-            structlog.processors.JSONRenderer(),
+            _build_json_renderer(),
         ]
 
         super().__init__(
-            processors=processors,  # type: ignore[arg-type]
-            foreign_pre_chain=_build_default_processors(json_format=True),
+            processors=processors,
+            foreign_pre_chain=_build_default_processors(
+                json_format=True,
+                deferred=deferred,
+                callsite_parameters=_callsite_parameters(callsite_parameters),
+            ),
             pass_foreign_args=True,  # for args from record.args in positional_args
         )
 
 
-def build_uvicorn_log_config(
+class MonitoringAccessConsoleFormatter(structlog.stdlib.ProcessorFormatter):
+    def __init__(
+        self,
+        *args: Any,
+        deferred: bool = False,
+        callsite_parameters: Collection[str] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        processors = [
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.dev.ConsoleRenderer(),
+        ]
+
+        super().__init__(
+            processors=processors,  # type: ignore[arg-type]
+            foreign_pre_chain=_build_default_processors(
+                json_format=False,
+                deferred=deferred,
+                callsite_parameters=_callsite_parameters(callsite_parameters),
+            ),
+        )
+
+
+class MonitoringAccessJSONFormatter(structlog.stdlib.ProcessorFormatter):
+    def __init__(
+        self,
+        *args: Any,
+        deferred: bool = False,
+        callsite_parameters: Collection[str] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        processors = [
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            _build_json_renderer(),
+        ]
+
+        super().__init__(
+            processors=processors,  # type: ignore[arg-type]
+            foreign_pre_chain=_build_default_processors(
+                json_format=True,
+                deferred=deferred,
+                callsite_parameters=_callsite_parameters(callsite_parameters),
+            ),
+        )
+
+
+def build_uvicorn_log_config(  # noqa: PLR0913
     level: str | int = logging.INFO,
     *,
     json_format: bool,
     include_trace: bool,
+    access_logger_name: str | None = None,
+    queue: LogQueueConfig | None = None,
+    callsite_parameters: Collection[CallsiteParameter] | None = None,
 ) -> dict[str, Any]:
     """
     Building a Uvicorn log config.
@@ -125,6 +249,13 @@ def build_uvicorn_log_config(
     :param str | int level: Logging level.
     :param bool json_format: The format of the logs. If True, the log will be rendered as JSON.
     :param bool include_trace: Include tracing information ("trace_id", "span_id", "parent_span_id", "service.name").
+    :param str | None access_logger_name: The logger of the access log of the monitoring middleware.
+        If specified, the access log of Uvicorn is disabled and the records of this logger are rendered
+        with the fields set by the middleware, instead of the arguments of the Uvicorn access log.
+    :param LogQueueConfig | None queue: Write the logs to stdout from a background thread through a bounded queue,
+        so a slow stdout does not block the event loop. By default, the logs are written by the calling thread.
+    :param Collection[CallsiteParameter] | None callsite_parameters: The callsite parameters to add to the logs,
+        DEFAULT_CALLSITE_PARAMETERS if not specified.
     :returns: Logging configuration for Uvicorn
     """
 
@@ -137,7 +268,11 @@ def build_uvicorn_log_config(
         default = UvicornDefaultConsoleFormatter  # type: ignore[assignment]
         access = UvicornAccessConsoleFormatter if not include_trace else TraceUvicornAccessConsoleFormatter
 
-    return {
+    if access_logger_name is not None:
+        # The trace meta is set by the middleware from its span
+        access = MonitoringAccessJSONFormatter if json_format else MonitoringAccessConsoleFormatter
+
+    log_config: dict[str, Any] = {
         "version": 1,
         "disable_existing_loggers": False,
         "formatters": {
@@ -178,3 +313,30 @@ def build_uvicorn_log_config(
             },
         },
     }
+
+    if access_logger_name is not None:
+        # Uvicorn does not build its access log at all, if the logger has no handlers
+        log_config["loggers"]["uvicorn.access"]["handlers"] = []
+        log_config["loggers"][access_logger_name] = {
+            "handlers": ["access"],
+            "level": level_name,
+            "propagate": False,
+        }
+
+    if callsite_parameters is not None:
+        for formatter in log_config["formatters"].values():
+            formatter["callsite_parameters"] = sorted(parameter.value for parameter in callsite_parameters)
+
+    if queue is not None:
+        for name, handler in log_config["handlers"].items():
+            del handler["class"]
+            handler["()"] = f"{BoundedQueueHandler.__module__}.{BoundedQueueHandler.__name__}"
+            handler["max_size"] = queue.max_size
+            handler["block"] = queue.block
+
+            if queue.deferred_rendering:
+                handler["deferred"] = True
+                handler["include_trace"] = include_trace and name == "access"
+                log_config["formatters"][name]["deferred"] = True
+
+    return log_config
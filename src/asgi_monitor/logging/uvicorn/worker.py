@@ -1,8 +1,11 @@
 import logging
+from collections.abc import Collection
 from typing import Any
 
+from structlog.processors import CallsiteParameter
 from uvicorn.workers import UvicornWorker
 
+from asgi_monitor.logging.queue import LogQueueConfig
 from .log_config import build_uvicorn_log_config
 
 __all__ = (
@@ -17,12 +20,18 @@ class StructlogDefaultUvicornWorker(UvicornWorker):
     level: int = logging.DEBUG
     json_format: bool = False
     include_trace: bool = False
+    access_logger_name: str | None = None
+    queue: LogQueueConfig | None = None
+    callsite_parameters: Collection[CallsiteParameter] | None = None
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.CONFIG_KWARGS["log_config"] = build_uvicorn_log_config(
             level=self.level,
             json_format=self.json_format,
             include_trace=self.include_trace,
+            access_logger_name=self.access_logger_name,
+            queue=self.queue,
+            callsite_parameters=self.callsite_parameters,
         )
         super().__init__(*args, **kwargs)
 
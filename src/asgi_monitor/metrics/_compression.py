@@ -0,0 +1,94 @@
+import gzip
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import Any, Callable
+
+__all__ = (
+    "_compress",
+    "_compress_stream",
+    "_negotiate_encoding",
+)
+
+
+_GZIP_COMPRESS_LEVEL = 6  # level 9 (gzip default) is much slower on large payloads for a negligible gain
+
+
+def _gzip_compress(payload: bytes) -> bytes:
+    return gzip.compress(payload, compresslevel=_GZIP_COMPRESS_LEVEL, mtime=0)
+
+
+def _gzip_compressobj() -> Any:
+    return zlib.compressobj(_GZIP_COMPRESS_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # the gzip container
+
+
+_COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {"gzip": _gzip_compress}
+_STREAM_COMPRESSORS: dict[str, Callable[[], Any]] = {"gzip": _gzip_compressobj}
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    pass
+else:
+    _COMPRESSORS["zstd"] = zstandard.ZstdCompressor().compress
+    _STREAM_COMPRESSORS["zstd"] = lambda: zstandard.ZstdCompressor().compressobj()
+
+_PREFERENCE = ("zstd", "gzip")
+
+
+def _parse_accept_encoding(accept_encoding: str) -> dict[str, float]:
+    codings: dict[str, float] = {}
+
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding.lower()] = quality
+
+    return codings
+
+
+def _negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Selects the best supported content coding from the Accept-Encoding header.
+    Returns None if the payload should be sent as is.
+    """
+
+    if not accept_encoding:
+        return None
+
+    codings = _parse_accept_encoding(accept_encoding)
+    wildcard = codings.get("*", 0.0)
+    best, best_quality = None, 0.0
+
+    for encoding in _PREFERENCE:
+        if encoding not in _COMPRESSORS:
+            continue
+
+        quality = codings.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    return best
+
+
+def _compress(payload: bytes, encoding: str) -> bytes:
+    return _COMPRESSORS[encoding](payload)
+
+
+def _compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    compressor = _STREAM_COMPRESSORS[encoding]()
+
+    for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+
+    yield compressor.flush()
@@ -0,0 +1,97 @@
+from collections.abc import Callable
+
+__all__ = ("_snappy_compress",)
+
+# https://github.com/google/snappy/blob/main/format_description.txt
+
+_BLOCK_SIZE = 1 << 16  # the copies never cross the blocks, so the offsets fit into two bytes
+_MIN_MATCH = 4
+_MAX_COPY = 64
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:  # noqa: PLR2004
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _emit_literal(out: bytearray, literal: bytes) -> None:
+    size = len(literal) - 1
+
+    if size < 60:  # noqa: PLR2004
+        out.append(size << 2)
+    else:
+        length = (size.bit_length() + 7) // 8
+        out.append((59 + length) << 2)
+        out += size.to_bytes(length, "little")
+
+    out += literal
+
+
+def _emit_copy(out: bytearray, offset: int, length: int) -> None:
+    # The copies longer than 64 bytes are split, so that the last one is at least 4 bytes long
+    while length >= 68:  # noqa: PLR2004
+        out += bytes(((_MAX_COPY - 1) << 2 | 2, offset & 0xFF, offset >> 8))
+        length -= _MAX_COPY
+
+    if length > _MAX_COPY:
+        out += bytes(((60 - 1) << 2 | 2, offset & 0xFF, offset >> 8))
+        length -= 60
+
+    if length < 12 and offset < 2048:  # noqa: PLR2004
+        out += bytes(((offset >> 8) << 5 | (length - 4) << 2 | 1, offset & 0xFF))
+    else:
+        out += bytes(((length - 1) << 2 | 2, offset & 0xFF, offset >> 8))
+
+
+def _compress_block(out: bytearray, block: bytes) -> None:
+    size = len(block)
+    table: dict[bytes, int] = {}
+    position = literal_start = 0
+    misses = 32  # the lookups become sparser in the incompressible data, as in the reference implementation
+
+    while position + _MIN_MATCH <= size:
+        key = block[position : position + _MIN_MATCH]
+        candidate = table.get(key)
+        table[key] = position
+
+        if candidate is None:
+            position += misses >> 5
+            misses += 1
+            continue
+
+        length = _MIN_MATCH
+        while block[candidate + length : candidate + length + 32] == block[position + length : position + length + 32]:
+            length += 32
+        while position + length < size and block[candidate + length] == block[position + length]:
+            length += 1
+
+        if literal_start < position:
+            _emit_literal(out, block[literal_start:position])
+        _emit_copy(out, position - candidate, length)
+
+        position = literal_start = position + length
+        misses = 32
+
+    if literal_start < size:
+        _emit_literal(out, block[literal_start:])
+
+
+def _pure_snappy_compress(payload: bytes) -> bytes:
+    out = bytearray(_varint(len(payload)))
+    for start in range(0, len(payload), _BLOCK_SIZE):
+        _compress_block(out, payload[start : start + _BLOCK_SIZE])
+    return bytes(out)
+
+
+_snappy_compress: Callable[[bytes], bytes]
+
+try:
+    import cramjam
+except ImportError:  # pragma: no cover
+    _snappy_compress = _pure_snappy_compress
+else:  # pragma: no cover
+    _snappy_compress = lambda payload: bytes(cramjam.snappy.compress_raw(payload))  # noqa: E731
@@ -0,0 +1,159 @@
+import logging
+import os
+import threading
+from collections.abc import Collection
+
+from prometheus_client import CollectorRegistry
+
+from .get_latest import MetricsResponse, _build_response, _etag, _render_latest, _restrict
+from .multiprocess import IncrementalMultiProcessCollector
+from .protobuf import _accepts_protobuf
+from .server import MetricsServer
+
+__all__ = (
+    "MetricsAggregator",
+    "start_metrics_aggregator",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _Snapshot:
+    __slots__ = ("headers", "payload", "etag", "compressed")
+
+    def __init__(self, headers: dict[str, str], payload: bytes) -> None:
+        self.headers = headers
+        self.payload = payload
+        self.etag = _etag(payload)
+        self.compressed: dict[str, bytes] = {}
+
+
+class MetricsAggregator:
+    """
+    Merges the files of the multiprocess directory in a background thread
+    and keeps the rendered exposition in memory.
+    Scrapes are served from this snapshot, so they do not touch the application workers,
+    and the aggregation is done once per refresh interval instead of once per scrape.
+    """
+
+    __slots__ = ("_registry", "_openmetrics_format", "_interval", "_snapshot", "_stop_event", "_thread")
+
+    def __init__(self, path: str, *, openmetrics_format: bool = False, interval: float = 1.0) -> None:
+        self._registry = CollectorRegistry()
+        IncrementalMultiProcessCollector(path, registry=self._registry)
+
+        self._openmetrics_format = openmetrics_format
+        self._interval = interval
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="asgi-monitor-metrics-aggregator", daemon=True)
+        self._snapshot = self._render()
+
+    def refresh(self) -> None:
+        """Merges the multiprocess files and replaces the snapshot."""
+
+        self._snapshot = self._render()
+
+    def render(
+        self,
+        *,
+        accept_encoding: str | None = None,
+        names: Collection[str] | None = None,
+        if_none_match: str | None = None,
+        accept: str | None = None,
+    ) -> MetricsResponse:
+        """
+        Returns the latest snapshot, compressed according to the Accept-Encoding header,
+        or 304 Not Modified if the snapshot has not changed since the If-None-Match tag.
+        A filtered scrape, or a scrape in the protobuf format,
+        is rendered from the multiprocess directory instead of the snapshot.
+
+        :param str | None accept_encoding: The Accept-Encoding header of the scrape request.
+        :param Collection[str] | None names: The names of the samples to render, all of them if it is empty.
+        :param str | None if_none_match: The If-None-Match header of the scrape request.
+        :param str | None accept: The Accept header of the scrape request.
+        :returns: MetricsResponse
+        """
+
+        protobuf_format = _accepts_protobuf(accept)
+        if names or protobuf_format:
+            headers, payload = _render_latest(
+                _restrict(self._registry, names),
+                openmetrics_format=self._openmetrics_format,
+                protobuf_format=protobuf_format,
+            )
+            return _build_response(
+                headers,
+                payload,
+                accept_encoding=accept_encoding,
+                accept=accept,
+                etag=_etag(payload),
+                if_none_match=if_none_match,
+            )
+
+        snapshot = self._snapshot
+        return _build_response(
+            snapshot.headers,
+            snapshot.payload,
+            accept_encoding=accept_encoding,
+            accept=accept,
+            compressed=snapshot.compressed,
+            etag=snapshot.etag,
+            if_none_match=if_none_match,
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+    def _render(self) -> _Snapshot:
+        headers, payload = _render_latest(self._registry, openmetrics_format=self._openmetrics_format)
+        return _Snapshot(headers, payload)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            self._safe_refresh()
+
+    def _safe_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            # The previous snapshot is served until the next successful refresh
+            logger.exception("Failed to refresh the metrics snapshot")
+
+
+def start_metrics_aggregator(  # noqa: PLR0913
+    path: str | None = None,
+    *,
+    host: str = "0.0.0.0",  # noqa: S104
+    port: int | None = None,
+    unix_socket: str | None = None,
+    openmetrics_format: bool = False,
+    interval: float = 1.0,
+) -> tuple[MetricsAggregator, MetricsServer]:
+    """
+    Start a metrics aggregator for the multiprocess directory and serve its snapshot
+    on a dedicated port or unix socket. It can run as a sidecar or in the Gunicorn master process,
+    for example, from the ``when_ready`` server hook.
+
+    :param str | None path: The multiprocess directory. Default is the PROMETHEUS_MULTIPROC_DIR environment variable.
+    :param str host: The host to bind the port to.
+    :param int | None port: The port to serve the metrics on.
+    :param str | None unix_socket: The path of the unix socket to serve the metrics on.
+    :param bool openmetrics_format: A flag indicating whether to generate metrics in OpenMetrics format.
+    :param float interval: The interval between snapshot refreshes, in seconds.
+    :returns: The started aggregator and server
+    """
+
+    aggregator = MetricsAggregator(
+        path or os.environ["PROMETHEUS_MULTIPROC_DIR"],
+        openmetrics_format=openmetrics_format,
+        interval=interval,
+    )
+    server = MetricsServer(aggregator.render, host=host, port=port, unix_socket=unix_socket)
+
+    aggregator.start()
+    server.start()
+    return aggregator, server
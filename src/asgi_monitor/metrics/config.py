@@ -1,7 +1,12 @@
 from dataclasses import dataclass, field
 
+from opentelemetry.metrics import MeterProvider
 from prometheus_client import CollectorRegistry
 
+from .remote_write import RemoteWriteConfig
+from .shared_memory import SharedMemoryConfig
+from .statsd import StatsdConfig
+
 __all__ = ("BaseMetricsConfig",)
 
 
@@ -24,3 +29,34 @@ class BaseMetricsConfig:
 
     include_trace_exemplar: bool = field(default=False)
     """Whether to include trace exemplars in the metrics."""
+
+    native_histogram_schema: int | None = field(default=None)
+    """
+    Record the request duration as a native histogram with the given schema, from -4 to 8,
+    the buckets grow by a factor of 2^(2^-schema), for example, by about 9% for the schema 3.
+    The native buckets are exposed only to the scrapers, which negotiate the Prometheus protobuf format.
+    """
+
+    shared_memory: SharedMemoryConfig | None = field(default=None)
+    """
+    Store the request metrics of all workers in a shared memory segment instead of the registry,
+    the segment is exposed through the registry of each worker.
+    """
+
+    meter_provider: MeterProvider | None = field(default=None)
+    """
+    Record the request metrics through the instruments of an OpenTelemetry meter provider instead of the registry,
+    so they are exported by its readers, for example, OTLP push.
+    """
+
+    statsd: StatsdConfig | None = field(default=None)
+    """
+    Emit the request metrics as StatsD lines to a local agent instead of updating the registry,
+    the lines are batched into datagrams of at most max_packet_size bytes.
+    """
+
+    remote_write: RemoteWriteConfig | None = field(default=None)
+    """
+    Push the registry to a Prometheus remote-write endpoint from a background thread,
+    for the short-lived applications, which may disappear between scrapes.
+    """
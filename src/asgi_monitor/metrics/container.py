@@ -6,18 +6,27 @@ from typing import cast
 
 from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, metrics
 
+from .native_histogram import NativeHistogram
+
 __all__ = ("MetricsContainer",)
 
 
 class MetricsContainer:
     """Prometheus's metrics container"""
 
-    __slots__ = ("_metrics", "_registry", "_prefix")
+    __slots__ = ("_metrics", "_registry", "_prefix", "_native_histogram_schema")
 
-    def __init__(self, prefix: str, registry: CollectorRegistry) -> None:
+    def __init__(
+        self,
+        prefix: str,
+        registry: CollectorRegistry,
+        *,
+        native_histogram_schema: int | None = None,
+    ) -> None:
         self._metrics: dict[str, metrics.MetricWrapperBase] = {}
         self._prefix = prefix
         self._registry = registry
+        self._native_histogram_schema = native_histogram_schema
 
     def app_info(self) -> Gauge:
         metric_name = f"{self._prefix}_app_info"
@@ -58,7 +67,15 @@ class MetricsContainer:
     def request_duration(self) -> Histogram:
         metric_name = f"{self._prefix}_request_duration_seconds"
 
-        if metric_name not in self._metrics:
+        if metric_name not in self._metrics and self._native_histogram_schema is not None:
+            self._metrics[metric_name] = NativeHistogram(
+                name=metric_name,
+                documentation="Histogram of request duration by path, in seconds",
+                labelnames=["app_name", "method", "path"],
+                registry=self._registry,
+                schema=self._native_histogram_schema,
+            )
+        elif metric_name not in self._metrics:
             self._metrics[metric_name] = Histogram(
                 name=metric_name,
                 documentation="Histogram of request duration by path, in seconds",
@@ -91,3 +108,18 @@ class MetricsContainer:
                 registry=self._registry,
             )
         return cast("Counter", self._metrics[metric_name])
+
+    def scrape_duration(self) -> Histogram:
+        metric_name = f"{self._prefix}_metrics_scrape_duration_seconds"
+
+        if metric_name not in self._metrics:
+            self._metrics[metric_name] = Histogram(
+                name=metric_name,
+                documentation="Histogram of time a metrics scrape spends waiting for and rendering the exposition, "
+                "in seconds",
+                registry=self._registry,
+            )
+        return cast("Histogram", self._metrics[metric_name])
+
+    def close(self) -> None:
+        """Releases the resources of the container at the shutdown of the application."""
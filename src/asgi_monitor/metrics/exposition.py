@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any
+from weakref import WeakKeyDictionary
+
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, metrics
+from prometheus_client.utils import floatToGoString
+
+from .native_histogram import NativeHistogram
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+
+    from prometheus_client import CollectorRegistry
+    from prometheus_client.metrics_core import Metric
+
+__all__ = (
+    "TextExpositionEncoder",
+    "generate_latest_text",
+    "iter_latest_text",
+)
+
+
+def _escape_documentation(documentation: str) -> str:
+    return documentation.replace("\\", r"\\").replace("\n", r"\n")
+
+
+def _labelstr(labels: dict[str, str]) -> bytes:
+    if not labels:
+        return b""
+
+    pairs = ",".join(
+        '{}="{}"'.format(name, value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\""))
+        for name, value in sorted(labels.items())
+    )
+    return f"{{{pairs}}}".encode()
+
+
+def _write_counter(out: bytearray, created: bytearray | None, series: tuple[Any, ...], child: Any) -> None:
+    total_prefix, created_prefix = series
+    out += total_prefix
+    out += floatToGoString(child._value.get()).encode()  # noqa: SLF001
+    out += b"\n"
+
+    if created is not None:
+        created += created_prefix
+        created += floatToGoString(child._created).encode()  # noqa: SLF001
+        created += b"\n"
+
+
+def _write_gauge(out: bytearray, created: bytearray | None, series: tuple[Any, ...], child: Any) -> None:
+    out += series[0]
+    out += floatToGoString(child._value.get()).encode()  # noqa: SLF001
+    out += b"\n"
+
+
+def _write_histogram(out: bytearray, created: bytearray | None, series: tuple[Any, ...], child: Any) -> None:
+    bucket_prefixes, count_prefix, sum_prefix, created_prefix = series
+    accumulated = 0.0
+
+    for bucket_prefix, bucket in zip(bucket_prefixes, child._buckets, strict=True):  # noqa: SLF001
+        accumulated += bucket.get()
+        out += bucket_prefix
+        out += floatToGoString(accumulated).encode()
+        out += b"\n"
+
+    out += count_prefix
+    out += floatToGoString(accumulated).encode()
+    out += b"\n"
+
+    if sum_prefix is not None:
+        out += sum_prefix
+        out += floatToGoString(child._sum.get()).encode()  # noqa: SLF001
+        out += b"\n"
+
+    if created is not None:
+        created += created_prefix
+        created += floatToGoString(child._created).encode()  # noqa: SLF001
+        created += b"\n"
+
+
+def _has_function_children(metric: metrics.MetricWrapperBase) -> bool:
+    # Gauge.set_function replaces _child_samples of the child, and its _value is not updated,
+    # so these gauges are rendered from collect() with generate_latest
+    if metric._type != "gauge":  # noqa: SLF001
+        return False
+
+    with metric._lock:  # noqa: SLF001
+        children = list(metric._metrics.values())  # noqa: SLF001
+    return any("_child_samples" in vars(child) for child in children)
+
+
+_SAMPLE_WRITERS: dict[str, Callable[[bytearray, bytearray | None, tuple[Any, ...], Any], None]] = {
+    "counter": _write_counter,
+    "gauge": _write_gauge,
+    "histogram": _write_histogram,
+}
+
+
+class _MetricsAdapter:
+    """Collector of the already collected metrics, to render a single metric family with generate_latest."""
+
+    __slots__ = ("_metrics",)
+
+    def __init__(self, metrics: Iterable[Metric]) -> None:
+        self._metrics = metrics
+
+    def collect(self) -> Iterable[Metric]:
+        return self._metrics
+
+
+class TextExpositionEncoder:
+    """
+    Encoder of the Prometheus text format, which output is identical to generate_latest.
+
+    The escaped label strings of every child of the labelled counters, gauges and histograms
+    are built on the first scrape and cached for the lifetime of the metric,
+    so the next scrapes only format the values and write them into a bytearray per metric family.
+    Other collectors are rendered with generate_latest.
+    """
+
+    __slots__ = ("_lock", "_prefixes")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._prefixes: WeakKeyDictionary[
+            metrics.MetricWrapperBase,
+            dict[Sequence[str], tuple[Any, tuple[Any, ...]]],
+        ] = WeakKeyDictionary()
+
+    def encode(self, registry: CollectorRegistry) -> bytes:
+        """
+        Generates the metrics of the registry in the Prometheus text format.
+
+        :param CollectorRegistry registry: A registry for collect metrics.
+        :returns: bytes
+        """
+
+        return b"".join(self.iter_encode(registry))
+
+    def iter_encode(self, registry: CollectorRegistry) -> Iterator[bytes]:
+        """
+        Generates the metrics of the registry in the Prometheus text format, one chunk per metric family.
+
+        :param CollectorRegistry registry: A registry for collect metrics.
+        :returns: Iterator[bytes]
+        """
+
+        with registry._lock:  # noqa: SLF001
+            collectors = list(registry._collector_to_names)  # noqa: SLF001
+            target_info = registry._target_info_metric() if registry._target_info else None  # noqa: SLF001
+
+        if target_info is not None:
+            yield generate_latest(_MetricsAdapter((target_info,)))  # type: ignore[arg-type]
+
+        for collector in collectors:
+            if (
+                type(collector) in (Counter, Gauge, Histogram, NativeHistogram)
+                and collector._is_parent()  # type: ignore[attr-defined]  # noqa: SLF001
+                and not _has_function_children(collector)  # type: ignore[arg-type]
+            ):
+                out = bytearray()
+                self._encode_wrapper(out, collector)  # type: ignore[arg-type]
+                yield bytes(out)
+            else:
+                for metric in collector.collect():
+                    yield generate_latest(_MetricsAdapter((metric,)))  # type: ignore[arg-type]
+
+    def _encode_wrapper(self, out: bytearray, metric: metrics.MetricWrapperBase) -> None:
+        name = metric._name  # noqa: SLF001
+        typ: str = metric._type  # type: ignore[assignment]  # noqa: SLF001
+        family = f"{name}_total" if typ == "counter" else name
+        documentation = _escape_documentation(metric._documentation)  # noqa: SLF001
+        out += f"# HELP {family} {documentation}\n# TYPE {family} {typ}\n".encode()
+
+        with metric._lock:  # noqa: SLF001
+            children: list[tuple[Sequence[str], Any]] = list(metric._metrics.items())  # noqa: SLF001
+
+        # The cached prefixes are never changed after they are shared, each scrape builds a new dict
+        # of its children (so the removed children are dropped), which replaces the cached one under the lock
+        with self._lock:
+            prefixes = self._prefixes.get(metric, {})
+        next_prefixes: dict[Sequence[str], tuple[Any, tuple[Any, ...]]] = {}
+
+        use_created = metrics._use_created  # noqa: SLF001
+        created = bytearray()
+        write_samples = _SAMPLE_WRITERS[typ]
+
+        for labelvalues, child in children:
+            cached = prefixes.get(labelvalues)
+            if cached is not None and cached[0] is child:
+                series = cached[1]
+            else:
+                series = self._build_prefixes(metric, labelvalues, child)
+            next_prefixes[labelvalues] = (child, series)
+
+            write_samples(out, created if use_created else None, series, child)
+
+        with self._lock:
+            self._prefixes[metric] = next_prefixes
+
+        if use_created and typ != "gauge":
+            out += f"# HELP {name}_created {documentation}\n# TYPE {name}_created gauge\n".encode()
+            out += created
+
+    @staticmethod
+    def _build_prefixes(
+        metric: metrics.MetricWrapperBase,
+        labelvalues: Sequence[str],
+        child: Any,
+    ) -> tuple[Any, ...]:
+        name = metric._name  # noqa: SLF001
+        labels = dict(zip(metric._labelnames, labelvalues, strict=True))  # noqa: SLF001
+        labelstr = _labelstr(labels)
+        series: tuple[Any, ...]
+
+        if metric._type == "counter":  # noqa: SLF001
+            series = (f"{name}_total".encode() + labelstr + b" ", f"{name}_created".encode() + labelstr + b" ")
+        elif metric._type == "gauge":  # noqa: SLF001
+            series = (name.encode() + labelstr + b" ",)
+        else:
+            bucket_prefixes = [
+                f"{name}_bucket".encode() + _labelstr({**labels, "le": floatToGoString(bound)}) + b" "
+                for bound in child._upper_bounds  # noqa: SLF001
+            ]
+            has_sum = child._upper_bounds[0] >= 0  # noqa: SLF001
+            series = (
+                bucket_prefixes,
+                f"{name}_count".encode() + labelstr + b" ",
+                f"{name}_sum".encode() + labelstr + b" " if has_sum else None,
+                f"{name}_created".encode() + labelstr + b" ",
+            )
+
+        return series
+
+
+_encoder = TextExpositionEncoder()
+
+
+def generate_latest_text(registry: CollectorRegistry) -> bytes:
+    """
+    Generates the metrics of the registry in the Prometheus text format, like generate_latest,
+    with the label strings of the labelled counters, gauges and histograms cached between scrapes.
+
+    :param CollectorRegistry registry: A registry for collect metrics.
+    :returns: bytes
+    """
+
+    return _encoder.encode(registry)
+
+
+def iter_latest_text(registry: CollectorRegistry) -> Iterator[bytes]:
+    """
+    Generates the metrics of the registry in the Prometheus text format, one chunk per metric family.
+
+    :param CollectorRegistry registry: A registry for collect metrics.
+    :returns: Iterator[bytes]
+    """
+
+    return _encoder.iter_encode(registry)
@@ -1,20 +1,32 @@
 # https://habr.com/ru/companies/domclick/articles/773136/
 
+import hashlib
 import os
+from collections.abc import Collection, Iterable, Iterator
 from dataclasses import dataclass
+from functools import cache
+from typing import cast
 
 from prometheus_client import (
     CONTENT_TYPE_LATEST,
     CollectorRegistry,
     generate_latest,
-    multiprocess,
 )
+from prometheus_client.metrics_core import Metric
 from prometheus_client.openmetrics.exposition import CONTENT_TYPE_LATEST as OPENMETRICS_CONTENT_TYPE_LATEST
 from prometheus_client.openmetrics.exposition import generate_latest as openmetrics_generate_latest
+from prometheus_client.registry import Collector
+
+from ._compression import _compress, _compress_stream, _negotiate_encoding
+from .exposition import _MetricsAdapter, generate_latest_text, iter_latest_text
+from .multiprocess import IncrementalMultiProcessCollector
+from .protobuf import CONTENT_TYPE_PROTOBUF, _accepts_protobuf, generate_latest_protobuf, iter_latest_protobuf
 
 __all__ = (
     "MetricsResponse",
+    "MetricsStreamResponse",
     "get_latest_metrics",
+    "stream_latest_metrics",
 )
 
 
@@ -29,30 +41,251 @@ class MetricsResponse:
     payload: bytes
 
 
-def get_latest_metrics(registry: CollectorRegistry, *, openmetrics_format: bool) -> MetricsResponse:
+@dataclass(frozen=True, slots=True)
+class MetricsStreamResponse:
+    """
+    Represents a response containing metrics data, which is rendered lazily, one chunk per metric family.
     """
-    Generates the latest metrics data in either Prometheus or OpenMetrics format.
 
-    :param CollectorRegistry registry: A registry for collect metrics.
-    :param bool openmetrics_format: A flag indicating whether to generate metrics in OpenMetrics format.
-    :returns: MetricsResponse
+    status_code: int
+    headers: dict[str, str]
+    chunks: Iterator[bytes]
+
+
+@cache
+def _get_multiprocess_registry(path: str) -> CollectorRegistry:
+    # The collector is long-lived, so it keeps the parsed state of the files between scrapes
+    registry = CollectorRegistry()
+    IncrementalMultiProcessCollector(path, registry=registry)
+    return registry
+
+
+class _RestrictedRegistry(Collector):
+    """
+    Collects only the samples with the given names, like CollectorRegistry.restricted_registry,
+    but also collects the collectors that do not describe their metrics, such as the multiprocess collector.
     """
 
-    if path := os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
-        registry = CollectorRegistry()
-        multiprocess.MultiProcessCollector(registry, path=path)
+    def __init__(self, names: Collection[str], registry: CollectorRegistry) -> None:
+        self._names = set(names)
+        self._registry = registry
+
+    def collect(self) -> Iterable[Metric]:
+        registry = self._registry
+        target_info_metric = None
+
+        with registry._lock:  # noqa: SLF001
+            if "target_info" in self._names and registry._target_info:  # noqa: SLF001
+                target_info_metric = registry._target_info_metric()  # noqa: SLF001
+
+            names_to_collectors = registry._names_to_collectors  # noqa: SLF001
+            collectors = {names_to_collectors[name] for name in self._names if name in names_to_collectors}
+            collectors.update(
+                collector
+                for collector, names in registry._collector_to_names.items()  # noqa: SLF001
+                if not names
+            )
 
+        if target_info_metric:
+            yield target_info_metric
+
+        for collector in collectors:
+            for metric in collector.collect():
+                if restricted := metric._restricted_metric(self._names):  # noqa: SLF001
+                    yield restricted
+
+
+def _restrict(registry: CollectorRegistry, names: Collection[str] | None) -> CollectorRegistry | Collector:
+    if not names:
+        return registry
+    return _RestrictedRegistry(names, registry)
+
+
+def _render_latest(
+    registry: CollectorRegistry | Collector,
+    *,
+    openmetrics_format: bool,
+    protobuf_format: bool = False,
+) -> tuple[dict[str, str], bytes]:
+    if protobuf_format:
+        return {"Content-Type": CONTENT_TYPE_PROTOBUF}, generate_latest_protobuf(registry)
     if openmetrics_format:
-        headers = {"Content-Type": OPENMETRICS_CONTENT_TYPE_LATEST}
-        return MetricsResponse(
-            headers=headers,
-            status_code=200,
-            payload=openmetrics_generate_latest(registry),
+        return {"Content-Type": OPENMETRICS_CONTENT_TYPE_LATEST}, openmetrics_generate_latest(
+            cast("CollectorRegistry", registry),
         )
+    if isinstance(registry, CollectorRegistry):
+        return {"Content-Type": CONTENT_TYPE_LATEST}, generate_latest_text(registry)
+    return {"Content-Type": CONTENT_TYPE_LATEST}, generate_latest(cast("CollectorRegistry", registry))
+
+
+def _iter_latest(
+    registry: CollectorRegistry | Collector,
+    *,
+    openmetrics_format: bool,
+    protobuf_format: bool = False,
+) -> Iterator[bytes]:
+    if protobuf_format:
+        yield from iter_latest_protobuf(registry)
+    elif openmetrics_format:
+        for metric in registry.collect():
+            payload = openmetrics_generate_latest(_MetricsAdapter((metric,)))
+            yield payload.removesuffix(b"# EOF\n")
+        yield b"# EOF\n"
+    elif isinstance(registry, CollectorRegistry):
+        yield from iter_latest_text(registry)
+    else:
+        for metric in registry.collect():
+            yield generate_latest(_MetricsAdapter((metric,)))  # type: ignore[arg-type]
+
+
+def _etag(payload: bytes) -> str:
+    # Weak, because the same tag is sent for all the content codings of the payload
+    return f'W/"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    opaque_tag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate_tag = candidate.strip()
+        if candidate_tag == "*" or candidate_tag.removeprefix("W/") == opaque_tag:
+            return True
+
+    return False
+
+
+def _vary(*, accept: str | None, accept_encoding: str | None) -> str:
+    # The response depends on the request headers, which were passed
+    vary = {"Accept": accept, "Accept-Encoding": accept_encoding}
+    return ", ".join(name for name, value in vary.items() if value is not None)
+
+
+def _build_response(  # noqa: PLR0913
+    headers: dict[str, str],
+    payload: bytes,
+    *,
+    accept_encoding: str | None,
+    accept: str | None = None,
+    compressed: dict[str, bytes] | None = None,
+    etag: str | None = None,
+    if_none_match: str | None = None,
+) -> MetricsResponse:
+    headers = headers.copy()
+
+    if vary := _vary(accept=accept, accept_encoding=accept_encoding):
+        headers["Vary"] = vary
+
+    if etag is not None:
+        headers["ETag"] = etag
+
+        if _etag_matches(if_none_match, etag):
+            return MetricsResponse(headers=headers, status_code=304, payload=b"")
+
+    if encoding := _negotiate_encoding(accept_encoding):
+        headers["Content-Encoding"] = encoding
+
+        if compressed is None:
+            payload = _compress(payload, encoding)
+        elif encoding in compressed:
+            payload = compressed[encoding]
+        else:
+            payload = compressed[encoding] = _compress(payload, encoding)
 
-    headers = {"Content-Type": CONTENT_TYPE_LATEST}
     return MetricsResponse(
         headers=headers,
         status_code=200,
-        payload=generate_latest(registry),
+        payload=payload,
+    )
+
+
+def get_latest_metrics(  # noqa: PLR0913
+    registry: CollectorRegistry,
+    *,
+    openmetrics_format: bool,
+    accept_encoding: str | None = None,
+    names: Collection[str] | None = None,
+    if_none_match: str | None = None,
+    accept: str | None = None,
+) -> MetricsResponse:
+    """
+    Generates the latest metrics data in either Prometheus or OpenMetrics format.
+    The Prometheus protobuf format is used instead, if the Accept header prefers it.
+    The response has an ETag of the payload, and it is 304 Not Modified without the payload
+    if the tag matches the If-None-Match header.
+
+    :param CollectorRegistry registry: A registry for collect metrics.
+    :param bool openmetrics_format: A flag indicating whether to generate metrics in OpenMetrics format.
+    :param str | None accept_encoding: The Accept-Encoding header of the scrape request.
+        If it allows gzip (or zstd, when the zstandard package is installed), the payload is compressed.
+    :param Collection[str] | None names: The names of the samples to render, from the name[] query parameters.
+        All the samples are rendered if it is empty.
+    :param str | None if_none_match: The If-None-Match header of the scrape request.
+    :param str | None accept: The Accept header of the scrape request.
+    :returns: MetricsResponse
+    """
+
+    if path := os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = _get_multiprocess_registry(path)
+
+    headers, payload = _render_latest(
+        _restrict(registry, names),
+        openmetrics_format=openmetrics_format,
+        protobuf_format=_accepts_protobuf(accept),
+    )
+    return _build_response(
+        headers,
+        payload,
+        accept_encoding=accept_encoding,
+        accept=accept,
+        etag=_etag(payload),
+        if_none_match=if_none_match,
     )
+
+
+def stream_latest_metrics(
+    registry: CollectorRegistry,
+    *,
+    openmetrics_format: bool,
+    accept_encoding: str | None = None,
+    names: Collection[str] | None = None,
+    accept: str | None = None,
+) -> MetricsStreamResponse:
+    """
+    Generates the latest metrics data in either Prometheus or OpenMetrics format, like get_latest_metrics,
+    but the payload is rendered and compressed lazily, one metric family at a time,
+    so the whole exposition is never held in memory.
+
+    :param CollectorRegistry registry: A registry for collect metrics.
+    :param bool openmetrics_format: A flag indicating whether to generate metrics in OpenMetrics format.
+    :param str | None accept_encoding: The Accept-Encoding header of the scrape request.
+    :param Collection[str] | None names: The names of the samples to render, all of them if it is empty.
+    :param str | None accept: The Accept header of the scrape request.
+    :returns: MetricsStreamResponse
+    """
+
+    if path := os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = _get_multiprocess_registry(path)
+
+    protobuf_format = _accepts_protobuf(accept)
+    if protobuf_format:
+        content_type = CONTENT_TYPE_PROTOBUF
+    else:
+        content_type = OPENMETRICS_CONTENT_TYPE_LATEST if openmetrics_format else CONTENT_TYPE_LATEST
+
+    headers = {"Content-Type": content_type}
+    chunks = _iter_latest(
+        _restrict(registry, names),
+        openmetrics_format=openmetrics_format,
+        protobuf_format=protobuf_format,
+    )
+
+    if vary := _vary(accept=accept, accept_encoding=accept_encoding):
+        headers["Vary"] = vary
+
+    if encoding := _negotiate_encoding(accept_encoding):
+        headers["Content-Encoding"] = encoding
+        chunks = _compress_stream(chunks, encoding)
+
+    return MetricsStreamResponse(status_code=200, headers=headers, chunks=chunks)
@@ -1,5 +1,8 @@
 from .config import BaseMetricsConfig
 from .container import MetricsContainer
+from .otel import OpenTelemetryMetricsContainer
+from .shared_memory import SharedMemoryMetricsContainer
+from .statsd import StatsdMetricsContainer
 
 __all__ = (
     "MetricsManager",
@@ -92,7 +95,34 @@ class MetricsManager:
             exception_type=exception_type,
         ).inc()
 
+    def close(self) -> None:
+        self._container.close()
+
 
 def build_metrics_manager(config: BaseMetricsConfig) -> MetricsManager:
-    container = MetricsContainer(config.metrics_prefix, config.registry)
+    backends = [
+        name
+        for name, backend in (
+            ("shared_memory", config.shared_memory),
+            ("meter_provider", config.meter_provider),
+            ("statsd", config.statsd),
+        )
+        if backend is not None
+    ]
+    if len(backends) > 1:
+        raise ValueError(f"Only one of the metrics backends can be configured, got {', '.join(backends)}")
+
+    container: MetricsContainer
+    if config.shared_memory is not None:
+        container = SharedMemoryMetricsContainer(config.metrics_prefix, config.registry, config.shared_memory)
+    elif config.meter_provider is not None:
+        container = OpenTelemetryMetricsContainer(config.metrics_prefix, config.registry, config.meter_provider)
+    elif config.statsd is not None:
+        container = StatsdMetricsContainer(config.metrics_prefix, config.registry, config.statsd)
+    else:
+        container = MetricsContainer(
+            config.metrics_prefix,
+            config.registry,
+            native_histogram_schema=config.native_histogram_schema,
+        )
     return MetricsManager(app_name=config.app_name, container=container)
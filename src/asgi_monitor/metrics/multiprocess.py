@@ -0,0 +1,230 @@
+import contextlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from prometheus_client import CollectorRegistry
+from prometheus_client.metrics_core import Metric
+from prometheus_client.mmap_dict import MmapedDict
+from prometheus_client.multiprocess import MultiProcessCollector, mark_process_dead
+from prometheus_client.registry import Collector
+
+if sys.platform != "win32":
+    import fcntl
+
+__all__ = (
+    "IncrementalMultiProcessCollector",
+    "compact_dead_process",
+    "gunicorn_child_exit",
+)
+
+
+_unpack_integer = struct.Struct("i").unpack_from
+_unpack_two_doubles = struct.Struct("dd").unpack_from
+
+_LOCK_FILENAME = "asgi_monitor.lock"
+_ARCHIVED_TYPES = ("counter", "histogram", "summary")  # the values of these types are summed up between processes
+
+_Entry = tuple[str, str, str, tuple[tuple[str, str], ...], int]  # metric_name, help_text, name, labels, value position
+
+
+@contextlib.contextmanager
+def _directory_lock(path: Path, *, exclusive: bool) -> Iterator[None]:
+    # Scrapes must not see a dead process in both its own files and the archive
+    if sys.platform == "win32":  # pragma: no cover
+        yield
+        return
+
+    with (path / _LOCK_FILENAME).open("a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class _FileState:
+    __slots__ = ("inode", "parsed_until", "entries")
+
+    def __init__(self, inode: tuple[int, int]) -> None:
+        self.inode = inode
+        self.parsed_until = 8  # The first 8 bytes are the used size and padding
+        self.entries: list[_Entry] = []
+
+
+class IncrementalMultiProcessCollector(Collector):
+    """
+    Long-lived collector for the prometheus_client multiprocess mode.
+
+    Files are memory-mapped instead of being read, and the keys of every file are parsed only once.
+    The layout of a file is append-only, so on the next collection only the entries added since
+    then are parsed and the values are read directly from their known positions.
+    """
+
+    def __init__(self, path: str, registry: CollectorRegistry | None = None) -> None:
+        if not Path(path).is_dir():
+            raise ValueError(f"{path!r} is not a directory")
+
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._files: dict[Path, _FileState] = {}
+        self._keys: dict[bytes, tuple[str, str, tuple[tuple[str, str], ...], str]] = {}
+
+        if registry:
+            registry.register(self)
+
+    def collect(self) -> Iterable[Metric]:
+        with self._lock, _directory_lock(self._path, exclusive=False):
+            files = list(self._path.glob("*.db"))
+            metrics: dict[str, Any] = {}
+
+            for path in files:
+                self._read_file(path, metrics)
+
+            for path in self._files.keys() - set(files):
+                del self._files[path]
+
+            return list(MultiProcessCollector._accumulate_metrics(metrics, accumulate=True))  # noqa: SLF001
+
+    def _read_file(self, path: Path, metrics: dict[str, Any]) -> None:
+        parts = path.name.split("_")
+        typ = parts[0]
+
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            # The file can be deleted between the glob and now (via mark_process_dead or a compaction)
+            self._files.pop(path, None)
+            return
+
+        try:
+            stat = os.fstat(fd)
+            if stat.st_size == 0:
+                return
+
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as data:
+                state = self._files.get(path)
+                inode = (stat.st_dev, stat.st_ino)
+
+                if state is None or state.inode != inode:
+                    state = self._files[path] = _FileState(inode)
+
+                used = _unpack_integer(data, 0)[0]
+                if used < state.parsed_until:  # the file was rewritten in place
+                    state = self._files[path] = _FileState(inode)
+
+                self._parse_entries(state, data, min(used, len(data)))
+                self._add_samples(state, data, typ, parts, metrics)
+        finally:
+            os.close(fd)
+
+    def _parse_entries(self, state: _FileState, data: mmap.mmap, used: int) -> None:
+        pos = state.parsed_until
+
+        while pos + 4 <= used:
+            encoded_len = _unpack_integer(data, pos)[0]
+            padded_len = encoded_len + (8 - (encoded_len + 4) % 8)
+            value_pos = pos + 4 + padded_len
+
+            if value_pos + 16 > used:  # the entry is not fully written or mapped yet
+                break
+
+            encoded_key = data[pos + 4 : pos + 4 + encoded_len]
+            metric_name, name, labels, help_text = self._parse_key(encoded_key)
+            state.entries.append((metric_name, help_text, name, labels, value_pos))
+            pos = value_pos + 16
+
+        state.parsed_until = pos
+
+    def _parse_key(self, encoded_key: bytes) -> tuple[str, str, tuple[tuple[str, str], ...], str]:
+        key = self._keys.get(encoded_key)
+
+        if key is None:
+            metric_name, name, labels, help_text = json.loads(encoded_key)
+            key = self._keys[encoded_key] = (metric_name, name, tuple(sorted(labels.items())), help_text)
+
+        return key
+
+    @staticmethod
+    def _add_samples(
+        state: _FileState,
+        data: mmap.mmap,
+        typ: str,
+        parts: list[str],
+        metrics: dict[str, Any],
+    ) -> None:
+        is_gauge = typ == "gauge"
+        pid_label = (("pid", parts[2][:-3]),) if is_gauge else ()
+
+        for metric_name, help_text, name, labels, value_pos in state.entries:
+            value, timestamp = _unpack_two_doubles(data, value_pos)
+
+            metric: Any = metrics.get(metric_name)
+            if metric is None:
+                metric = metrics[metric_name] = Metric(metric_name, help_text, typ)
+
+            if is_gauge:
+                metric._multiprocess_mode = parts[1]  # noqa: SLF001
+                metric.add_sample(name, labels + pid_label, value, timestamp)
+            else:
+                # The duplicates and labels are fixed in the accumulation.
+                metric.add_sample(name, labels, value)
+
+
+def compact_dead_process(pid: int, path: str | None = None) -> None:
+    """
+    Folds the counters, histograms and summaries of a dead process into the archive files of the multiprocess
+    directory and removes the files of the process, including the files of its live gauges.
+    This keeps the number of files to merge on each scrape flat when workers are recycled.
+
+    :param int pid: The pid of the dead process.
+    :param str | None path: The multiprocess directory. Default is the PROMETHEUS_MULTIPROC_DIR environment variable.
+    :returns: None
+    """
+
+    directory = Path(path or os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+    with _directory_lock(directory, exclusive=True):
+        mark_process_dead(pid, str(directory))
+
+        for typ in _ARCHIVED_TYPES:
+            dead_file = directory / f"{typ}_{pid}.db"
+            if not dead_file.exists():
+                continue
+
+            archive_file = directory / f"{typ}_archive.db"
+            values: dict[str, float] = defaultdict(float)
+
+            for file in (archive_file, dead_file):
+                if file.exists():
+                    for key, value, _, _ in MmapedDict.read_all_values_from_file(str(file)):
+                        values[key] += value
+
+            tmp_file = directory / f"{typ}_archive.db.tmp"  # does not match the *.db pattern of collectors
+            tmp_file.unlink(missing_ok=True)
+            archive = MmapedDict(str(tmp_file))
+            try:
+                for key, value in values.items():
+                    archive.write_value(key, value, 0.0)
+            finally:
+                archive.close()
+
+            tmp_file.replace(archive_file)
+            dead_file.unlink()
+
+
+def gunicorn_child_exit(server: Any, worker: Any) -> None:
+    """
+    Gunicorn child_exit server hook, that compacts the multiprocess files of the exited worker.
+    It does nothing if the PROMETHEUS_MULTIPROC_DIR environment variable is not set.
+    """
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        compact_dead_process(worker.pid)
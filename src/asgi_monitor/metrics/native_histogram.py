@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any
+
+from prometheus_client import REGISTRY, CollectorRegistry, Histogram
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+__all__ = (
+    "DEFAULT_ZERO_THRESHOLD",
+    "NativeHistogram",
+    "NativeHistogramState",
+)
+
+DEFAULT_ZERO_THRESHOLD = 2.0**-128
+"""The width of the zero bucket, the same as in the Go client."""
+
+_MIN_SCHEMA = -4
+_MAX_SCHEMA = 8
+
+# The lower bounds of the buckets within one power of two, for the positive schemas
+_BOUNDS = {schema: [0.5 * 2.0 ** (index / 2**schema) for index in range(2**schema)] for schema in range(1, 9)}
+
+
+def _bucket_index(value: float, schema: int) -> int:
+    # The bucket with the index i covers the range (base^(i-1), base^i], where base is 2^(2^-schema)
+    frac, exp = math.frexp(value)
+
+    if schema > 0:
+        bounds = _BOUNDS[schema]
+        return bisect_left(bounds, frac) + (exp - 1) * len(bounds)
+
+    index = exp - 1 if frac == 0.5 else exp  # noqa: PLR2004
+    offset = (1 << -schema) - 1
+    return (index + offset) >> -schema
+
+
+def _double_bucket_width(buckets: dict[int, int]) -> dict[int, int]:
+    merged: dict[int, int] = {}
+    for index, count in buckets.items():
+        key = (index + 1) // 2 if index > 0 else -(-index // 2)
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+class NativeHistogramState:
+    """
+    A consistent snapshot of the sparse exponential buckets of a native histogram,
+    along with the classic buckets of the same observations.
+    """
+
+    __slots__ = (
+        "schema",
+        "zero_threshold",
+        "zero_count",
+        "count",
+        "sum",
+        "positive",
+        "negative",
+        "classic",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        schema: int,
+        zero_threshold: float,
+        zero_count: int,
+        count: int,
+        sum: float,  # noqa: A002
+        positive: dict[int, int],
+        negative: dict[int, int],
+        classic: list[tuple[float, float, Any]],
+    ) -> None:
+        self.schema = schema
+        self.zero_threshold = zero_threshold
+        self.zero_count = zero_count
+        self.count = count
+        self.sum = sum
+        self.positive = positive
+        self.negative = negative
+        self.classic = classic
+
+
+class NativeHistogram(Histogram):
+    """
+    A Histogram, which also tracks the observations in sparse exponential buckets (native histogram).
+
+    The classic buckets are exposed in the text formats, and both the classic and the native buckets
+    are exposed in the Prometheus protobuf format.
+    The resolution is reduced, if the number of the native buckets exceeds max_buckets.
+    The native buckets are not shared between processes in the multiprocess mode.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        namespace: str = "",
+        subsystem: str = "",
+        unit: str = "",
+        registry: CollectorRegistry | None = REGISTRY,
+        _labelvalues: Sequence[str] | None = None,
+        buckets: Sequence[float | str] = Histogram.DEFAULT_BUCKETS,
+        schema: int = 3,
+        zero_threshold: float = DEFAULT_ZERO_THRESHOLD,
+        max_buckets: int = 160,
+    ) -> None:
+        if not _MIN_SCHEMA <= schema <= _MAX_SCHEMA:
+            msg = f"Native histogram schema must be between {_MIN_SCHEMA} and {_MAX_SCHEMA}, got {schema}"
+            raise ValueError(msg)
+
+        # The children are initialized by the base constructor, so the settings are set beforehand
+        self._initial_schema = schema
+        self._zero_threshold = zero_threshold
+        self._max_buckets = max_buckets
+        super().__init__(
+            name=name,
+            documentation=documentation,
+            labelnames=labelnames,
+            namespace=namespace,
+            subsystem=subsystem,
+            unit=unit,
+            registry=registry,
+            _labelvalues=_labelvalues,
+            buckets=buckets,
+        )
+        self._kwargs.update(schema=schema, zero_threshold=zero_threshold, max_buckets=max_buckets)
+
+    def _metric_init(self) -> None:
+        super()._metric_init()
+        self._native_lock = threading.Lock()
+        self._schema = self._initial_schema
+        self._zero_count = 0
+        self._count = 0
+        self._native_sum = 0.0
+        self._positive: dict[int, int] = {}
+        self._negative: dict[int, int] = {}
+
+    def observe(self, amount: float, exemplar: dict[str, str] | None = None) -> None:
+        self._raise_if_not_observable()
+
+        with self._native_lock:
+            super().observe(amount, exemplar)
+            self._count += 1
+            self._native_sum += amount
+
+            if abs(amount) <= self._zero_threshold:
+                self._zero_count += 1
+                return
+
+            buckets = self._positive if amount > 0 else self._negative
+            index = _bucket_index(abs(amount), self._schema)
+            buckets[index] = buckets.get(index, 0) + 1
+
+            if self._max_buckets and len(self._positive) + len(self._negative) > self._max_buckets:
+                self._reduce_resolution()
+
+    def native_state(self) -> NativeHistogramState:
+        """
+        Returns the native and the classic buckets of this child, recorded by the same observations.
+
+        :returns: NativeHistogramState
+        """
+
+        self._raise_if_not_observable()
+
+        with self._native_lock:
+            classic = [
+                (bound, bucket.get(), bucket.get_exemplar())
+                for bound, bucket in zip(self._upper_bounds, self._buckets, strict=True)
+            ]
+            return NativeHistogramState(
+                schema=self._schema,
+                zero_threshold=self._zero_threshold,
+                zero_count=self._zero_count,
+                count=self._count,
+                sum=self._native_sum,
+                positive=self._positive.copy(),
+                negative=self._negative.copy(),
+                classic=classic,
+            )
+
+    def _reduce_resolution(self) -> None:
+        while self._schema > _MIN_SCHEMA and len(self._positive) + len(self._negative) > self._max_buckets:
+            self._schema -= 1
+            self._positive = _double_bucket_width(self._positive)
+            self._negative = _double_bucket_width(self._negative)
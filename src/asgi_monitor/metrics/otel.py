@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+from typing import TYPE_CHECKING, Any
+
+from opentelemetry.sdk.metrics.export import (
+    Gauge,
+    Histogram,
+    MetricReader,
+    MetricsData,
+    Sum,
+)
+from prometheus_client.metrics_core import Metric
+from prometheus_client.utils import floatToGoString
+
+from .container import MetricsContainer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
+    from opentelemetry.metrics import Counter, MeterProvider, UpDownCounter
+    from opentelemetry.metrics import Histogram as HistogramInstrument
+    from opentelemetry.sdk.metrics.export import Metric as OpenTelemetryMetric
+    from prometheus_client import CollectorRegistry
+
+__all__ = (
+    "OpenTelemetryMetricReader",
+    "OpenTelemetryMetricsContainer",
+)
+
+_METER_NAME = "asgi_monitor"
+
+_INVALID_NAME_CHARACTERS = re.compile(r"[^a-zA-Z0-9_:]")
+_INVALID_LABEL_CHARACTERS = re.compile(r"[^a-zA-Z0-9_]")
+
+# The suffixes of the OpenTelemetry units, as in the Prometheus exporter of OpenTelemetry
+_UNIT_SUFFIXES = {
+    "s": "seconds",
+    "ms": "milliseconds",
+    "us": "microseconds",
+    "ns": "nanoseconds",
+    "By": "bytes",
+    "KiBy": "kibibytes",
+    "MiBy": "mebibytes",
+    "min": "minutes",
+    "h": "hours",
+    "%": "percent",
+}
+
+
+class _OpenTelemetryChild:
+    __slots__ = ("_instrument", "_attributes", "_scale")
+
+    def __init__(self, instrument: Any, attributes: dict[str, str], scale: float) -> None:
+        self._instrument = instrument
+        self._attributes = attributes
+        self._scale = scale
+
+    def inc(self, amount: float = 1) -> None:
+        self._instrument.add(amount, self._attributes)
+
+    def dec(self, amount: float = 1) -> None:
+        self._instrument.add(-amount, self._attributes)
+
+    def observe(self, amount: float, exemplar: dict[str, str] | None = None) -> None:
+        # The SDK samples the exemplars of the current span by itself
+        self._instrument.record(amount * self._scale, self._attributes)
+
+
+class _OpenTelemetryMetric:
+    __slots__ = ("_instrument", "_labelnames", "_scale", "_children")
+
+    def __init__(
+        self,
+        instrument: Counter | UpDownCounter | HistogramInstrument,
+        labelnames: list[str],
+        scale: float = 1,
+    ) -> None:
+        self._instrument = instrument
+        self._labelnames = labelnames
+        self._scale = scale
+        self._children: dict[tuple[str, ...], _OpenTelemetryChild] = {}
+
+    def labels(self, **labels: Any) -> _OpenTelemetryChild:
+        labelvalues = tuple(str(labels[name]) for name in self._labelnames)
+        child = self._children.get(labelvalues)
+
+        if child is None:
+            # The attributes of a route are built once and passed to the instrument as is on each update
+            attributes = dict(zip(self._labelnames, labelvalues, strict=True))
+            child = self._children[labelvalues] = _OpenTelemetryChild(self._instrument, attributes, self._scale)
+        return child
+
+    def clear(self) -> None:
+        self._children.clear()
+
+
+class OpenTelemetryMetricsContainer(MetricsContainer):
+    """
+    Metrics container that records the request metrics through the instruments of an OpenTelemetry meter
+    instead of the registry, so they are exported by the readers of the meter provider, for example, OTLP.
+    The instruments are created once, and the attributes are built once per label set.
+    """
+
+    __slots__ = ("_meter",)
+
+    def __init__(self, prefix: str, registry: CollectorRegistry, meter_provider: MeterProvider) -> None:
+        super().__init__(prefix, registry)
+        self._meter = meter_provider.get_meter(_METER_NAME)
+
+        # The instruments are created upfront, so the first requests do not register them
+        self.app_info()
+        self.request_count()
+        self.response_count()
+        self.request_duration()
+        self.requests_in_progress()
+        self.requests_exceptions_count()
+
+    def _otel_metric(
+        self,
+        name: str,
+        labelnames: list[str],
+        instrument: Callable[[], Any],
+        scale: float = 1,
+    ) -> Any:
+        if name not in self._metrics:
+            self._metrics[name] = _OpenTelemetryMetric(instrument(), labelnames, scale)  # type: ignore[assignment]
+        return self._metrics[name]
+
+    def app_info(self) -> Any:
+        name = f"{self._prefix}_app_info"
+        return self._otel_metric(
+            name,
+            ["app_name"],
+            lambda: self._meter.create_up_down_counter(name, description="ASGI application information"),
+        )
+
+    def request_count(self) -> Any:
+        name = f"{self._prefix}_requests_total"
+        return self._otel_metric(
+            name,
+            ["app_name", "method", "path"],
+            lambda: self._meter.create_counter(name, description="Total count of requests by method and path"),
+        )
+
+    def response_count(self) -> Any:
+        name = f"{self._prefix}_responses_total"
+        return self._otel_metric(
+            name,
+            ["app_name", "method", "path", "status_code"],
+            lambda: self._meter.create_counter(
+                name,
+                description="Total count of responses by method, path and status codes",
+            ),
+        )
+
+    def request_duration(self) -> Any:
+        # The default buckets of the SDK (0, 5, 10, 25, ..., 10000) are meant for milliseconds,
+        # so the durations in seconds are recorded in milliseconds to spread over them
+        name = f"{self._prefix}_request_duration_milliseconds"
+        return self._otel_metric(
+            name,
+            ["app_name", "method", "path"],
+            lambda: self._meter.create_histogram(
+                name,
+                unit="ms",
+                description="Histogram of request duration by path, in milliseconds",
+            ),
+            scale=1000,
+        )
+
+    def requests_in_progress(self) -> Any:
+        name = f"{self._prefix}_requests_in_progress"
+        return self._otel_metric(
+            name,
+            ["app_name", "method", "path"],
+            lambda: self._meter.create_up_down_counter(
+                name,
+                description="Gauge of requests by method and path currently being processed",
+            ),
+        )
+
+    def requests_exceptions_count(self) -> Any:
+        name = f"{self._prefix}_requests_exceptions_total"
+        return self._otel_metric(
+            name,
+            ["app_name", "method", "path", "exception_type"],
+            lambda: self._meter.create_counter(
+                name,
+                description="Total count of exceptions raised by path and exception type",
+            ),
+        )
+
+
+def _sanitize_name(name: str) -> str:
+    name = _INVALID_NAME_CHARACTERS.sub("_", name)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _sanitize_labels(attributes: Mapping[str, Any] | None) -> dict[str, str]:
+    labels = {}
+    for key, value in (attributes or {}).items():
+        name = _INVALID_LABEL_CHARACTERS.sub("_", key)
+        labels[f"_{name}" if name[:1].isdigit() else name] = str(value)
+    return labels
+
+
+def _metric_name(metric: OpenTelemetryMetric) -> str:
+    name = _sanitize_name(metric.name)
+    suffix = _UNIT_SUFFIXES.get(metric.unit or "")
+
+    if suffix is not None and not name.endswith(f"_{suffix}"):
+        name = f"{name}_{suffix}"
+    return name
+
+
+def _convert(metric: OpenTelemetryMetric) -> Metric | None:
+    name = _metric_name(metric)
+    documentation = metric.description or ""
+    data = metric.data
+
+    if isinstance(data, Sum) and data.is_monotonic:
+        name = name.removesuffix("_total")
+        family = Metric(name, documentation, "counter")
+        for point in data.data_points:
+            family.add_sample(f"{name}_total", _sanitize_labels(point.attributes), point.value)
+        return family
+
+    if isinstance(data, Sum | Gauge):
+        family = Metric(name, documentation, "gauge")
+        for point in data.data_points:
+            family.add_sample(name, _sanitize_labels(point.attributes), point.value)
+        return family
+
+    if isinstance(data, Histogram):
+        family = Metric(name, documentation, "histogram")
+        for point in data.data_points:
+            labels = _sanitize_labels(point.attributes)
+            cumulative = 0
+            for bound, count in zip([*point.explicit_bounds, math.inf], point.bucket_counts, strict=True):
+                cumulative += count
+                # The same le as the native histograms of prometheus_client, for example, 1e+06 and +Inf
+                family.add_sample(f"{name}_bucket", {**labels, "le": floatToGoString(bound)}, cumulative)
+            family.add_sample(f"{name}_count", labels, point.count)
+            family.add_sample(f"{name}_sum", labels, point.sum)
+        return family
+
+    # The exponential histograms have no equivalent in the text formats
+    return None
+
+
+class _OpenTelemetryCollector:
+    def __init__(self, reader: OpenTelemetryMetricReader) -> None:
+        self._reader = reader
+
+    def describe(self) -> list[Metric]:
+        # The instruments are not known upfront, so their names are not checked for duplicates on registration
+        return []
+
+    def collect(self) -> Iterable[Metric]:
+        metrics_data = self._reader.read()
+        if metrics_data is None:
+            return
+
+        for resource_metrics in metrics_data.resource_metrics:
+            for scope_metrics in resource_metrics.scope_metrics:
+                for metric in scope_metrics.metrics:
+                    family = _convert(metric)
+                    if family is not None and family.samples:
+                        yield family
+
+
+class OpenTelemetryMetricReader(MetricReader):
+    """
+    An OpenTelemetry metric reader, which exposes the metrics of a meter provider through a prometheus_client registry,
+    so they are rendered by the /metrics endpoint along with the metrics of the registry, in one pass.
+
+    The metrics are collected from the SDK only when the registry is collected, so there is no second HTTP exporter.
+    The sums are exposed as counters (monotonic) or gauges, and the explicit bucket histograms as histograms.
+    The attributes become the labels, and the unit is appended to the name,
+    for example, http.server.duration in ms is exposed as http_server_duration_milliseconds.
+    """
+
+    def __init__(self, registry: CollectorRegistry) -> None:
+        # The default temporality of all instruments is cumulative, as Prometheus expects
+        super().__init__()
+        self._lock = threading.Lock()
+        self._metrics_data: MetricsData | None = None
+        registry.register(_OpenTelemetryCollector(self))  # type: ignore[arg-type]
+
+    def read(self) -> MetricsData | None:
+        """
+        Collects the current state of the meter provider.
+
+        :returns: MetricsData | None
+        """
+
+        with self._lock:
+            self.collect()
+            metrics_data, self._metrics_data = self._metrics_data, None
+        return metrics_data
+
+    def _receive_metrics(self, metrics_data: MetricsData, timeout_millis: float = 10_000, **kwargs: Any) -> None:
+        self._metrics_data = metrics_data
+
+    def shutdown(self, timeout_millis: float = 30_000, **kwargs: Any) -> None:
+        pass
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import math
+import struct
+from typing import TYPE_CHECKING, Any
+
+from prometheus_client import CollectorRegistry, metrics
+
+from .native_histogram import NativeHistogram
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from prometheus_client.metrics_core import Metric
+    from prometheus_client.registry import Collector
+    from prometheus_client.samples import Exemplar
+
+__all__ = (
+    "CONTENT_TYPE_PROTOBUF",
+    "generate_latest_protobuf",
+    "iter_latest_protobuf",
+)
+
+CONTENT_TYPE_PROTOBUF = "application/vnd.google.protobuf; proto=io.prometheus.client.MetricFamily; encoding=delimited"
+"""The content type of the delimited io.prometheus.client.MetricFamily messages."""
+
+_MEDIA_TYPE = "application/vnd.google.protobuf"
+_PROTO = "io.prometheus.client.MetricFamily"
+
+# io.prometheus.client.MetricType
+_COUNTER = 0
+_GAUGE = 1
+_SUMMARY = 2
+_UNTYPED = 3
+_HISTOGRAM = 4
+_GAUGE_HISTOGRAM = 5
+
+_FAMILY_TYPES = {
+    "counter": _COUNTER,
+    "gauge": _GAUGE,
+    "info": _GAUGE,
+    "stateset": _GAUGE,
+    "summary": _SUMMARY,
+    "histogram": _HISTOGRAM,
+    "gaugehistogram": _GAUGE_HISTOGRAM,
+    "unknown": _UNTYPED,
+}
+
+# The fields of io.prometheus.client.Metric, which hold a value of the family type
+_VALUE_FIELDS = {_COUNTER: 3, _GAUGE: 2, _SUMMARY: 4, _UNTYPED: 5, _HISTOGRAM: 7, _GAUGE_HISTOGRAM: 7}
+
+_WIRE_VARINT = 0
+_WIRE_I64 = 1
+_WIRE_LEN = 2
+
+
+def _accepts_protobuf(accept: str | None) -> bool:
+    # The first media range with the highest quality wins, as in the content negotiation of the Go client
+    if not accept:
+        return False
+
+    best_quality = 0.0
+    best_is_protobuf = False
+
+    for media_range in accept.split(","):
+        media_type, *parts = (part.strip() for part in media_range.split(";"))
+        params = {name.strip(): value.strip() for name, _, value in (part.partition("=") for part in parts)}
+
+        try:
+            quality = float(params.pop("q", "1"))
+        except ValueError:
+            continue
+
+        if quality > best_quality:
+            best_quality = quality
+            best_is_protobuf = (
+                media_type == _MEDIA_TYPE and params.get("proto") == _PROTO and params.get("encoding") == "delimited"
+            )
+
+    return best_is_protobuf
+
+
+def _varint(value: int) -> bytes:
+    value &= 0xFFFFFFFFFFFFFFFF  # negative int64 are encoded as ten bytes of two's complement
+    out = bytearray()
+    while value > 0x7F:  # noqa: PLR2004
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _tag(field: int, wire_type: int) -> bytes:
+    return _varint(field << 3 | wire_type)
+
+
+def _uint(field: int, value: int) -> bytes:
+    return _tag(field, _WIRE_VARINT) + _varint(value)
+
+
+def _sint(field: int, value: int) -> bytes:
+    return _tag(field, _WIRE_VARINT) + _varint(value << 1 if value >= 0 else (-value << 1) - 1)
+
+
+def _double(field: int, value: float) -> bytes:
+    return _tag(field, _WIRE_I64) + struct.pack("<d", value)
+
+
+def _message(field: int, payload: bytes) -> bytes:
+    return _tag(field, _WIRE_LEN) + _varint(len(payload)) + payload
+
+
+def _string(field: int, value: str) -> bytes:
+    return _message(field, value.encode())
+
+
+def _timestamp(field: int, value: float) -> bytes:
+    seconds = math.floor(value)
+    return _message(field, _uint(1, seconds) + _uint(2, round((value - seconds) * 1e9)))
+
+
+def _labels(labels: dict[str, str] | tuple[tuple[str, str], ...]) -> bytes:
+    pairs = sorted(labels.items()) if isinstance(labels, dict) else sorted(labels)
+    return b"".join(_message(1, _string(1, name) + _string(2, value)) for name, value in pairs)
+
+
+def _exemplar(field: int, exemplar: Exemplar | None) -> bytes:
+    if exemplar is None:
+        return b""
+
+    payload = _labels(exemplar.labels) + _double(2, exemplar.value)
+    if exemplar.timestamp is not None:
+        payload += _timestamp(3, float(exemplar.timestamp))
+    return _message(field, payload)
+
+
+def _family(name: str, documentation: str, typ: int, series: list[bytes]) -> bytes:
+    if not series:
+        return b""
+
+    payload = _string(1, name) + _string(2, documentation) + _uint(3, typ)
+    payload += b"".join(_message(4, metric) for metric in series)
+    return _varint(len(payload)) + payload
+
+
+def _series(
+    samples: list[Any],
+    name: str,
+    excluded_label: str | None = None,
+) -> dict[tuple[tuple[str, str], ...], dict[str, Any]]:
+    # Groups the samples of a family by the labels of the series, the suffixes of the sample names are the keys
+    grouped: dict[tuple[tuple[str, str], ...], dict[str, Any]] = {}
+
+    for sample in samples:
+        labels = tuple((label, value) for label, value in sample.labels.items() if label != excluded_label)
+        entry = grouped.setdefault(labels, {"samples": [], "timestamp": sample.timestamp})
+        entry["samples"].append(sample)
+        entry[sample.name.removeprefix(name)] = sample
+
+    return grouped
+
+
+def _encode_counter(metric: Metric) -> list[bytes]:
+    series = []
+    for labels, entry in _series(metric.samples, metric.name).items():
+        if (total := entry.get("_total")) is None:
+            continue
+
+        payload = _double(1, total.value) + _exemplar(2, total.exemplar)
+        if (created := entry.get("_created")) is not None:
+            payload += _timestamp(3, created.value)
+        series.append(_with_timestamp(_labels(labels) + _message(3, payload), total.timestamp))
+    return series
+
+
+def _encode_summary(metric: Metric) -> list[bytes]:
+    series = []
+    for labels, entry in _series(metric.samples, metric.name, "quantile").items():
+        payload = _summary_totals(entry)
+        for sample in entry["samples"]:
+            if sample.name == metric.name and "quantile" in sample.labels:
+                payload += _message(3, _double(1, float(sample.labels["quantile"])) + _double(2, sample.value))
+        if (created := entry.get("_created")) is not None:
+            payload += _timestamp(4, created.value)
+        series.append(_with_timestamp(_labels(labels) + _message(4, payload), entry["timestamp"]))
+    return series
+
+
+def _summary_totals(entry: dict[str, Any]) -> bytes:
+    payload = b""
+    if (count := entry.get("_count", entry.get("_gcount"))) is not None:
+        payload += _uint(1, int(count.value))
+    if (total := entry.get("_sum", entry.get("_gsum"))) is not None:
+        payload += _double(2, total.value)
+    return payload
+
+
+def _encode_histogram(metric: Metric) -> list[bytes]:
+    series = []
+    for labels, entry in _series(metric.samples, metric.name, "le").items():
+        payload = _summary_totals(entry)
+        for sample in entry["samples"]:
+            if sample.name == f"{metric.name}_bucket":
+                bucket = _uint(1, int(sample.value)) + _double(2, float(sample.labels["le"]))
+                payload += _message(3, bucket + _exemplar(3, sample.exemplar))
+        if (created := entry.get("_created")) is not None:
+            payload += _timestamp(15, created.value)
+        series.append(_with_timestamp(_labels(labels) + _message(7, payload), entry["timestamp"]))
+    return series
+
+
+def _encode_value(metric: Metric, typ: int) -> list[bytes]:
+    return [
+        _with_timestamp(
+            _labels(sample.labels) + _message(_VALUE_FIELDS[typ], _double(1, sample.value)),
+            sample.timestamp,
+        )
+        for sample in metric.samples
+    ]
+
+
+def _with_timestamp(payload: bytes, timestamp: Any) -> bytes:
+    if timestamp is None:
+        return payload
+    return payload + _uint(6, round(float(timestamp) * 1000))
+
+
+def _encode_metric(metric: Metric) -> bytes:
+    typ = _FAMILY_TYPES.get(metric.type, _UNTYPED)
+    name = metric.name
+
+    if typ == _COUNTER:
+        name, series = f"{name}_total", _encode_counter(metric)
+    elif typ == _SUMMARY:
+        series = _encode_summary(metric)
+    elif typ in (_HISTOGRAM, _GAUGE_HISTOGRAM):
+        series = _encode_histogram(metric)
+    else:
+        if metric.type == "info":
+            name = f"{name}_info"
+        series = _encode_value(metric, typ)
+
+    return _family(name, metric.documentation, typ, series)
+
+
+def _spans(field: int, delta_field: int, buckets: dict[int, int]) -> bytes:
+    spans: list[list[int]] = []
+    deltas = b""
+    previous_index = previous_count = 0
+
+    for index in sorted(buckets):
+        count = buckets[index]
+        if spans and index == previous_index + 1:
+            spans[-1][1] += 1
+        else:
+            spans.append([index - previous_index - 1 if spans else index, 1])
+        deltas += _sint(delta_field, count - previous_count)
+        previous_index, previous_count = index, count
+
+    return b"".join(_message(field, _sint(1, offset) + _uint(2, length)) for offset, length in spans) + deltas
+
+
+def _encode_native_histogram(histogram: NativeHistogram) -> bytes:
+    if histogram._is_parent():  # noqa: SLF001
+        with histogram._lock:  # noqa: SLF001
+            children: list[tuple[Any, NativeHistogram]] = list(histogram._metrics.items())  # type: ignore[arg-type]  # noqa: SLF001
+    else:
+        children = [((), histogram)]
+
+    series = []
+    for labelvalues, child in children:
+        state = child.native_state()
+        payload = _uint(1, state.count) + _double(2, state.sum)
+
+        accumulated = 0.0
+        for bound, count, exemplar in state.classic:
+            accumulated += count
+            payload += _message(3, _uint(1, int(accumulated)) + _double(2, bound) + _exemplar(3, exemplar))
+
+        payload += _sint(5, state.schema) + _double(6, state.zero_threshold) + _uint(7, state.zero_count)
+        payload += _spans(9, 10, state.negative) + _spans(12, 13, state.positive)
+
+        if not (state.zero_threshold or state.zero_count or state.positive or state.negative):
+            # An empty span marks the histogram as native, when it has no buckets yet
+            payload += _message(12, _sint(1, 0) + _uint(2, 0))
+
+        if metrics._use_created:  # noqa: SLF001
+            payload += _timestamp(15, child._created)  # noqa: SLF001
+
+        labels = tuple(zip(histogram._labelnames, labelvalues, strict=True))  # noqa: SLF001
+        series.append(_labels(labels) + _message(7, payload))
+
+    return _family(histogram._name, histogram._documentation, _HISTOGRAM, series)  # noqa: SLF001
+
+
+def iter_latest_protobuf(registry: CollectorRegistry | Collector) -> Iterator[bytes]:
+    """
+    Generates the metrics of the registry in the Prometheus protobuf format,
+    one length-delimited io.prometheus.client.MetricFamily message per metric family.
+    The native histograms of the registry are exposed with both the classic and the sparse buckets.
+
+    :param CollectorRegistry | Collector registry: A registry for collect metrics.
+    :returns: Iterator[bytes]
+    """
+
+    if not isinstance(registry, CollectorRegistry):
+        for metric in registry.collect():
+            if family := _encode_metric(metric):
+                yield family
+        return
+
+    with registry._lock:  # noqa: SLF001
+        collectors = list(registry._collector_to_names)  # noqa: SLF001
+        target_info = registry._target_info_metric() if registry._target_info else None  # noqa: SLF001
+
+    if target_info is not None:
+        yield _encode_metric(target_info)
+
+    for collector in collectors:
+        if isinstance(collector, NativeHistogram):
+            family = _encode_native_histogram(collector)
+            if family:
+                yield family
+            continue
+
+        for metric in collector.collect():
+            if family := _encode_metric(metric):
+                yield family
+
+
+def generate_latest_protobuf(registry: CollectorRegistry | Collector) -> bytes:
+    """
+    Generates the metrics of the registry in the Prometheus protobuf format.
+
+    :param CollectorRegistry | Collector registry: A registry for collect metrics.
+    :returns: bytes
+    """
+
+    return b"".join(iter_latest_protobuf(registry))
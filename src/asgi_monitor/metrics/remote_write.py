@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from ._snappy import _snappy_compress
+from .protobuf import _double, _message, _string, _uint
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from prometheus_client import CollectorRegistry
+    from prometheus_client.metrics_core import Metric
+    from prometheus_client.samples import Sample
+
+__all__ = (
+    "RemoteWriteConfig",
+    "RemoteWriteExporter",
+    "start_remote_write",
+)
+
+logger = logging.getLogger(__name__)
+
+# prometheus.MetricMetadata.MetricType
+_METADATA_TYPES = {
+    "counter": 1,
+    "gauge": 2,
+    "histogram": 3,
+    "gaugehistogram": 4,
+    "summary": 5,
+    "info": 6,
+    "stateset": 7,
+}
+
+_CREATED_TYPES = ("counter", "histogram", "summary", "gaugehistogram")
+
+
+@dataclass(slots=True, frozen=True)
+class RemoteWriteConfig:
+    """Configuration of the Prometheus remote-write exporter."""
+
+    url: str
+    """The remote-write endpoint, for example, http://prometheus:9090/api/v1/write."""
+
+    interval: float = field(default=15.0)
+    """The interval between the pushes of the registry, in seconds."""
+
+    timeout: float = field(default=10.0)
+    """The timeout of a single remote-write request, in seconds."""
+
+    max_series_per_request: int = field(default=2000)
+    """The maximum number of series in one remote-write request, the registry is split into several requests."""
+
+    max_pending_requests: int = field(default=32)
+    """
+    The maximum number of the encoded requests, which wait to be sent.
+    The oldest requests are dropped, if the endpoint is unavailable for a long time.
+    """
+
+    max_retries: int = field(default=3)
+    """The number of retries of a request, which failed with a network error, 429 or 5xx status."""
+
+    retry_backoff: float = field(default=0.5)
+    """The delay before the first retry, in seconds, it is doubled for each next retry."""
+
+    external_labels: Mapping[str, str] = field(default_factory=dict)
+    """The labels added to all series, for example, the job and instance labels."""
+
+    headers: Mapping[str, str] = field(default_factory=dict)
+    """The extra headers of the requests, for example, Authorization."""
+
+
+class _RetryableError(Exception):
+    pass
+
+
+def _labels(labels: Mapping[str, str]) -> bytes:
+    # The remote-write protocol requires the labels to be sorted by name
+    return b"".join(_message(1, _string(1, name) + _string(2, value)) for name, value in sorted(labels.items()))
+
+
+def _timeseries(sample: Sample, external_labels: Mapping[str, str], timestamp_ms: int) -> bytes:
+    if sample.timestamp is not None:
+        timestamp_ms = round(float(sample.timestamp) * 1000)
+
+    payload = _labels({**external_labels, **sample.labels, "__name__": sample.name})
+    payload += _message(2, _double(1, sample.value) + _uint(2, timestamp_ms))
+
+    if (exemplar := sample.exemplar) is not None:
+        exemplar_ms = timestamp_ms if exemplar.timestamp is None else round(float(exemplar.timestamp) * 1000)
+        payload += _message(3, _labels(exemplar.labels) + _double(2, exemplar.value) + _uint(3, exemplar_ms))
+
+    return _message(1, payload)
+
+
+def _metadata(metric: Metric) -> bytes:
+    payload = _uint(1, _METADATA_TYPES.get(metric.type, 0)) + _string(2, metric.name) + _string(4, metric.documentation)
+    if metric.unit:
+        payload += _string(5, metric.unit)
+    return _message(3, payload)
+
+
+def _encode_write_requests(
+    registry: CollectorRegistry,
+    *,
+    external_labels: Mapping[str, str],
+    max_series_per_request: int,
+) -> list[bytes]:
+    """
+    Encodes the registry as prometheus.WriteRequest messages with at most max_series_per_request series each.
+    The metadata of the metric families is sent with the first request.
+    """
+
+    timestamp_ms = round(time.time() * 1000)
+    series: list[bytes] = []
+    metadata: list[bytes] = []
+
+    for metric in registry.collect():
+        metadata.append(_metadata(metric))
+        created = f"{metric.name}_created" if metric.type in _CREATED_TYPES else None
+        series.extend(
+            _timeseries(sample, external_labels, timestamp_ms) for sample in metric.samples if sample.name != created
+        )
+
+    requests = [
+        b"".join(series[start : start + max_series_per_request])
+        for start in range(0, len(series), max_series_per_request)
+    ] or [b""]
+    requests[0] += b"".join(metadata)
+    return [request for request in requests if request]
+
+
+class RemoteWriteExporter:
+    """
+    Pushes the registry to a Prometheus remote-write endpoint from a background thread.
+
+    Every interval the registry is encoded into snappy-compressed requests of at most max_series_per_request series,
+    which are queued and sent in order with retries.
+    The queue is bounded by max_pending_requests, so the memory stays bounded while the endpoint is unavailable.
+    """
+
+    __slots__ = ("_registry", "_config", "_pending", "_lock", "_stop_event", "_thread")
+
+    def __init__(self, registry: CollectorRegistry, config: RemoteWriteConfig) -> None:
+        self._registry = registry
+        self._config = config
+        self._pending: deque[bytes] = deque()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="asgi-monitor-remote-write", daemon=True)
+
+    @property
+    def pending_requests(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def collect(self) -> None:
+        """Encodes the current state of the registry and queues it to be sent."""
+
+        requests = _encode_write_requests(
+            self._registry,
+            external_labels=self._config.external_labels,
+            max_series_per_request=self._config.max_series_per_request,
+        )
+
+        with self._lock:
+            for request in requests:
+                if len(self._pending) >= self._config.max_pending_requests:
+                    self._pending.popleft()
+                    logger.warning("The remote-write queue is full, the oldest request is dropped")
+                self._pending.append(_snappy_compress(request))
+
+    def flush(self) -> bool:
+        """
+        Sends the queued requests in order.
+        The sending stops at the first request, which could not be delivered, so it is retried on the next flush.
+
+        :returns: bool
+        """
+
+        with self._lock:
+            while self._pending:
+                try:
+                    self._send(self._pending[0])
+                except _RetryableError:
+                    logger.warning("Failed to push the metrics to %s, retrying on the next flush", self._config.url)
+                    return False
+                self._pending.popleft()
+
+        return True
+
+    def stop(self, *, flush: bool = True) -> None:
+        """
+        Stops the background thread and pushes the final state of the registry.
+
+        :param bool flush: Whether to push the registry before stopping.
+        :returns: None
+        """
+
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+        if flush:
+            self.collect()
+            self.flush()
+
+    async def shutdown(self) -> None:
+        """Stops the exporter in the default executor, so the final push does not block the event loop."""
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.stop)
+
+    def _send(self, payload: bytes) -> None:
+        request = urllib.request.Request(  # noqa: S310
+            self._config.url,
+            data=payload,
+            method="POST",
+            headers={
+                "Content-Encoding": "snappy",
+                "Content-Type": "application/x-protobuf",
+                "User-Agent": "asgi-monitor",
+                "X-Prometheus-Remote-Write-Version": "0.1.0",
+                **self._config.headers,
+            },
+        )
+        delay = self._config.retry_backoff
+
+        for attempt in range(self._config.max_retries + 1):
+            try:
+                with urllib.request.urlopen(request, timeout=self._config.timeout):  # noqa: S310
+                    return
+            except urllib.error.HTTPError as exc:
+                if exc.code != 429 and exc.code < 500:  # noqa: PLR2004
+                    # The request will never be accepted, as in Prometheus, it is dropped
+                    logger.error("The remote-write request was rejected with the status %s", exc.code)  # noqa: TRY400
+                    return
+            except OSError:
+                pass
+
+            if attempt < self._config.max_retries:
+                time.sleep(delay)
+                delay *= 2
+
+        raise _RetryableError
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._config.interval):
+            self._safe_push()
+
+    def _safe_push(self) -> None:
+        try:
+            self.collect()
+            self.flush()
+        except Exception:
+            logger.exception("Failed to push the metrics")
+
+
+def start_remote_write(registry: CollectorRegistry, config: RemoteWriteConfig) -> RemoteWriteExporter:
+    """
+    Starts pushing the registry to a Prometheus remote-write endpoint from a daemon thread.
+    Call RemoteWriteExporter.shutdown on the application shutdown to push the final state.
+
+    :param CollectorRegistry registry: A registry for collect metrics.
+    :param RemoteWriteConfig config: Configuration of the exporter.
+    :returns: RemoteWriteExporter
+    """
+
+    exporter = RemoteWriteExporter(registry, config)
+    exporter.start()
+    return exporter
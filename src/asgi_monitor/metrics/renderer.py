@@ -0,0 +1,196 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Collection, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+from prometheus_client import CollectorRegistry, Histogram
+
+from .container import MetricsContainer
+from .get_latest import MetricsResponse, get_latest_metrics, stream_latest_metrics
+
+__all__ = (
+    "AsyncMetricsStreamResponse",
+    "MetricsRenderer",
+    "build_metrics_renderer",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class AsyncMetricsStreamResponse:
+    """
+    Represents a streaming response containing metrics data, which chunks are rendered in the render thread pool.
+    """
+
+    status_code: int
+    headers: dict[str, str]
+    chunks: AsyncIterator[bytes]
+
+
+class MetricsRenderer:
+    """
+    Renders the latest metrics in a dedicated thread pool,
+    so that collecting and encoding the registry does not block the event loop.
+    """
+
+    __slots__ = ("_registry", "_openmetrics_format", "_executor", "_scrape_duration")
+
+    def __init__(
+        self,
+        registry: CollectorRegistry,
+        *,
+        openmetrics_format: bool,
+        scrape_duration: Histogram,
+        max_workers: int = 1,
+    ) -> None:
+        self._registry = registry
+        self._openmetrics_format = openmetrics_format
+        self._scrape_duration = scrape_duration
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asgi-monitor-metrics")
+
+    async def render(
+        self,
+        *,
+        accept_encoding: str | None = None,
+        names: Collection[str] | None = None,
+        if_none_match: str | None = None,
+        accept: str | None = None,
+    ) -> MetricsResponse:
+        """
+        Generates the latest metrics data in the render thread pool.
+
+        :param str | None accept_encoding: The Accept-Encoding header of the scrape request.
+        :param Collection[str] | None names: The names of the samples to render, all of them if it is empty.
+        :param str | None if_none_match: The If-None-Match header of the scrape request.
+        :param str | None accept: The Accept header of the scrape request.
+        :returns: MetricsResponse
+        """
+
+        loop = asyncio.get_running_loop()
+        before_time = time.perf_counter()  # the time waiting for a free thread of the pool is measured too
+
+        try:
+            return await loop.run_in_executor(
+                self._executor,
+                partial(
+                    self._render,
+                    accept_encoding=accept_encoding,
+                    names=names,
+                    if_none_match=if_none_match,
+                    accept=accept,
+                ),
+            )
+        finally:
+            self._scrape_duration.observe(time.perf_counter() - before_time)
+
+    def render_sync(
+        self,
+        *,
+        accept_encoding: str | None = None,
+        names: Collection[str] | None = None,
+        if_none_match: str | None = None,
+        accept: str | None = None,
+    ) -> MetricsResponse:
+        """
+        Generates the latest metrics data in the calling thread, for example, in the thread of a metrics server.
+
+        :param str | None accept_encoding: The Accept-Encoding header of the scrape request.
+        :param Collection[str] | None names: The names of the samples to render, all of them if it is empty.
+        :param str | None if_none_match: The If-None-Match header of the scrape request.
+        :param str | None accept: The Accept header of the scrape request.
+        :returns: MetricsResponse
+        """
+
+        before_time = time.perf_counter()
+
+        try:
+            return self._render(
+                accept_encoding=accept_encoding,
+                names=names,
+                if_none_match=if_none_match,
+                accept=accept,
+            )
+        finally:
+            self._scrape_duration.observe(time.perf_counter() - before_time)
+
+    def close(self) -> None:
+        """
+        Shuts down the render thread pool, for example, at the shutdown of the application.
+
+        :returns: None
+        """
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _render(
+        self,
+        *,
+        accept_encoding: str | None,
+        names: Collection[str] | None,
+        if_none_match: str | None,
+        accept: str | None,
+    ) -> MetricsResponse:
+        return get_latest_metrics(
+            self._registry,
+            openmetrics_format=self._openmetrics_format,
+            accept_encoding=accept_encoding,
+            names=names,
+            if_none_match=if_none_match,
+            accept=accept,
+        )
+
+    def stream(
+        self,
+        *,
+        accept_encoding: str | None = None,
+        names: Collection[str] | None = None,
+        accept: str | None = None,
+    ) -> AsyncMetricsStreamResponse:
+        """
+        Generates the latest metrics data lazily, one metric family at a time, in the render thread pool.
+
+        :param str | None accept_encoding: The Accept-Encoding header of the scrape request.
+        :param Collection[str] | None names: The names of the samples to render, all of them if it is empty.
+        :param str | None accept: The Accept header of the scrape request.
+        :returns: AsyncMetricsStreamResponse
+        """
+
+        response = stream_latest_metrics(
+            self._registry,
+            openmetrics_format=self._openmetrics_format,
+            accept_encoding=accept_encoding,
+            names=names,
+            accept=accept,
+        )
+        return AsyncMetricsStreamResponse(
+            status_code=response.status_code,
+            headers=response.headers,
+            chunks=self._iterate(response.chunks),
+        )
+
+    async def _iterate(self, chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        before_time = time.perf_counter()
+
+        try:
+            while (chunk := await loop.run_in_executor(self._executor, next, chunks, None)) is not None:
+                yield chunk
+        finally:
+            self._scrape_duration.observe(time.perf_counter() - before_time)
+
+
+def build_metrics_renderer(
+    registry: CollectorRegistry,
+    *,
+    metrics_prefix: str,
+    openmetrics_format: bool,
+    max_workers: int = 1,
+) -> MetricsRenderer:
+    container = MetricsContainer(metrics_prefix, registry)
+    return MetricsRenderer(
+        registry,
+        openmetrics_format=openmetrics_format,
+        scrape_duration=container.scrape_duration(),
+        max_workers=max_workers,
+    )
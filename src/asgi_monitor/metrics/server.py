@@ -0,0 +1,136 @@
+import socket
+import socketserver
+import threading
+from collections.abc import Collection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Protocol
+from urllib.parse import parse_qs, urlsplit
+
+from .get_latest import MetricsResponse
+
+__all__ = (
+    "RenderMetrics",
+    "MetricsServer",
+    "start_metrics_server",
+)
+
+
+class RenderMetrics(Protocol):
+    def __call__(
+        self,
+        *,
+        accept_encoding: str | None,
+        names: Collection[str] | None,
+        if_none_match: str | None,
+        accept: str | None,
+    ) -> MetricsResponse: ...
+
+
+class _IPv6HTTPServer(ThreadingHTTPServer):
+    address_family = socket.AF_INET6
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    render: RenderMetrics
+
+    def do_GET(self) -> None:  # noqa: N802
+        names = parse_qs(urlsplit(self.path).query).get("name[]")
+        response = self.render(
+            accept_encoding=self.headers.get("Accept-Encoding"),
+            names=names,
+            if_none_match=self.headers.get("If-None-Match"),
+            accept=self.headers.get("Accept"),
+        )
+
+        self.send_response(response.status_code)
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(response.payload)))
+        self.end_headers()
+        self.wfile.write(response.payload)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        # Scrapes are not logged, the client address is also unknown for a unix socket
+        pass
+
+
+class MetricsServer:
+    """
+    Minimal HTTP server that serves the metrics from a daemon thread,
+    independently of the event loop and the middlewares of the application.
+    """
+
+    __slots__ = ("_server", "_thread", "_unix_socket")
+
+    def __init__(
+        self,
+        render: RenderMetrics,
+        *,
+        host: str = "0.0.0.0",  # noqa: S104
+        port: int | None = None,
+        unix_socket: str | None = None,
+    ) -> None:
+        if (port is None) == (unix_socket is None):
+            raise ValueError("Exactly one of port or unix_socket must be specified")
+
+        handler = type("MetricsRequestHandler", (_MetricsRequestHandler,), {"render": staticmethod(render)})
+        self._unix_socket = unix_socket
+        self._server: socketserver.BaseServer
+
+        if unix_socket is not None:
+            Path(unix_socket).unlink(missing_ok=True)
+            self._server = _UnixHTTPServer(unix_socket, handler)
+        elif ":" in host:
+            self._server = _IPv6HTTPServer((host, port), handler)  # type: ignore[arg-type]
+        else:
+            self._server = ThreadingHTTPServer((host, port), handler)  # type: ignore[arg-type]
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="asgi-monitor-metrics-server",
+            daemon=True,
+        )
+
+    @property
+    def address(self) -> Any:
+        """The address the server is bound to: the unix socket path or a (host, port) tuple."""
+
+        return self._server.server_address
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+        if self._unix_socket is not None:
+            Path(self._unix_socket).unlink(missing_ok=True)
+
+
+def start_metrics_server(
+    render: RenderMetrics,
+    *,
+    host: str = "0.0.0.0",  # noqa: S104
+    port: int | None = None,
+    unix_socket: str | None = None,
+) -> MetricsServer:
+    """
+    Start serving metrics on a dedicated port or unix socket from a daemon thread.
+
+    :param RenderMetrics render: Callback that renders the metrics for a scrape.
+    :param str host: The host to bind the port to.
+    :param int | None port: The port to serve the metrics on.
+    :param str | None unix_socket: The path of the unix socket to serve the metrics on.
+    :returns: MetricsServer
+    """
+
+    server = MetricsServer(render, host=host, port=port, unix_socket=unix_socket)
+    server.start()
+    return server
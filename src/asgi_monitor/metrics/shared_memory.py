@@ -0,0 +1,522 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import struct
+import sys
+import tempfile
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+from prometheus_client import Histogram
+from prometheus_client.metrics_core import Metric
+from prometheus_client.registry import Collector
+from prometheus_client.utils import INF, floatToGoString
+
+from .container import MetricsContainer
+
+if sys.platform != "win32":
+    import fcntl
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from prometheus_client import CollectorRegistry
+
+__all__ = (
+    "SharedMemoryConfig",
+    "SharedMemoryMetricsContainer",
+    "unlink_shared_memory",
+)
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"ASGIMON1"
+_HEADER = struct.Struct("8sQQQQQ")  # magic, capacity, max processes, index size, used slots, used index bytes
+_HEADER_SIZE = 64
+_USED_SLOTS_OFFSET = 32
+_USED_INDEX_OFFSET = 40
+_UINT64 = struct.Struct("Q")
+_UINT32 = struct.Struct("I")
+
+_COUNTER = "counter"
+_GAUGE_SUM = "gauge_sum"
+_GAUGE_MAX = "gauge_max"
+_HISTOGRAM = "histogram"
+_HISTOGRAM_SUM = "sum"
+
+
+@dataclass(slots=True, frozen=True)
+class SharedMemoryConfig:
+    """Configuration of the shared memory segment for the metrics of all application processes."""
+
+    name: str
+    """The name of the shared memory segment, the same for all processes of the application."""
+
+    capacity: int = field(default=16384)
+    """
+    The maximum number of series slots. A counter or gauge series takes one slot,
+    a histogram series takes one slot per bucket plus one for the sum.
+    """
+
+    max_processes: int = field(default=64)
+    """The maximum number of processes writing to the segment at the same time."""
+
+    index_size: int = field(default=4 * 1024 * 1024)
+    """The size of the series index in bytes."""
+
+
+def _open(name: str, *, create: bool = False, size: int = 0) -> SharedMemory:
+    # The segment outlives the process, otherwise the resource tracker of each worker unlinks it on exit
+    if sys.version_info >= (3, 13):  # pragma: no cover
+        return SharedMemory(name=name, create=create, size=size, track=False)
+
+    shm = SharedMemory(name=name, create=create, size=size)
+    resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]  # noqa: SLF001
+    return shm
+
+
+def _attach(name: str, size: int) -> tuple[SharedMemory, bool]:
+    try:
+        return _open(name, create=True, size=size), True
+    except FileExistsError:
+        return _open(name), False
+
+
+def unlink_shared_memory(name: str) -> None:
+    """
+    Removes the shared memory segment of the metrics, for example, when the Gunicorn master exits.
+
+    :param str name: The name of the shared memory segment.
+    :returns: None
+    """
+
+    with contextlib.suppress(FileNotFoundError):
+        shm = SharedMemory(name=name)  # tracked, the registration is removed by unlink
+        shm.close()
+        shm.unlink()
+    _lock_path(name).unlink(missing_ok=True)
+
+
+def _lock_path(name: str) -> Path:
+    return Path(tempfile.gettempdir()) / f"{name.lstrip('/')}.lock"
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _Segment:
+    """
+    Layout of the segment: the header, the pid of each process lane, the series index and the float64 slots.
+    Each process writes only to its own lane, so updates only take a lock of the process,
+    and the exposition sums the lanes of one contiguous buffer.
+    Slots of the series are assigned from the shared index under a file lock.
+    """
+
+    def __init__(self, config: SharedMemoryConfig) -> None:
+        self._config = config
+        self._lanes_offset = _HEADER_SIZE
+        self._index_offset = self._lanes_offset + config.max_processes * 8
+        index_size = config.index_size + (-config.index_size % 8)
+        self._data_offset = self._index_offset + index_size
+        size = self._data_offset + config.max_processes * config.capacity * 8
+
+        with self._lock():
+            self._shm, created = _attach(config.name, size)
+            self._buf = cast("memoryview", self._shm.buf)
+            if created:
+                _HEADER.pack_into(self._buf, 0, _MAGIC, config.capacity, config.max_processes, index_size, 0, 0)
+            else:
+                magic, capacity, max_processes, existing_index_size, _, _ = _HEADER.unpack_from(self._buf, 0)
+                if (magic, capacity, max_processes, existing_index_size) != (
+                    _MAGIC,
+                    config.capacity,
+                    config.max_processes,
+                    index_size,
+                ):
+                    raise ValueError(f"Shared memory segment {config.name!r} has a different layout")
+
+        self._data = self._buf.cast("d")
+        self._records: list[tuple[str, str, str, tuple[tuple[str, str], ...], str]] = []
+        self._slots: dict[bytes, int] = {}
+        self._index_cursor = 0
+        self._lane_base: int | None = None
+        self._add_lock = threading.Lock()
+
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    @contextlib.contextmanager
+    def _lock(self) -> Iterator[None]:
+        if sys.platform == "win32":  # pragma: no cover
+            yield
+            return
+
+        with _lock_path(self._config.name).open("a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _after_fork(self) -> None:
+        self._lane_base = None
+        self._add_lock = threading.Lock()
+
+    def add(self, slot: int, amount: float) -> None:
+        # The threads of the process share its lane, so the read-modify-write is guarded
+        with self._add_lock:
+            base = self._lane_base
+            if base is None:
+                base = self._claim_lane()
+            self._data[base + slot] += amount
+
+    def slot(
+        self,
+        typ: str,
+        name: str,
+        documentation: str,
+        labels: tuple[tuple[str, str], ...],
+        part: str,
+    ) -> int | None:
+        slots = self.slots(typ, name, documentation, labels, [part])
+        return None if slots is None else slots[0]
+
+    def slots(
+        self,
+        typ: str,
+        name: str,
+        documentation: str,
+        labels: tuple[tuple[str, str], ...],
+        parts: list[str],
+    ) -> list[int] | None:
+        # All slots of a series (the buckets and the sum of a histogram) are reserved at once or none of them,
+        # so a full segment does not leave a histogram without some of its buckets
+        keys = [json.dumps([typ, name, documentation, labels, part]).encode() for part in parts]
+
+        with self._lock():
+            self._sync_index()
+            missing = [key for key in keys if key not in self._slots]
+
+            if missing:
+                used_slots = _UINT64.unpack_from(self._buf, _USED_SLOTS_OFFSET)[0]
+                used_index = _UINT64.unpack_from(self._buf, _USED_INDEX_OFFSET)[0]
+                records_size = sum(_UINT32.size + len(key) for key in missing)
+
+                if (
+                    used_slots + len(missing) > self._config.capacity
+                    or used_index + records_size > self._config.index_size
+                ):
+                    logger.warning(
+                        "Shared memory segment %r is full, the series %s is dropped",
+                        self._config.name,
+                        keys[0],
+                    )
+                    return None
+
+                position = self._index_offset + used_index
+                for key in missing:
+                    _UINT32.pack_into(self._buf, position, len(key))
+                    self._buf[position + _UINT32.size : position + _UINT32.size + len(key)] = key
+                    position += _UINT32.size + len(key)
+                _UINT64.pack_into(self._buf, _USED_INDEX_OFFSET, used_index + records_size)
+                _UINT64.pack_into(self._buf, _USED_SLOTS_OFFSET, used_slots + len(missing))
+
+                self._sync_index()
+
+            return [self._slots[key] for key in keys]
+
+    def _sync_index(self) -> None:
+        used_index = _UINT64.unpack_from(self._buf, _USED_INDEX_OFFSET)[0]
+
+        while self._index_cursor < used_index:
+            position = self._index_offset + self._index_cursor
+            key_len = _UINT32.unpack_from(self._buf, position)[0]
+            key = bytes(self._buf[position + _UINT32.size : position + _UINT32.size + key_len])
+
+            typ, name, documentation, labels, part = json.loads(key)
+            self._slots[key] = len(self._records)
+            self._records.append((typ, name, documentation, tuple(map(tuple, labels)), part))
+            self._index_cursor += _UINT32.size + key_len
+
+    def _claim_lane(self) -> int:
+        pid = os.getpid()
+
+        with self._lock():
+            self._sync_index()
+
+            for lane in range(self._config.max_processes):
+                offset = self._lanes_offset + lane * 8
+                owner = _UINT64.unpack_from(self._buf, offset)[0]
+                if owner and _is_alive(owner):
+                    continue
+
+                base = self._data_offset // 8 + lane * self._config.capacity
+                for slot, record in enumerate(self._records):
+                    if record[0] in (_GAUGE_SUM, _GAUGE_MAX):  # gauges of a dead process are not inherited
+                        self._data[base + slot] = 0.0
+
+                _UINT64.pack_into(self._buf, offset, pid)
+                self._lane_base = base
+                return base
+
+        raise RuntimeError(f"All {self._config.max_processes} lanes of the shared memory segment are in use")
+
+    def snapshot(self) -> tuple[list[tuple[str, str, str, tuple[tuple[str, str], ...], str]], list[float]]:
+        with self._lock():
+            self._sync_index()
+            records = list(self._records)
+            lanes = [
+                (lane, _is_alive(owner))
+                for lane in range(self._config.max_processes)
+                if (owner := _UINT64.unpack_from(self._buf, self._lanes_offset + lane * 8)[0])
+            ]
+
+        used = len(records)
+        totals = [0.0] * used
+        maximums = [0.0] * used
+        gauges = [record[0] in (_GAUGE_SUM, _GAUGE_MAX) for record in records]
+
+        for lane, alive in lanes:
+            base = self._data_offset // 8 + lane * self._config.capacity
+            values = self._data[base : base + used].tolist()
+
+            for slot, value in enumerate(values):
+                if not gauges[slot]:
+                    totals[slot] += value
+                elif alive:
+                    totals[slot] += value
+                    maximums[slot] = max(maximums[slot], value)
+
+        return records, [maximums[slot] if records[slot][0] == _GAUGE_MAX else totals[slot] for slot in range(used)]
+
+
+class _NoopChild:
+    __slots__ = ()
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, amount: float, exemplar: dict[str, str] | None = None) -> None:
+        pass
+
+
+class _SharedValueChild:
+    __slots__ = ("_segment", "_slot")
+
+    def __init__(self, segment: _Segment, slot: int) -> None:
+        self._segment = segment
+        self._slot = slot
+
+    def inc(self, amount: float = 1) -> None:
+        self._segment.add(self._slot, amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._segment.add(self._slot, -amount)
+
+
+class _SharedHistogramChild:
+    __slots__ = ("_segment", "_upper_bounds", "_bucket_slots", "_sum_slot")
+
+    def __init__(self, segment: _Segment, upper_bounds: list[float], bucket_slots: list[int], sum_slot: int) -> None:
+        self._segment = segment
+        self._upper_bounds = upper_bounds
+        self._bucket_slots = bucket_slots
+        self._sum_slot = sum_slot
+
+    def observe(self, amount: float, exemplar: dict[str, str] | None = None) -> None:
+        # Exemplars are not stored in shared memory
+        self._segment.add(self._sum_slot, amount)
+        self._segment.add(self._bucket_slots[bisect_left(self._upper_bounds, amount)], 1.0)
+
+
+class _SharedMetric:
+    __slots__ = ("_segment", "_typ", "_name", "_documentation", "_labelnames", "_upper_bounds", "_children")
+
+    def __init__(  # noqa: PLR0913
+        self,
+        segment: _Segment,
+        typ: str,
+        name: str,
+        documentation: str,
+        labelnames: list[str],
+        upper_bounds: list[float] | None = None,
+    ) -> None:
+        self._segment = segment
+        self._typ = typ
+        self._name = name
+        self._documentation = documentation
+        self._labelnames = labelnames
+        self._upper_bounds = upper_bounds or []
+        self._children: dict[tuple[str, ...], Any] = {}
+
+    def labels(self, **labels: Any) -> Any:
+        labelvalues = tuple(str(labels[name]) for name in self._labelnames)
+        child = self._children.get(labelvalues)
+
+        if child is None:
+            child = self._children[labelvalues] = self._build_child(
+                tuple(zip(self._labelnames, labelvalues, strict=True))
+            )
+        return child
+
+    def clear(self) -> None:
+        self._children.clear()
+
+    def _build_child(self, labels: tuple[tuple[str, str], ...]) -> Any:
+        if self._typ != _HISTOGRAM:
+            slot = self._segment.slot(self._typ, self._name, self._documentation, labels, "")
+            return _NoopChild() if slot is None else _SharedValueChild(self._segment, slot)
+
+        slots = self._segment.slots(
+            _HISTOGRAM,
+            self._name,
+            self._documentation,
+            labels,
+            [*map(floatToGoString, self._upper_bounds), _HISTOGRAM_SUM],
+        )
+        if slots is None:
+            return _NoopChild()
+        return _SharedHistogramChild(self._segment, self._upper_bounds, slots[:-1], slots[-1])
+
+
+class _SharedMemoryCollector(Collector):
+    def __init__(self, segment: _Segment) -> None:
+        self._segment = segment
+
+    def describe(self) -> Iterable[Metric]:
+        # The series are created by other processes, so the names are not known in advance
+        return []
+
+    def collect(self) -> Iterable[Metric]:
+        records, values = self._segment.snapshot()
+        metrics: dict[str, Metric] = {}
+        histograms: dict[str, dict[tuple[tuple[str, str], ...], list[tuple[str, float]]]] = {}
+
+        for (typ, name, documentation, labels, part), value in zip(records, values, strict=True):
+            if typ == _COUNTER:
+                family = name.removesuffix("_total")
+                metric = metrics.setdefault(family, Metric(family, documentation, "counter"))
+                metric.add_sample(f"{family}_total", dict(labels), value)
+            elif typ == _HISTOGRAM:
+                metrics.setdefault(name, Metric(name, documentation, "histogram"))
+                histograms.setdefault(name, {}).setdefault(labels, []).append((part, value))
+            else:
+                metric = metrics.setdefault(name, Metric(name, documentation, "gauge"))
+                metric.add_sample(name, dict(labels), value)
+
+        for name, series in histograms.items():
+            metric = metrics[name]
+            for labels, parts in series.items():
+                accumulated = 0.0
+                total = 0.0
+                for part, value in parts:
+                    if part == _HISTOGRAM_SUM:
+                        total = value
+                        continue
+                    accumulated += value
+                    metric.add_sample(f"{name}_bucket", {**dict(labels), "le": part}, accumulated)
+                metric.add_sample(f"{name}_count", dict(labels), accumulated)
+                metric.add_sample(f"{name}_sum", dict(labels), total)
+
+        return metrics.values()
+
+
+class SharedMemoryMetricsContainer(MetricsContainer):
+    """
+    Metrics container that stores the request metrics in a shared memory segment of fixed-layout float64 slots.
+    All workers of the application update the same segment,
+    and the exposition reads it as one contiguous buffer, regardless of the number of per-process files.
+    Exemplars and the _created samples are not supported.
+    """
+
+    __slots__ = ("_segment",)
+
+    def __init__(self, prefix: str, registry: CollectorRegistry, config: SharedMemoryConfig) -> None:
+        super().__init__(prefix, registry)
+        self._segment = _Segment(config)
+        registry.register(_SharedMemoryCollector(self._segment))
+
+    def _shared_metric(
+        self,
+        typ: str,
+        name: str,
+        documentation: str,
+        labelnames: list[str],
+        upper_bounds: list[float] | None = None,
+    ) -> Any:
+        if name not in self._metrics:
+            self._metrics[name] = _SharedMetric(  # type: ignore[assignment]
+                self._segment,
+                typ,
+                name,
+                documentation,
+                labelnames,
+                upper_bounds,
+            )
+        return self._metrics[name]
+
+    def app_info(self) -> Any:
+        return self._shared_metric(
+            _GAUGE_MAX,
+            f"{self._prefix}_app_info",
+            "ASGI application information",
+            ["app_name"],
+        )
+
+    def request_count(self) -> Any:
+        return self._shared_metric(
+            _COUNTER,
+            f"{self._prefix}_requests_total",
+            "Total count of requests by method and path",
+            ["app_name", "method", "path"],
+        )
+
+    def response_count(self) -> Any:
+        return self._shared_metric(
+            _COUNTER,
+            f"{self._prefix}_responses_total",
+            "Total count of responses by method, path and status codes",
+            ["app_name", "method", "path", "status_code"],
+        )
+
+    def request_duration(self) -> Any:
+        return self._shared_metric(
+            _HISTOGRAM,
+            f"{self._prefix}_request_duration_seconds",
+            "Histogram of request duration by path, in seconds",
+            ["app_name", "method", "path"],
+            [float(bound) for bound in Histogram.DEFAULT_BUCKETS if bound != INF] + [INF],
+        )
+
+    def requests_in_progress(self) -> Any:
+        return self._shared_metric(
+            _GAUGE_SUM,
+            f"{self._prefix}_requests_in_progress",
+            "Gauge of requests by method and path currently being processed",
+            ["app_name", "method", "path"],
+        )
+
+    def requests_exceptions_count(self) -> Any:
+        return self._shared_metric(
+            _COUNTER,
+            f"{self._prefix}_requests_exceptions_total",
+            "Total count of exceptions raised by path and exception type",
+            ["app_name", "method", "path", "exception_type"],
+        )
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import socket
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from .container import MetricsContainer
+
+if TYPE_CHECKING:
+    from prometheus_client import CollectorRegistry
+
+__all__ = (
+    "StatsdConfig",
+    "StatsdMetricsContainer",
+)
+
+logger = logging.getLogger(__name__)
+
+_COUNTER = b"c"
+_GAUGE = b"g"
+_TIMER = b"ms"
+
+_TAG_TRANSLATION = str.maketrans({character: "_" for character in ",|#:=\n "})
+
+
+@dataclass(slots=True, frozen=True)
+class StatsdConfig:
+    """Configuration of the StatsD emitter, which replaces the registry for the request metrics."""
+
+    host: str = field(default="127.0.0.1")
+    """The host of the StatsD agent."""
+
+    port: int = field(default=8125)
+    """The UDP port of the StatsD agent."""
+
+    unix_socket: str | None = field(default=None)
+    """The unix datagram socket of the agent, for example, /var/run/datadog/dsd.socket. Overrides host and port."""
+
+    dogstatsd: bool = field(default=True)
+    """Send the labels as DogStatsD tags (name:1|c|#path:/), otherwise in the InfluxDB style (name,path=/:1|c)."""
+
+    max_packet_size: int = field(default=1432)
+    """
+    The maximum size of a datagram, the lines are batched up to this size.
+    The default fits into the Ethernet MTU, use 8192 for a unix socket.
+    """
+
+    flush_interval: float = field(default=0.1)
+    """The interval in seconds, after which a partially filled datagram is sent."""
+
+
+class _StatsdClient:
+    """
+    Batches the StatsD lines into datagrams of at most max_packet_size bytes,
+    which are sent from a non-blocking socket when the next line does not fit or by the flush thread.
+    The datagrams, which the socket can not send immediately, are dropped rather than blocking the caller.
+    If the agent can not be reached (for example, its unix socket does not exist yet),
+    the socket is dropped and connected again by the next flush.
+    """
+
+    __slots__ = (
+        "_config",
+        "_lock",
+        "_buffer",
+        "_socket",
+        "_connect_failed",
+        "_thread",
+        "_stop_event",
+        "dropped",
+        "__weakref__",
+    )
+
+    def __init__(self, config: StatsdConfig) -> None:
+        self._config = config
+        self._lock = threading.Lock()
+        self._buffer = bytearray()
+        self._socket: socket.socket | None = None
+        self._connect_failed = False
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self.dropped = 0
+        _clients.add(self)
+
+    def send(self, line: bytes) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._start()
+
+            if self._buffer and len(self._buffer) + len(line) + 1 > self._config.max_packet_size:
+                self._flush()
+
+            if self._buffer:
+                self._buffer += b"\n"
+            self._buffer += line
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        self._stop_event.set()
+        with self._lock:
+            self._flush()
+            self._close_socket()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+
+        if self._socket is None:
+            self._socket = self._connect()
+
+        if self._socket is None:
+            self.dropped += 1
+        else:
+            try:
+                self._socket.send(self._buffer)
+            except BlockingIOError:
+                # The socket buffer is full, the metrics are lost as with any UDP packet
+                self.dropped += 1
+            except OSError:
+                # The agent is not listening, the socket is connected again by the next flush
+                self.dropped += 1
+                self._close_socket()
+        self._buffer.clear()
+
+    def _connect(self) -> socket.socket | None:
+        address: Any = self._config.unix_socket or (self._config.host, self._config.port)
+        sock: socket.socket | None = None
+
+        try:
+            if self._config.unix_socket is not None:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            else:
+                family, kind, proto, _, address = socket.getaddrinfo(
+                    self._config.host,
+                    self._config.port,
+                    type=socket.SOCK_DGRAM,
+                )[0]
+                sock = socket.socket(family, kind, proto)
+
+            sock.setblocking(False)  # noqa: FBT003
+            sock.connect(address)
+        except OSError:
+            if sock is not None:
+                sock.close()
+            if not self._connect_failed:  # logged once until the agent is reached
+                logger.warning("Failed to connect to the StatsD agent at %s", address)
+            self._connect_failed = True
+            return None
+
+        self._connect_failed = False
+        return sock
+
+    def _close_socket(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="asgi-monitor-statsd", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._config.flush_interval):
+            self.flush()
+
+    def _after_fork(self) -> None:
+        # The flush thread is not copied to the child process, and the lock may be held by it
+        self._lock = threading.Lock()
+        self._buffer = bytearray()
+        self._socket = None
+        self._thread = None
+
+
+_clients: weakref.WeakSet[_StatsdClient] = weakref.WeakSet()
+
+
+def _after_fork() -> None:
+    for client in _clients:
+        client._after_fork()  # noqa: SLF001
+
+
+def _close_clients() -> None:
+    # The clients, which are not closed at the shutdown of the application, send the last datagram on exit
+    for client in list(_clients):
+        client.close()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(_close_clients)
+
+
+def _format_value(value: float) -> bytes:
+    return b"%d" % value if value == int(value) else b"%.6g" % value
+
+
+class _StatsdChild:
+    __slots__ = ("_client", "_head", "_tail", "_delta")
+
+    def __init__(self, client: _StatsdClient, head: bytes, tail: bytes, *, delta: bool) -> None:
+        self._client = client
+        self._head = head
+        self._tail = tail
+        self._delta = delta
+
+    def inc(self, amount: float = 1) -> None:
+        # A gauge value with a sign is a delta to the value in the agent, without it the value is set
+        sign = b"+" if self._delta and amount >= 0 else b""
+        self._client.send(self._head + sign + _format_value(amount) + self._tail)
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def observe(self, amount: float, exemplar: dict[str, str] | None = None) -> None:
+        # The timers are in milliseconds, exemplars are not supported by StatsD
+        self._client.send(self._head + _format_value(amount * 1000) + self._tail)
+
+
+class _StatsdMetric:
+    __slots__ = ("_client", "_config", "_typ", "_name", "_labelnames", "_absolute", "_children")
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: _StatsdClient,
+        config: StatsdConfig,
+        typ: bytes,
+        name: str,
+        labelnames: list[str],
+        *,
+        absolute: bool = False,
+    ) -> None:
+        self._client = client
+        self._config = config
+        self._typ = typ
+        self._name = name
+        self._labelnames = labelnames
+        self._absolute = absolute
+        self._children: dict[tuple[str, ...], _StatsdChild] = {}
+
+    def labels(self, **labels: Any) -> _StatsdChild:
+        labelvalues = tuple(str(labels[name]) for name in self._labelnames)
+        child = self._children.get(labelvalues)
+
+        if child is None:
+            child = self._children[labelvalues] = self._build_child(labelvalues)
+        return child
+
+    def clear(self) -> None:
+        self._children.clear()
+
+    def _build_child(self, labelvalues: tuple[str, ...]) -> _StatsdChild:
+        # The name and the tags of a series are formatted once, so an update only formats the value
+        tags = [
+            (name, value.translate(_TAG_TRANSLATION)) for name, value in zip(self._labelnames, labelvalues, strict=True)
+        ]
+
+        if self._config.dogstatsd:
+            head = f"{self._name}:"
+            tail = f"|{self._typ.decode()}|#" + ",".join(f"{name}:{value}" for name, value in tags)
+        else:
+            head = self._name + "".join(f",{name}={value}" for name, value in tags) + ":"
+            tail = f"|{self._typ.decode()}"
+
+        delta = self._typ == _GAUGE and not self._absolute
+        return _StatsdChild(self._client, head.encode(), tail.encode(), delta=delta)
+
+
+class StatsdMetricsContainer(MetricsContainer):
+    """
+    Metrics container that emits the request metrics as StatsD lines instead of updating the registry.
+    The counters are sent as counters, the in-progress requests as gauge deltas,
+    and the request duration as a timer in milliseconds named without the _seconds suffix.
+    """
+
+    __slots__ = ("_client", "_config")
+
+    def __init__(self, prefix: str, registry: CollectorRegistry, config: StatsdConfig) -> None:
+        super().__init__(prefix, registry)
+        self._config = config
+        self._client = _StatsdClient(config)
+
+    def flush(self) -> None:
+        """Sends the partially filled datagram immediately."""
+
+        self._client.flush()
+
+    def close(self) -> None:
+        """Sends the partially filled datagram and closes the socket."""
+
+        self._client.close()
+
+    def _statsd_metric(self, typ: bytes, name: str, labelnames: list[str], *, absolute: bool = False) -> Any:
+        if name not in self._metrics:
+            self._metrics[name] = _StatsdMetric(  # type: ignore[assignment]
+                self._client,
+                self._config,
+                typ,
+                name,
+                labelnames,
+                absolute=absolute,
+            )
+        return self._metrics[name]
+
+    def app_info(self) -> Any:
+        # Each process reports the constant 1, so the gauge is not summed between processes
+        return self._statsd_metric(_GAUGE, f"{self._prefix}_app_info", ["app_name"], absolute=True)
+
+    def request_count(self) -> Any:
+        return self._statsd_metric(_COUNTER, f"{self._prefix}_requests_total", ["app_name", "method", "path"])
+
+    def response_count(self) -> Any:
+        return self._statsd_metric(
+            _COUNTER,
+            f"{self._prefix}_responses_total",
+            ["app_name", "method", "path", "status_code"],
+        )
+
+    def request_duration(self) -> Any:
+        return self._statsd_metric(_TIMER, f"{self._prefix}_request_duration", ["app_name", "method", "path"])
+
+    def requests_in_progress(self) -> Any:
+        return self._statsd_metric(_GAUGE, f"{self._prefix}_requests_in_progress", ["app_name", "method", "path"])
+
+    def requests_exceptions_count(self) -> Any:
+        return self._statsd_metric(
+            _COUNTER,
+            f"{self._prefix}_requests_exceptions_total",
+            ["app_name", "method", "path", "exception_type"],
+        )
@@ -0,0 +1,7 @@
+from .config import BaseMonitoringConfig
+from .middleware import MonitoringMiddleware
+
+__all__ = (
+    "BaseMonitoringConfig",
+    "MonitoringMiddleware",
+)
@@ -0,0 +1,31 @@
+from dataclasses import dataclass, field
+
+from asgi_monitor.logging.access import AccessLogSamplingConfig, AccessLogSummaryConfig
+
+__all__ = ("BaseMonitoringConfig",)
+
+
+@dataclass(slots=True, frozen=True)
+class BaseMonitoringConfig:
+    """
+    Configuration class for the combined monitoring middleware,
+    which does the tracing, the metrics and the access log of a request in one pass.
+    """
+
+    access_log: bool = field(default=True)
+    """Whether to log every request with the method, route, status code and duration."""
+
+    access_logger_name: str = field(default="asgi_monitor.access")
+    """The name of the logger of the access log."""
+
+    access_log_sampling: AccessLogSamplingConfig | None = field(default=None)
+    """
+    The sampling policy of the access log, all requests are logged if it is not specified.
+    For example, AccessLogSamplingConfig(sample_rate=0.01) logs the 5xx and the slow requests and 1% of the others.
+    """
+
+    access_log_summary: AccessLogSummaryConfig | None = field(default=None)
+    """
+    Log one summary per route and interval (count, errors, p50/p95/p99 durations, response size)
+    instead of a record per request. The sampling does not apply to the summaries.
+    """
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from opentelemetry import context, trace
+from opentelemetry.instrumentation.asgi import asgi_getter, collect_request_attributes, get_host_port_url_tuple
+from opentelemetry.instrumentation.utils import http_status_to_status_code
+from opentelemetry.propagate import extract
+from opentelemetry.semconv.trace import SpanAttributes
+from opentelemetry.trace import Status
+from opentelemetry.util.http import get_excluded_urls
+
+from asgi_monitor.logging.access import AccessLogSampler, AccessLogSummarizer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from opentelemetry.trace import Span, Tracer
+
+    from asgi_monitor.logging.access import AccessLogSamplingConfig
+    from asgi_monitor.metrics.manager import MetricsManager
+    from asgi_monitor.tracing.config import BaseTracingConfig
+    from .config import BaseMonitoringConfig
+
+__all__ = (
+    "MonitoringMiddleware",
+    "set_span_status_code",
+)
+
+Scope = Any
+Message = Any
+
+_HTTP_500_INTERNAL_SERVER_ERROR = 500
+
+_OTEL_SCHEMA = "https://opentelemetry.io/schemas/1.11.0"
+
+
+def set_span_status_code(span: Span, status_code: int) -> None:
+    """
+    Sets the status code attribute and the status of a server span.
+
+    :param Span span: The server span of the request.
+    :param int status_code: The status code of the response.
+    :returns: None
+    """
+
+    span.set_attribute(SpanAttributes.HTTP_STATUS_CODE, status_code)
+    span.set_status(Status(http_status_to_status_code(status_code, server_span=True)))
+
+
+def _build_access_log_summarizer(config: BaseMonitoringConfig) -> AccessLogSummarizer | None:
+    # The summarizer is built by the integrations, so they can close it on the shutdown of the application
+    if not config.access_log or config.access_log_summary is None:
+        return None
+    return AccessLogSummarizer(config.access_log_summary, config.access_logger_name)
+
+
+class _RequestState:
+    __slots__ = ("status_code", "response_size", "end")
+
+    def __init__(self) -> None:
+        self.status_code = _HTTP_500_INTERNAL_SERVER_ERROR
+        self.response_size = 0
+        self.end: int | None = None
+
+
+class MonitoringMiddleware:
+    """
+    ASGI middleware, which does the tracing, the Prometheus metrics and the access log of a request in one pass.
+
+    The route is resolved once, the clock is read once at the start and once at the end of the response,
+    and send is wrapped once, instead of once per middleware.
+    The spans are created directly with the tracer, so the internal receive and send spans
+    of the OpenTelemetry ASGI middleware, its client hooks and its http.server.* instruments are not used.
+    """
+
+    __slots__ = (
+        "app",
+        "_route_resolver",
+        "_metrics",
+        "_include_exemplar",
+        "_tracer",
+        "_tracing",
+        "_span_details_extractor",
+        "_excluded_urls",
+        "_access_logger",
+        "_access_log_sampler",
+        "_access_log_summarizer",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        app: Callable[..., Any],
+        *,
+        route_resolver: Callable[[Scope], tuple[str, bool]],
+        metrics: MetricsManager | None = None,
+        include_trace_exemplar: bool = False,
+        tracing: BaseTracingConfig | None = None,
+        span_details_extractor: Callable[[Scope], tuple[str, dict[str, Any]]] | None = None,
+        access_logger: logging.Logger | None = None,
+        access_log_sampling: AccessLogSamplingConfig | None = None,
+        access_log_summarizer: AccessLogSummarizer | None = None,
+    ) -> None:
+        """
+        :param ASGIApp app: The wrapped ASGI application.
+        :param Callable route_resolver: Returns the route template of the request and whether the route is handled.
+        :param MetricsManager | None metrics: The metrics manager, the metrics are disabled if it is not specified.
+        :param bool include_trace_exemplar: Whether to include trace exemplars in the metrics.
+        :param BaseTracingConfig | None tracing: The OpenTelemetry config, the tracing is disabled if not specified.
+        :param Callable | None span_details_extractor: A custom span name and attributes extractor,
+            by default they are built from the resolved route.
+        :param logging.Logger | None access_logger: The logger of the access log, disabled if not specified.
+        :param AccessLogSamplingConfig | None access_log_sampling: The sampling policy of the access log,
+            all requests are logged if not specified.
+        :param AccessLogSummarizer | None access_log_summarizer: Logs the summaries of the routes
+            instead of a record per request, the caller closes it on the shutdown of the application.
+        """
+
+        self.app = app
+        self._route_resolver = route_resolver
+        self._metrics = metrics
+        self._include_exemplar = include_trace_exemplar
+        self._tracing = tracing
+        self._span_details_extractor = span_details_extractor
+        self._access_logger = access_logger
+        self._access_log_sampler = AccessLogSampler(access_log_sampling) if access_log_sampling is not None else None
+        self._access_log_summarizer = access_log_summarizer
+        self._tracer: Tracer | None = None
+        self._excluded_urls = None
+
+        if tracing is not None:
+            self._tracer = trace.get_tracer(__name__, tracer_provider=tracing.tracer_provider, schema_url=_OTEL_SCHEMA)
+            self._excluded_urls = get_excluded_urls(tracing.exclude_urls_env_key)
+
+    async def __call__(self, scope: Scope, receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route, is_handled_route = self._route_resolver(scope)
+        span = self._start_span(scope, route, is_handled_route=is_handled_route)
+        if span is None:
+            await self._call(scope, receive, send, route, is_handled_route=is_handled_route, span=None)
+            return
+
+        token = context.attach(trace.set_span_in_context(span))
+        try:
+            await self._call(scope, receive, send, route, is_handled_route=is_handled_route, span=span)
+        finally:
+            context.detach(token)
+
+    async def _call(  # noqa: PLR0913
+        self,
+        scope: Scope,
+        receive: Callable[..., Any],
+        send: Callable[..., Any],
+        route: str,
+        *,
+        is_handled_route: bool,
+        span: Span | None,
+    ) -> None:
+        method = scope["method"]
+        metrics = self._metrics if is_handled_route else None
+        state = _RequestState()
+
+        async def wrapped_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                state.status_code = message["status"]
+                if span is not None:
+                    set_span_status_code(span, state.status_code)
+            elif message["type"] == "http.response.body":
+                state.response_size += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    state.end = time.perf_counter_ns()
+            await send(message)
+
+        if metrics is not None:
+            metrics.inc_requests_count(method=method, path=route)
+            metrics.add_request_in_progress(method=method, path=route)
+
+        start = time.perf_counter_ns()
+        exception_type: str | None = None
+
+        try:
+            await self.app(scope, receive, wrapped_send)
+        except Exception as exc:
+            exception_type = type(exc).__name__
+            state.status_code = _HTTP_500_INTERNAL_SERVER_ERROR
+            if span is not None:
+                span.record_exception(exc)
+                set_span_status_code(span, _HTTP_500_INTERNAL_SERVER_ERROR)
+            raise
+        finally:
+            duration_ns = (state.end or time.perf_counter_ns()) - start
+
+            if metrics is not None:
+                self._observe(metrics, method, route, state.status_code, duration_ns, exception_type, span)
+            if self._access_logger is not None:
+                self._log_access(scope, route, state, duration_ns, span)
+            if span is not None:
+                # The span ends after the same duration, which is observed by the metrics and the access log
+                start_time = getattr(span, "start_time", None)
+                span.end(end_time=start_time + duration_ns if start_time is not None else None)
+
+    def _start_span(self, scope: Scope, route: str, *, is_handled_route: bool) -> Span | None:
+        if self._tracer is None or self._tracing is None:
+            return None
+
+        if self._excluded_urls is not None and self._excluded_urls.url_disabled(get_host_port_url_tuple(scope)[2]):
+            return None
+
+        if self._span_details_extractor is not None:
+            span_name, additional_attributes = self._span_details_extractor(scope)
+        elif is_handled_route:
+            span_name, additional_attributes = f"{scope['method']} {route}", {SpanAttributes.HTTP_ROUTE: route}
+        else:
+            span_name, additional_attributes = scope["method"], {}
+
+        attributes = collect_request_attributes(scope)
+        attributes.update(additional_attributes)
+
+        span = self._tracer.start_span(
+            span_name,
+            context=extract(scope, getter=asgi_getter),
+            kind=trace.SpanKind.SERVER,
+            attributes=attributes,
+        )
+        if self._tracing.server_request_hook_handler is not None:
+            self._tracing.server_request_hook_handler(span, scope)
+        return span
+
+    def _observe(  # noqa: PLR0913
+        self,
+        metrics: MetricsManager,
+        method: str,
+        route: str,
+        status_code: int,
+        duration_ns: int,
+        exception_type: str | None,
+        span: Span | None,
+    ) -> None:
+        if exception_type is not None:
+            metrics.inc_requests_exceptions_count(method=method, path=route, exception_type=exception_type)
+        else:
+            exemplar: dict[str, str] | None = None
+            if self._include_exemplar and span is not None:
+                exemplar = {"TraceID": trace.format_trace_id(span.get_span_context().trace_id)}
+
+            metrics.observe_request_duration(method=method, path=route, duration=duration_ns / 1e9, exemplar=exemplar)
+
+        metrics.inc_responses_count(method=method, path=route, status_code=status_code)
+        metrics.remove_request_in_progress(method=method, path=route)
+
+    def _log_access(self, scope: Scope, route: str, state: _RequestState, duration_ns: int, span: Span | None) -> None:
+        if self._access_log_summarizer is not None:
+            self._access_log_summarizer.record(
+                scope["method"], route, state.status_code, duration_ns, state.response_size
+            )
+            return
+
+        logger = self._access_logger
+        if logger is None or not logger.isEnabledFor(logging.INFO):
+            return
+
+        sample_rate: float | None = None
+        if self._access_log_sampler is not None:
+            sample_rate = self._access_log_sampler.sample(state.status_code, duration_ns)
+            if sample_rate is None:
+                return
+
+        client = scope.get("client")
+        client_addr = f"{client[0]}:{client[1]}" if client else "-"
+        method = scope["method"]
+        path = scope.get("root_path", "") + scope["path"]
+        http_version = scope.get("http_version", "1.1")
+        extra = {
+            "client_addr": client_addr,
+            "method": method,
+            "path": path,
+            "route": route,
+            "http_version": http_version,
+            "status_code": state.status_code,
+            "duration": round(duration_ns / 1e6, 3),
+            "response_size": state.response_size,
+        }
+        if sample_rate is not None:
+            extra["sample_rate"] = sample_rate
+        if span is not None:
+            span_context = span.get_span_context()
+            extra["trace_id"] = trace.format_trace_id(span_context.trace_id)
+            extra["span_id"] = trace.format_span_id(span_context.span_id)
+
+        logger.info('%s - "%s %s HTTP/%s" %d', client_addr, method, path, http_version, state.status_code, extra=extra)
@@ -1,6 +1,8 @@
 import asyncio
 import json
+import logging
 import re
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, cast
 
 import pytest
@@ -10,14 +12,26 @@ from aiohttp.web import Application, Request, Response, json_response
 from aiohttp.web_exceptions import HTTPInternalServerError
 from assertpy import assert_that
 from opentelemetry.propagate import inject
+from opentelemetry.sdk.metrics import MeterProvider
 from prometheus_client import REGISTRY
+from structlog.testing import capture_logs
 
 if TYPE_CHECKING:
     from opentelemetry.sdk.trace import Span
 
-from asgi_monitor.integrations.aiohttp import MetricsConfig, setup_metrics, setup_tracing
+from asgi_monitor.integrations.aiohttp import (
+    MetricsConfig,
+    MonitoringConfig,
+    TracingConfig,
+    setup_metrics,
+    setup_monitoring,
+    setup_tracing,
+)
+from asgi_monitor.logging import AccessLogSummaryConfig
 from asgi_monitor.metrics import get_latest_metrics
+from asgi_monitor.metrics.otel import OpenTelemetryMetricReader
 from tests.integration.factory import build_aiohttp_tracing_config
+from tests.utils import fetch_metrics
 
 
 async def index_handler(request: Request) -> Response:
@@ -76,6 +90,107 @@ async def test_metrics(aiohttp_client: AiohttpClient) -> None:
     )
 
 
+async def test_metrics_gzip(aiohttp_client: AiohttpClient) -> None:
+    # Arrange
+    app = Application()
+    metrics_cfg = MetricsConfig(app_name="test", include_metrics_endpoint=True)
+    setup_metrics(app, metrics_cfg)
+    client: TestClient = await aiohttp_client(app)
+
+    # Act
+    response = await client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+
+    # Assert
+    assert response.status == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert_that(await response.text()).contains('aiohttp_app_info{app_name="test"} 1.0')
+
+
+async def test_metrics_stream(aiohttp_client: AiohttpClient) -> None:
+    # Arrange
+    app = Application()
+    metrics_cfg = MetricsConfig(app_name="test", include_metrics_endpoint=True, stream_metrics=True)
+    setup_metrics(app, metrics_cfg)
+    client: TestClient = await aiohttp_client(app)
+
+    # Act
+    response = await client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+
+    # Assert
+    assert response.status == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["transfer-encoding"] == "chunked"
+    assert_that(await response.text()).contains(
+        'aiohttp_app_info{app_name="test"} 1.0',
+        'aiohttp_requests_in_progress{app_name="test",method="GET",path="/metrics"} 1.0',
+    )
+
+
+async def test_metrics_names(aiohttp_client: AiohttpClient) -> None:
+    # Arrange
+    app = Application()
+    metrics_cfg = MetricsConfig(app_name="test", include_metrics_endpoint=True)
+    setup_metrics(app, metrics_cfg)
+    client: TestClient = await aiohttp_client(app)
+
+    # Act
+    response = await client.get(
+        "/metrics", params=[("name[]", "aiohttp_app_info"), ("name[]", "aiohttp_requests_total")]
+    )
+
+    # Assert
+    assert response.status == 200
+    assert_that(await response.text()).contains(
+        'aiohttp_app_info{app_name="test"} 1.0',
+        'aiohttp_requests_total{app_name="test",method="GET",path="/metrics"} 1.0',
+    )
+    assert_that(await response.text()).does_not_contain("aiohttp_requests_in_progress")
+
+
+async def test_metrics_with_otel_reader(aiohttp_client: AiohttpClient) -> None:
+    # Arrange
+    app = Application()
+    app.router.add_get("/", index_handler)
+    metrics_cfg = MetricsConfig(app_name="test", include_metrics_endpoint=True)
+    meter_provider = MeterProvider(metric_readers=[OpenTelemetryMetricReader(metrics_cfg.registry)])
+    setup_tracing(app, TracingConfig(meter_provider=meter_provider))
+    setup_metrics(app, metrics_cfg)
+    client: TestClient = await aiohttp_client(app)
+
+    # Act
+    await client.get("/")
+    response = await client.get("/metrics")
+
+    # Assert
+    assert response.status == 200
+    assert_that(await response.text()).contains(
+        'aiohttp_requests_total{app_name="test",method="GET",path="/"} 1.0',
+        "# TYPE http_server_duration_milliseconds histogram",
+        'http_server_duration_milliseconds_count{http_route="/"} 1.0',
+        "# TYPE http_server_active_requests gauge",
+    )
+
+
+async def test_metrics_dedicated_unix_socket(aiohttp_client: AiohttpClient, tmp_path: Path) -> None:
+    # Arrange
+    app = Application()
+    unix_socket = tmp_path / "metrics.sock"
+    metrics_cfg = MetricsConfig(app_name="test", metrics_unix_socket=str(unix_socket))
+    setup_metrics(app, metrics_cfg)
+    client: TestClient = await aiohttp_client(app)
+
+    # Act
+    app_response = await client.get("/metrics")
+    status, payload = await asyncio.to_thread(fetch_metrics, str(unix_socket))
+    await client.close()
+
+    # Assert
+    assert app_response.status == 404
+    assert status == 200
+    assert_that(payload.decode()).contains('aiohttp_app_info{app_name="test"} 1.0')
+    assert not unix_socket.exists()
+
+
 async def test_not_handled(aiohttp_client: AiohttpClient) -> None:
     # Arrange
     expected_content_type = "text/plain; version=0.0.4; charset=utf-8"
@@ -504,3 +619,50 @@ async def test_not_found_tracing(aiohttp_client: AiohttpClient) -> None:
     assert isinstance(attrs["net.peer.port"], int)
     assert "Python" in attrs["http.user_agent"]
     assert response.status == 404
+
+
+async def test_monitoring(aiohttp_client: AiohttpClient, caplog: pytest.LogCaptureFixture) -> None:
+    # Arrange
+    trace_config, exporter = build_aiohttp_tracing_config()
+    metrics_cfg = MetricsConfig(app_name="test", include_metrics_endpoint=True)
+    app = Application()
+    app.router.add_get("/params/{param}", one_parametrize_handler)
+    setup_monitoring(app, MonitoringConfig(metrics=metrics_cfg, tracing=trace_config))
+    client: TestClient = await aiohttp_client(app)
+
+    # Act
+    with caplog.at_level(logging.INFO, logger="asgi_monitor.access"):
+        await client.get("/params/one")
+    response = await client.get("/metrics")
+
+    # Assert
+    (span, _) = cast("tuple[Span, Span]", exporter.get_finished_spans())
+    record, *_ = [record for record in caplog.records if record.name == "asgi_monitor.access"]
+
+    assert response.status == 200
+    assert_that(span.name).is_equal_to("GET /params/{param}")
+    assert_that(span.attributes).contains_entry({"http.route": "/params/{param}"}, {"http.status_code": 200})
+    assert_that(record.__dict__).contains_entry({"route": "/params/{param}"}, {"status_code": 200})
+    assert_that(await response.text()).contains(
+        'aiohttp_requests_total{app_name="test",method="GET",path="/params/{param}"} 1.0',
+        'aiohttp_responses_total{app_name="test",method="GET",path="/params/{param}",status_code="200"} 1.0',
+    )
+
+
+async def test_monitoring_access_log_summary_on_cleanup(aiohttp_client: AiohttpClient) -> None:
+    # Arrange
+    app = Application()
+    app.router.add_get("/params/{param}", one_parametrize_handler)
+    setup_monitoring(app, MonitoringConfig(access_log_summary=AccessLogSummaryConfig(interval=60)))
+    client: TestClient = await aiohttp_client(app)
+
+    # Act
+    with capture_logs() as logs:
+        await client.get("/params/one")
+        await client.get("/params/two")
+        await client.close()
+
+    # Assert
+    assert_that(logs).extracting("method", "route", "count", "errors").is_equal_to(
+        [("GET", "/params/{param}", 2, 0)],
+    )
@@ -1,12 +1,22 @@
 import asyncio
+import logging
 import re
 
 import pytest
 from assertpy import assert_that
 from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
 from prometheus_client import REGISTRY
-
-from asgi_monitor.integrations.fastapi import MetricsConfig, setup_metrics, setup_tracing
+from structlog.testing import capture_logs
+
+from asgi_monitor.integrations.fastapi import (
+    MetricsConfig,
+    MonitoringConfig,
+    setup_metrics,
+    setup_monitoring,
+    setup_tracing,
+)
+from asgi_monitor.logging import AccessLogSamplingConfig, AccessLogSummaryConfig
 from asgi_monitor.metrics import get_latest_metrics
 from tests.integration.factory import build_fastapi_tracing_config, fastapi_app
 
@@ -170,3 +180,69 @@ async def test_metrics_get_path() -> None:
             'fastapi_requests_created{app_name="test",method="GET",path="/metrics"}',
             'fastapi_requests_in_progress{app_name="test",method="GET",path="/metrics"} 1.0',
         )
+
+
+async def test_monitoring() -> None:
+    # Arrange
+    trace_config, exporter = build_fastapi_tracing_config()
+    metrics_config = MetricsConfig(app_name="test", include_metrics_endpoint=True)
+    app = FastAPI()
+    app.include_router(router)
+    setup_monitoring(app=app, config=MonitoringConfig(metrics=metrics_config, tracing=trace_config))
+
+    # Act
+    async with fastapi_app(app) as client:
+        client.get("/params/one")
+        response = client.get("/metrics")
+
+        # Assert
+        assert response.status_code == 200
+        assert_that([span.name for span in exporter.get_finished_spans()]).is_equal_to(
+            ["GET /params/{param}", "GET /metrics"]
+        )
+        assert_that(response.content.decode()).contains(
+            'fastapi_requests_total{app_name="test",method="GET",path="/params/{param}"} 1.0',
+            'fastapi_responses_total{app_name="test",method="GET",path="/params/{param}",status_code="200"} 1.0',
+            'fastapi_requests_in_progress{app_name="test",method="GET",path="/metrics"} 1.0',
+        )
+
+
+async def test_monitoring_access_log_sampling(caplog: pytest.LogCaptureFixture) -> None:
+    # Arrange
+    sampling = AccessLogSamplingConfig(sample_rate=0, slow_request_threshold=0.05)
+    app = FastAPI()
+    app.include_router(router)
+    setup_monitoring(app=app, config=MonitoringConfig(access_log_sampling=sampling))
+
+    # Act
+    async with fastapi_app(app) as client:
+        with caplog.at_level(logging.INFO, logger="asgi_monitor.access"):
+            for _ in range(5):
+                client.get("/params/one")
+            client.get("/")
+
+    # Assert
+    (record,) = [record for record in caplog.records if record.name == "asgi_monitor.access"]
+    assert_that(record.__dict__).contains_entry({"route": "/"}, {"status_code": 200}, {"sample_rate": 1.0})
+
+
+async def test_monitoring_access_log_summary(caplog: pytest.LogCaptureFixture) -> None:
+    # Arrange
+    app = FastAPI()
+    app.include_router(router)
+    setup_monitoring(app=app, config=MonitoringConfig(access_log_summary=AccessLogSummaryConfig(interval=60)))
+
+    # Act
+    with (
+        capture_logs() as logs,
+        caplog.at_level(logging.INFO, logger="asgi_monitor.access"),
+        TestClient(app) as client,
+    ):
+        client.get("/params/one")
+        client.get("/params/two")
+
+    # Assert
+    assert_that([record for record in caplog.records if record.name == "asgi_monitor.access"]).is_empty()
+    assert_that(logs).extracting("method", "route", "count", "errors").is_equal_to(
+        [("GET", "/params/{param}", 2, 0)],
+    )
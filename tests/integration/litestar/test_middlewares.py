@@ -5,18 +5,25 @@ from typing import TYPE_CHECKING, cast
 import pytest
 from assertpy import assert_that
 from litestar import Litestar, get
+from litestar.testing import TestClient
+from structlog.testing import capture_logs
 
 if TYPE_CHECKING:
     from opentelemetry.sdk.trace import Span
 
 from asgi_monitor.integrations.litestar import (
     MetricsConfig,
+    MonitoringConfig,
     add_metrics_endpoint,
+    add_monitoring_shutdown,
     build_metrics_middleware,
+    build_monitoring_middleware,
     build_tracing_middleware,
 )
+from asgi_monitor.logging import AccessLogSummaryConfig
 from asgi_monitor.metrics import get_latest_metrics
 from tests.integration.factory import build_litestar_tracing_config, litestar_app
+from tests.utils import fetch_metrics
 
 
 @get("/")
@@ -99,6 +106,59 @@ async def test_metrics() -> None:
         )
 
 
+async def test_metrics_stream() -> None:
+    # Arrange
+    metrics_config = MetricsConfig(app_name="test", include_trace_exemplar=False)
+    app = Litestar(middleware=[build_metrics_middleware(metrics_config)])
+    add_metrics_endpoint(app, metrics_config.registry, openmetrics_format=True, stream_metrics_endpoint=True)
+
+    # Act
+    async with litestar_app(app) as client:
+        response = client.get("/metrics")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/openmetrics-text; version=1.0.0; charset=utf-8"
+        assert_that(response.content.decode()).contains('litestar_app_info{app_name="test"} 1.0')
+        assert_that(response.content.decode()).ends_with("# EOF\n")
+
+
+async def test_metrics_names() -> None:
+    # Arrange
+    metrics_config = MetricsConfig(app_name="test", include_trace_exemplar=False)
+    app = Litestar(middleware=[build_metrics_middleware(metrics_config)])
+    add_metrics_endpoint(app, metrics_config.registry)
+
+    # Act
+    async with litestar_app(app) as client:
+        response = client.get("/metrics", params={"name[]": "litestar_app_info"})
+
+        # Assert
+        assert response.status_code == 200
+        assert_that(response.content.decode()).contains('litestar_app_info{app_name="test"} 1.0')
+        assert_that(response.content.decode()).does_not_contain("litestar_requests_total")
+
+
+async def test_metrics_dedicated_port() -> None:
+    # Arrange
+    metrics_config = MetricsConfig(app_name="test", include_trace_exemplar=False)
+    app = Litestar(middleware=[build_metrics_middleware(metrics_config)])
+    add_metrics_endpoint(app, metrics_config.registry, metrics_host="127.0.0.1", metrics_port=0)
+
+    # Act
+    with TestClient(app) as client:
+        app_response = client.get("/metrics")
+        address = app.state.metrics_server.address
+        status, payload = fetch_metrics(address)
+
+    # Assert
+    assert app_response.status_code == 404
+    assert status == 200
+    assert_that(payload.decode()).contains('litestar_app_info{app_name="test"} 1.0')
+    with pytest.raises(ConnectionRefusedError):
+        fetch_metrics(address)
+
+
 async def test_error_metrics() -> None:
     # Arrange
     metrics_config = MetricsConfig(app_name="test", include_trace_exemplar=True)
@@ -181,3 +241,46 @@ async def test_metrics_openmetrics_with_tracing() -> None:
             r'app_name="test",le="([\d.]+)",method="GET",path="\/"}\ 1.0 # \{TraceID="(\w+)"\} (\d+\.\d+) (\d+\.\d+)'
         )
         assert_that(metrics.content.decode()).matches(pattern)
+
+
+async def test_monitoring() -> None:
+    # Arrange
+    trace_config, exporter = build_litestar_tracing_config()
+    metrics_config = MetricsConfig(app_name="test")
+    monitoring_config = MonitoringConfig(metrics=metrics_config, tracing=trace_config)
+    app = Litestar([one_parametrize], middleware=[build_monitoring_middleware(monitoring_config)])
+    add_metrics_endpoint(app, metrics_config.registry)
+
+    # Act
+    async with litestar_app(app) as client:
+        client.get("/params/one")
+        response = client.get("/metrics")
+
+        # Assert
+        assert response.status_code == 200
+        assert_that([span.name for span in exporter.get_finished_spans()]).is_equal_to(
+            ["GET /params/{param}", "GET /metrics"],
+        )
+        assert_that(exporter.get_finished_spans()[0].attributes).contains_entry({"http.status_code": 200})
+        assert_that(response.content.decode()).contains(
+            'litestar_requests_total{app_name="test",method="GET",path="/params/{param}"} 1.0',
+            'litestar_responses_total{app_name="test",method="GET",path="/params/{param}",status_code="200"} 1.0',
+            'litestar_requests_in_progress{app_name="test",method="GET",path="/metrics"} 1.0',
+        )
+
+
+async def test_monitoring_access_log_summary_on_shutdown() -> None:
+    # Arrange
+    middleware = build_monitoring_middleware(MonitoringConfig(access_log_summary=AccessLogSummaryConfig(interval=60)))
+    app = Litestar([one_parametrize], middleware=[middleware])
+    add_monitoring_shutdown(app, middleware)
+
+    # Act
+    with capture_logs() as logs, TestClient(app) as client:
+        client.get("/params/one")
+        client.get("/params/two")
+
+    # Assert
+    assert_that(logs).extracting("method", "route", "count", "errors").is_equal_to(
+        [("GET", "/params/{param}", 2, 0)],
+    )
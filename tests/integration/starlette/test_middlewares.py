@@ -1,20 +1,37 @@
 import asyncio
+import logging
 import re
+import socket
 from typing import TYPE_CHECKING, cast
 
 import pytest
 from assertpy import assert_that
+from opentelemetry import trace
+from opentelemetry.trace import StatusCode
 from starlette.applications import Starlette
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 from starlette.routing import Route
+from starlette.testclient import TestClient
+from structlog.testing import capture_logs
 
 if TYPE_CHECKING:
     from opentelemetry.sdk.trace import Span
 
-from asgi_monitor.integrations.starlette import MetricsConfig, setup_metrics, setup_tracing
+from asgi_monitor.integrations.starlette import (
+    MetricsConfig,
+    MonitoringConfig,
+    setup_metrics,
+    setup_monitoring,
+    setup_tracing,
+)
+from asgi_monitor.logging import AccessLogSamplingConfig, AccessLogSummaryConfig
 from asgi_monitor.metrics import get_latest_metrics
+from asgi_monitor.metrics.protobuf import CONTENT_TYPE_PROTOBUF
+from asgi_monitor.metrics.remote_write import RemoteWriteConfig
+from asgi_monitor.metrics.statsd import StatsdConfig
 from tests.integration.factory import build_starlette_tracing_config, starlette_app
+from tests.utils import RemoteWriteReceiver, decode_protobuf, fetch_metrics, split_delimited
 
 
 async def index(request: Request) -> JSONResponse:
@@ -170,6 +187,81 @@ async def test_metrics() -> None:
         )
 
 
+async def test_metrics_gzip() -> None:
+    # Arrange
+    app = Starlette()
+    metrics_config = MetricsConfig(app_name="test", include_metrics_endpoint=True)
+    setup_metrics(app=app, config=metrics_config)
+
+    # Act
+    async with starlette_app(app) as client:
+        response = client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept, Accept-Encoding"
+        assert_that(response.content.decode()).contains('starlette_app_info{app_name="test"} 1.0')
+
+
+async def test_metrics_stream() -> None:
+    # Arrange
+    app = Starlette()
+    metrics_config = MetricsConfig(app_name="test", include_metrics_endpoint=True, stream_metrics=True)
+    setup_metrics(app=app, config=metrics_config)
+
+    # Act
+    async with starlette_app(app) as client:
+        response = client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert_that(response.content.decode()).contains(
+            'starlette_app_info{app_name="test"} 1.0',
+            'starlette_requests_total{app_name="test",method="GET",path="/metrics"} 1.0',
+        )
+
+
+async def test_metrics_names() -> None:
+    # Arrange
+    app = Starlette()
+    metrics_config = MetricsConfig(app_name="test", include_metrics_endpoint=True)
+    setup_metrics(app=app, config=metrics_config)
+
+    # Act
+    async with starlette_app(app) as client:
+        response = client.get("/metrics?name[]=starlette_requests_in_progress")
+
+        # Assert
+        assert response.status_code == 200
+        assert_that(response.content.decode()).contains(
+            'starlette_requests_in_progress{app_name="test",method="GET",path="/metrics"} 1.0',
+        )
+        assert_that(response.content.decode()).does_not_contain("starlette_app_info", "starlette_requests_total")
+
+
+async def test_metrics_dedicated_port() -> None:
+    # Arrange
+    app = Starlette()
+    metrics_config = MetricsConfig(app_name="test", metrics_host="127.0.0.1", metrics_port=0)
+    setup_metrics(app=app, config=metrics_config)
+
+    # Act
+    with TestClient(app) as client:
+        app_response = client.get("/metrics")
+        address = app.state.metrics_server.address
+        status, payload = fetch_metrics(address)
+
+    # Assert
+    assert app_response.status_code == 404
+    assert status == 200
+    assert_that(payload.decode()).contains('starlette_app_info{app_name="test"} 1.0')
+    with pytest.raises(ConnectionRefusedError):
+        fetch_metrics(address)
+
+
 async def test_error_metrics() -> None:
     # Arrange
     app = Starlette(routes=[Route("/error", endpoint=error, methods=["GET"])])
@@ -268,3 +360,178 @@ async def test_metrics_openmetrics_with_tracing() -> None:
             r'app_name="test",le="([\d.]+)",method="GET",path="\/"}\ 1.0 # \{TraceID="(\w+)"\} (\d+\.\d+) (\d+\.\d+)'
         )
         assert_that(metrics.content.decode()).matches(pattern)
+
+
+async def test_metrics_protobuf_native_histogram() -> None:
+    # Arrange
+    accept = "application/vnd.google.protobuf;proto=io.prometheus.client.MetricFamily;encoding=delimited"
+    app = Starlette(routes=[Route("/", endpoint=index, methods=["GET"])])
+    metrics_config = MetricsConfig(app_name="test", include_metrics_endpoint=True, native_histogram_schema=3)
+    setup_metrics(app=app, config=metrics_config)
+
+    # Act
+    async with starlette_app(app) as client:
+        client.get("/")
+        response = client.get("/metrics", headers={"Accept": accept})
+        text_response = client.get("/metrics")
+
+    # Assert
+    families = {decode_protobuf(family)[1][0]: decode_protobuf(family) for family in split_delimited(response.content)}
+    duration = decode_protobuf(decode_protobuf(families[b"starlette_request_duration_seconds"][4][0])[7][0])
+
+    assert response.headers["content-type"] == CONTENT_TYPE_PROTOBUF
+    assert duration[1] == [1]
+    assert duration[5] == [6]  # zigzag encoded schema 3
+    assert len(duration[13]) == 1  # one native bucket
+    assert text_response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert_that(text_response.content.decode()).contains("# TYPE starlette_request_duration_seconds histogram")
+
+
+async def test_metrics_remote_write_on_shutdown() -> None:
+    # Arrange
+    app = Starlette(routes=[Route("/", endpoint=index, methods=["GET"])])
+
+    with RemoteWriteReceiver() as receiver:
+        remote_write = RemoteWriteConfig(url=receiver.url, interval=60, external_labels={"job": "starlette"})
+        setup_metrics(app=app, config=MetricsConfig(app_name="test", remote_write=remote_write))
+
+        # Act
+        with TestClient(app) as client:
+            client.get("/")
+
+    # Assert
+    requests_total = [series for series in receiver.series() if series["labels"][0][1] == "starlette_requests_total"]
+    assert_that(requests_total).extracting("value").is_equal_to([1.0])
+    assert_that(requests_total[0]["labels"]).contains(("job", "starlette"), ("path", "/"))
+
+
+async def test_metrics_statsd_flushed_on_shutdown() -> None:
+    # Arrange
+    app = Starlette(routes=[Route("/", endpoint=index, methods=["GET"])])
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as agent:
+        agent.bind(("127.0.0.1", 0))
+        agent.settimeout(5)
+        statsd = StatsdConfig(host="127.0.0.1", port=agent.getsockname()[1], flush_interval=60)
+        setup_metrics(app=app, config=MetricsConfig(app_name="test", include_metrics_endpoint=False, statsd=statsd))
+
+        # Act
+        with TestClient(app) as client:
+            client.get("/")
+
+        # Assert
+        assert_that(agent.recv(65535).decode().split("\n")).contains(
+            "starlette_requests_total:1|c|#app_name:test,method:GET,path:/",
+        )
+
+
+async def test_monitoring(caplog: pytest.LogCaptureFixture) -> None:
+    # Arrange
+    trace_config, exporter = build_starlette_tracing_config()
+    metrics_config = MetricsConfig(app_name="test", include_metrics_endpoint=True, include_trace_exemplar=True)
+    app = Starlette(routes=[Route("/params/{param}", endpoint=one_parametrize, methods=["GET"])])
+    setup_monitoring(app=app, config=MonitoringConfig(metrics=metrics_config, tracing=trace_config))
+
+    # Act
+    async with starlette_app(app) as client:
+        with caplog.at_level(logging.INFO, logger="asgi_monitor.access"):
+            response = client.get("/params/one")
+
+        # Assert
+        (span,) = cast("tuple[Span]", exporter.get_finished_spans())
+        (record,) = [record for record in caplog.records if record.name == "asgi_monitor.access"]
+        metrics = get_latest_metrics(metrics_config.registry, openmetrics_format=True)
+
+        assert response.status_code == 200
+        assert_that(span.name).is_equal_to("GET /params/{param}")
+        assert_that(span.attributes).contains_entry(
+            {"http.route": "/params/{param}"},
+            {"http.status_code": 200},
+            {"http.target": "/params/one"},
+        )
+        assert_that(record.getMessage()).is_equal_to('testclient:50000 - "GET /params/one HTTP/1.1" 200')
+        assert_that(record.__dict__).contains_entry(
+            {"route": "/params/{param}"},
+            {"status_code": 200},
+            {"response_size": len(response.content)},
+            {"trace_id": trace.format_trace_id(span.context.trace_id)},
+            {"span_id": trace.format_span_id(span.context.span_id)},
+        )
+        assert_that(record.__dict__["duration"]).is_greater_than(0)
+        assert_that(metrics.payload.decode()).contains(
+            'starlette_app_info{app_name="test"} 1.0',
+            'starlette_requests_total{app_name="test",method="GET",path="/params/{param}"} 1.0',
+            'starlette_responses_total{app_name="test",method="GET",path="/params/{param}",status_code="200"} 1.0',
+            'starlette_requests_in_progress{app_name="test",method="GET",path="/params/{param}"} 0.0',
+            f'# {{TraceID="{trace.format_trace_id(span.context.trace_id)}"}}',
+        )
+
+
+async def test_monitoring_error() -> None:
+    # Arrange
+    trace_config, exporter = build_starlette_tracing_config()
+    metrics_config = MetricsConfig(app_name="test", include_metrics_endpoint=False)
+    app = Starlette(routes=[Route("/error", endpoint=error, methods=["GET"])])
+    setup_monitoring(app=app, config=MonitoringConfig(metrics=metrics_config, tracing=trace_config, access_log=False))
+
+    # Act
+    async with starlette_app(app) as client:
+        with pytest.raises(ZeroDivisionError):
+            client.get("/error")
+
+        # Assert
+        (span,) = cast("tuple[Span]", exporter.get_finished_spans())
+        metrics = get_latest_metrics(metrics_config.registry, openmetrics_format=False)
+
+        assert_that(span.status.status_code).is_equal_to(StatusCode.ERROR)
+        assert_that(span.attributes).contains_entry({"http.status_code": 500})
+        assert_that(span.events[0].name).is_equal_to("exception")
+        assert_that(metrics.payload.decode()).contains(
+            "starlette_requests_exceptions_total{"
+            'app_name="test",exception_type="ZeroDivisionError",method="GET",path="/error"} 1.0',
+            'starlette_responses_total{app_name="test",method="GET",path="/error",status_code="500"} 1.0',
+            'starlette_requests_in_progress{app_name="test",method="GET",path="/error"} 0.0',
+        )
+
+
+async def test_monitoring_access_log_sampling(caplog: pytest.LogCaptureFixture) -> None:
+    # Arrange
+    sampling = AccessLogSamplingConfig(sample_rate=0, slow_request_threshold=None)
+    app = Starlette(
+        routes=[
+            Route("/", endpoint=index, methods=["GET"]),
+            Route("/error", endpoint=error, methods=["GET"]),
+        ],
+    )
+    setup_monitoring(app=app, config=MonitoringConfig(access_log_sampling=sampling))
+
+    # Act
+    async with starlette_app(app) as client:
+        with caplog.at_level(logging.INFO, logger="asgi_monitor.access"):
+            client.get("/")
+            with pytest.raises(ZeroDivisionError):
+                client.get("/error")
+
+    # Assert
+    (record,) = [record for record in caplog.records if record.name == "asgi_monitor.access"]
+    assert_that(record.__dict__).contains_entry({"route": "/error"}, {"status_code": 500}, {"sample_rate": 1.0})
+
+
+async def test_monitoring_access_log_summary(caplog: pytest.LogCaptureFixture) -> None:
+    # Arrange
+    app = Starlette(routes=[Route("/params/{param}", endpoint=one_parametrize, methods=["GET"])])
+    setup_monitoring(app=app, config=MonitoringConfig(access_log_summary=AccessLogSummaryConfig(interval=60)))
+
+    # Act
+    with (
+        capture_logs() as logs,
+        caplog.at_level(logging.INFO, logger="asgi_monitor.access"),
+        TestClient(app) as client,
+    ):
+        client.get("/params/one")
+        client.get("/params/two")
+
+    # Assert
+    assert_that([record for record in caplog.records if record.name == "asgi_monitor.access"]).is_empty()
+    assert_that(logs).extracting("method", "route", "count", "errors").is_equal_to(
+        [("GET", "/params/{param}", 2, 0)],
+    )
@@ -8,7 +8,7 @@ from opentelemetry import trace
 from structlog import get_logger
 from uvicorn import Config
 
-from asgi_monitor.integrations.fastapi import setup_tracing
+from asgi_monitor.integrations.fastapi import MonitoringConfig, setup_monitoring, setup_tracing
 from asgi_monitor.logging import configure_logging
 from asgi_monitor.logging.uvicorn import build_uvicorn_log_config
 from tests.integration.factory import build_fastapi_tracing_config, run_server
@@ -256,3 +256,42 @@ async def test_uvicorn_logs_with_trace_in_controller_format_json(capfd: CaptureF
         "parent_span_id",
     )
     assert_that(error_log).does_not_contain_key("structlog_name")
+
+
+async def test_uvicorn_logs_with_monitoring_access_log_format_json(capfd: CaptureFixture) -> None:
+    # Arrange
+    trace_config, _ = build_fastapi_tracing_config()
+    app = FastAPI()
+    app.include_router(router)
+
+    setup_monitoring(app, MonitoringConfig(tracing=trace_config))
+    configure_logging(level=logging.INFO, json_format=True, include_trace=False)
+
+    log_config = build_uvicorn_log_config(
+        level=logging.INFO,
+        json_format=True,
+        include_trace=True,
+        access_logger_name="asgi_monitor.access",
+    )
+    config = Config(app=app, log_config=log_config)
+
+    # Act
+    async with run_server(config), AsyncClient() as client:
+        await client.get("http://127.0.0.1:8000/log")
+
+    # Assert
+    logs = read_json_logs(capfd)
+    access_logs = [log for log in logs if log["logger"] in ("uvicorn.access", "asgi_monitor.access")]
+
+    assert_that(access_logs).is_length(1)
+    access_log = access_logs[0]
+    assert_that(access_log).contains_entry(
+        {"logger": "asgi_monitor.access"},
+        {"event": f'{access_log["client_addr"]} - "GET /log HTTP/1.1" 200'},
+        {"method": "GET"},
+        {"path": "/log"},
+        {"route": "/log"},
+        {"status_code": 200},
+        {"response_size": len(b'{"status":"ok"}')},
+    )
+    assert_that(access_log).contains_key("duration", "trace_id", "span_id", "timestamp")
@@ -4,6 +4,7 @@ from pathlib import Path
 
 from assertpy import assert_that
 
+from asgi_monitor.logging import PRODUCTION_CALLSITE_PARAMETERS
 from asgi_monitor.logging.uvicorn import build_uvicorn_log_config
 
 
@@ -34,6 +35,44 @@ def test_generate_log_config_file(tmpdir: Path) -> None:
     assert_that(result.stdout.decode()).contains(f"Successfully wrote log config in {path}")
 
 
+def test_generate_log_config_file_with_callsite_parameters(tmpdir: Path) -> None:
+    # Arrange
+    path = str(tmpdir) + "/log_config.json"
+    expected = build_uvicorn_log_config(
+        json_format=True,
+        include_trace=False,
+        callsite_parameters=PRODUCTION_CALLSITE_PARAMETERS,
+    )
+
+    # Act
+    subprocess.run(
+        [
+            "asgi-monitor",
+            "uvicorn-log-config",
+            "--path",
+            path,
+            "--json-format",
+            "--callsite-parameter",
+            "module",
+            "--callsite-parameter",
+            "func_name",
+            "--callsite-parameter",
+            "lineno",
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+    # Assert
+    with Path(path).open("r") as f:
+        log_config = json.load(f)
+
+    assert_that(log_config).is_equal_to(expected)
+    assert_that(log_config["formatters"]["default"]["callsite_parameters"]).is_equal_to(
+        ["func_name", "lineno", "module"],
+    )
+
+
 def test_generate_log_config_file_not_json(tmpdir: Path) -> None:
     # Arrange
     path = str(tmpdir) + "/log_config.ini"
@@ -0,0 +1,62 @@
+import pytest
+from assertpy import assert_that
+
+from asgi_monitor.logging import AccessLogSamplingConfig
+from asgi_monitor.logging.access import AccessLogSampler
+
+
+@pytest.mark.parametrize(
+    ("status_code", "duration", "expected"),
+    [
+        (500, 0.01, 1.0),
+        (503, 0.01, 1.0),
+        (200, 1.5, 1.0),
+        (404, 2.0, 1.0),
+        (200, 0.01, None),
+        (404, 0.01, None),
+    ],
+)
+def test_sampler_keeps_errors_and_slow_requests(status_code: int, duration: float, expected: float | None) -> None:
+    # Arrange
+    sampler = AccessLogSampler(AccessLogSamplingConfig(sample_rate=0, slow_request_threshold=1.0))
+
+    # Act
+    sample_rate = sampler.sample(status_code, int(duration * 1e9))
+
+    # Assert
+    assert_that(sample_rate).is_equal_to(expected)
+
+
+def test_sampler_logs_fraction_of_requests() -> None:
+    # Arrange
+    sampler = AccessLogSampler(AccessLogSamplingConfig(sample_rate=0.1))
+
+    # Act
+    sample_rates = [sampler.sample(200, 1_000_000) for _ in range(10_000)]
+
+    # Assert
+    logged = [sample_rate for sample_rate in sample_rates if sample_rate is not None]
+    assert_that(logged).contains_only(0.1)
+    assert_that(len(logged)).is_between(700, 1300)
+
+
+def test_sampler_without_error_and_slow_request_rules() -> None:
+    # Arrange
+    config = AccessLogSamplingConfig(sample_rate=0, slow_request_threshold=None, always_log_server_errors=False)
+    sampler = AccessLogSampler(config)
+
+    # Act
+    sample_rate = sampler.sample(500, 10_000_000_000)
+
+    # Assert
+    assert_that(sample_rate).is_none()
+
+
+@pytest.mark.parametrize("sample_rate", [-0.1, 1.5])
+def test_sampler_invalid_sample_rate(sample_rate: float) -> None:
+    # Arrange
+    config = AccessLogSamplingConfig(sample_rate=sample_rate)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="The sample rate must be between 0 and 1"):
+        AccessLogSampler(config)
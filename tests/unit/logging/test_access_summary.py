@@ -0,0 +1,102 @@
+import gc
+import time
+import weakref
+
+from assertpy import assert_that
+from structlog.testing import capture_logs
+
+from asgi_monitor.logging import AccessLogSummaryConfig, access
+from asgi_monitor.logging.access import AccessLogSummarizer
+
+
+def test_summarizer_aggregates_routes() -> None:
+    # Arrange
+    summarizer = AccessLogSummarizer(AccessLogSummaryConfig(interval=60), "asgi_monitor.access")
+
+    # Act
+    with capture_logs() as logs:
+        for duration_ms in range(1, 101):
+            summarizer.record("GET", "/items/{id}", 200, duration_ms * 1_000_000, 10)
+        summarizer.record("GET", "/items/{id}", 500, 1_000_000, 0)
+        summarizer.record("POST", "/items", 201, 2_000_000, 5)
+        summarizer.close()
+
+    # Assert
+    assert_that(logs).is_equal_to(
+        [
+            {
+                "event": "access summary",
+                "log_level": "info",
+                "method": "GET",
+                "route": "/items/{id}",
+                "count": 101,
+                "errors": 1,
+                "response_size": 1000,
+                "p50": 50.0,
+                "p95": 95.0,
+                "p99": 99.0,
+                "interval": 60,
+            },
+            {
+                "event": "access summary",
+                "log_level": "info",
+                "method": "POST",
+                "route": "/items",
+                "count": 1,
+                "errors": 0,
+                "response_size": 5,
+                "p50": 2.0,
+                "p95": 2.0,
+                "p99": 2.0,
+                "interval": 60,
+            },
+        ],
+    )
+
+
+def test_summarizer_keeps_bounded_sample() -> None:
+    # Arrange
+    summarizer = AccessLogSummarizer(AccessLogSummaryConfig(interval=60, max_samples=100), "asgi_monitor.access")
+
+    # Act
+    for _ in range(10_000):
+        summarizer.record("GET", "/", 200, 1_000_000, 0)
+
+    # Assert
+    (summary,) = summarizer._routes.values()
+    assert_that(summary.count).is_equal_to(10_000)
+    assert_that(summary.durations).is_length(100)
+    summarizer.close()
+
+
+def test_summarizer_logs_every_interval() -> None:
+    # Arrange
+    summarizer = AccessLogSummarizer(AccessLogSummaryConfig(interval=0.01), "asgi_monitor.access")
+
+    # Act
+    with capture_logs() as logs:
+        summarizer.record("GET", "/", 200, 1_000_000, 0)
+        deadline = time.monotonic() + 5
+        while not logs and time.monotonic() < deadline:
+            time.sleep(0.01)
+        summarizer.close()
+
+    # Assert
+    assert_that(logs).extracting("route", "count").is_equal_to([("/", 1)])
+
+
+def test_summarizers_reset_after_fork_are_not_kept_alive() -> None:
+    # Arrange
+    summarizer = AccessLogSummarizer(AccessLogSummaryConfig(interval=60), "asgi_monitor.access")
+    dropped = weakref.ref(AccessLogSummarizer(AccessLogSummaryConfig(interval=60), "asgi_monitor.access"))
+    summarizer.record("GET", "/", 200, 1_000_000, 0)
+
+    # Act
+    gc.collect()
+    access._after_fork()
+
+    # Assert
+    assert_that(dropped()).is_none()
+    assert_that(summarizer._routes).is_empty()
+    assert_that(summarizer._thread).is_none()
+    summarizer.close()
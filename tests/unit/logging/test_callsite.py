@@ -0,0 +1,75 @@
+import logging
+
+import pytest
+from assertpy import assert_that
+from structlog.processors import CallsiteParameter
+from structlog.typing import EventDict
+
+from asgi_monitor.logging import PRODUCTION_CALLSITE_PARAMETERS, callsite
+from asgi_monitor.logging.callsite import CachedCallsiteParameterAdder
+
+
+def _log(adder: CachedCallsiteParameterAdder) -> EventDict:
+    return adder(logging.getLogger(), "info", {})
+
+
+def test_cached_callsite_parameters() -> None:
+    # Arrange
+    adder = CachedCallsiteParameterAdder(PRODUCTION_CALLSITE_PARAMETERS)
+
+    # Act
+    first = adder(logging.getLogger(), "info", {})
+    second = adder(logging.getLogger(), "info", {})
+
+    # Assert
+    assert_that(first).is_equal_to(
+        {"module": "test_callsite", "func_name": "test_cached_callsite_parameters"},
+        ignore="lineno",
+    )
+    assert_that(second["lineno"]).is_equal_to(first["lineno"] + 1)
+    assert_that(adder._cache).is_length(1)
+
+
+def test_cached_callsite_parameters_per_code() -> None:
+    # Arrange
+    adder = CachedCallsiteParameterAdder({CallsiteParameter.FUNC_NAME, CallsiteParameter.THREAD_NAME})
+
+    # Act
+    direct = adder(logging.getLogger(), "info", {})
+    nested = _log(adder)
+
+    # Assert
+    assert_that(direct).is_equal_to(
+        {"func_name": "test_cached_callsite_parameters_per_code", "thread_name": "MainThread"}
+    )
+    assert_that(nested).is_equal_to({"func_name": "_log", "thread_name": "MainThread"})
+    assert_that(adder._cache).is_length(2)
+
+
+def test_foreign_record_callsite_parameters() -> None:
+    # Arrange
+    adder = CachedCallsiteParameterAdder(PRODUCTION_CALLSITE_PARAMETERS)
+    record = logging.LogRecord("test", logging.INFO, "/app/views.py", 42, "message", None, None, func="index")
+
+    # Act
+    event_dict = adder(logging.getLogger(), "info", {"_record": record, "_from_structlog": False})
+
+    # Assert
+    assert_that(event_dict).contains_entry({"module": "views"}, {"func_name": "index"}, {"lineno": 42})
+    assert_that(adder._cache).is_empty()
+
+
+def test_callsite_parameters_without_private_structlog_api(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Arrange
+    monkeypatch.setattr(callsite, "_find_first_app_frame_and_name", None)
+    adder = CachedCallsiteParameterAdder(PRODUCTION_CALLSITE_PARAMETERS)
+
+    # Act
+    event_dict = adder(logging.getLogger(), "info", {})
+
+    # Assert
+    assert_that(event_dict).is_equal_to(
+        {"module": "test_callsite", "func_name": "test_callsite_parameters_without_private_structlog_api"},
+        ignore="lineno",
+    )
+    assert_that(adder._cache).is_empty()
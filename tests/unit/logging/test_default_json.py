@@ -1,11 +1,19 @@
 import logging
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
+import pytest
 import structlog
 from _pytest.capture import CaptureFixture
 from assertpy import assert_that
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.trace import format_trace_id
+from structlog._frames import _find_first_app_frame_and_name
 
-from asgi_monitor.logging import configure_logging
+from asgi_monitor.logging import PRODUCTION_CALLSITE_PARAMETERS, LogQueueConfig, configure_logging
+from asgi_monitor.logging.queue import BoundedQueueHandler
 from tests.utils import capture_full_logs, read_json_logs
 
 
@@ -40,6 +48,34 @@ def test_simple_log(capfd: CaptureFixture) -> None:
     )
 
 
+def test_production_callsite_parameters_log(capfd: CaptureFixture) -> None:
+    # Arrange
+    configure_logging(
+        level=logging.INFO,
+        json_format=True,
+        include_trace=False,
+        callsite_parameters=PRODUCTION_CALLSITE_PARAMETERS,
+    )
+    logger = structlog.get_logger("testlogger")
+
+    # Act
+    logger.info("simple message")
+
+    # Assert
+    [simple_log] = read_json_logs(capfd)
+    assert_that(simple_log).is_equal_to(
+        {
+            "event": "simple message",
+            "func_name": "test_production_callsite_parameters_log",
+            "level": "info",
+            "logger": "testlogger",
+            "module": "test_default_json",
+        },
+        ignore=["timestamp", "lineno"],
+    )
+    assert_that(simple_log).contains_key("timestamp", "lineno")
+
+
 def test_simple_log_with_empty_trace(capfd: CaptureFixture) -> None:
     # Arrange
     configure_logging(level=logging.INFO, json_format=True, include_trace=True)
@@ -190,3 +226,146 @@ def test_filter_logs_by_level(capfd: CaptureFixture) -> None:
     # Assert
     messages = read_json_logs(capfd)
     assert_that(messages).extracting("level").contains_only("warning", "error")
+
+
+def test_filter_logs_by_level_name(capfd: CaptureFixture) -> None:
+    # Arrange
+    configure_logging(level="DEBUG", json_format=True, include_trace=False)
+    logger = structlog.get_logger("testlogger")
+
+    # Act
+    logger.debug("debug message")
+    logger.info("info message")
+
+    # Assert
+    messages = read_json_logs(capfd)
+    assert_that(messages).extracting("level").is_equal_to(["debug", "info"])
+
+
+@pytest.mark.parametrize(
+    ("level", "expected_levels"),
+    [
+        (5, ["debug", "info", "warning"]),
+        (15, ["info", "warning"]),
+        (25, ["warning"]),
+    ],
+)
+def test_filter_logs_by_custom_level(capfd: CaptureFixture, level: int, expected_levels: list[str]) -> None:
+    # Arrange
+    configure_logging(level=level, json_format=True, include_trace=False)
+    logger = structlog.get_logger("testlogger")
+
+    # Act
+    logger.debug("debug message")
+    logger.info("info message")
+    logger.warning("warning message")
+
+    # Assert
+    messages = read_json_logs(capfd)
+    assert_that(messages).extracting("level").is_equal_to(expected_levels)
+
+
+def test_filtered_logs_skip_processors(capfd: CaptureFixture, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Arrange
+    calls = []
+
+    def find_frame(*args: Any, **kwargs: Any) -> Any:
+        calls.append(args)
+        return _find_first_app_frame_and_name(*args, **kwargs)
+
+    monkeypatch.setattr("asgi_monitor.logging.callsite._find_first_app_frame_and_name", find_frame)
+    configure_logging(level=logging.INFO, json_format=True, include_trace=False)
+    logger = structlog.get_logger("testlogger")
+
+    # Act
+    for _ in range(10):
+        logger.debug("debug message", key="value")
+    logger.info("info message")
+
+    # Assert
+    [info_log] = read_json_logs(capfd)
+    assert_that(info_log).contains_entry({"event": "info message"})
+    assert_that(calls).is_length(1)
+
+
+def test_unknown_level() -> None:
+    # Act & Assert
+    with pytest.raises(ValueError, match="Unknown level"):
+        configure_logging(level="VERBOSE", json_format=True, include_trace=False)
+
+
+def test_simple_log_through_queue(capfd: CaptureFixture) -> None:
+    # Arrange
+    configure_logging(level=logging.INFO, json_format=True, include_trace=False, queue=LogQueueConfig(max_size=10))
+    logger = structlog.get_logger("testlogger")
+    (handler,) = [handler for handler in logging.getLogger().handlers if isinstance(handler, BoundedQueueHandler)]
+
+    # Act
+    logger.info("queued message", key="value")
+    handler.close()
+
+    # Assert
+    [simple_log] = read_json_logs(capfd)
+    assert_that(simple_log).contains_entry(
+        {"event": "queued message"},
+        {"key": "value"},
+        {"func_name": "test_simple_log_through_queue"},
+        {"thread_name": "MainThread"},
+    )
+
+
+def test_deferred_rendering_log(capfd: CaptureFixture) -> None:
+    # Arrange
+    queue = LogQueueConfig(max_size=10, deferred_rendering=True)
+    configure_logging(level=logging.INFO, json_format=True, include_trace=True, queue=queue)
+    struct_logger = structlog.get_logger("testlogger")
+    std_logger = logging.getLogger("stdlogger")
+    (handler,) = [handler for handler in logging.getLogger().handlers if isinstance(handler, BoundedQueueHandler)]
+    trace.set_tracer_provider(TracerProvider(resource=Resource.create({"service.name": "test"})))
+    tracer = trace.get_tracer(__name__)
+
+    # Act
+    with structlog.contextvars.bound_contextvars(request_id="42"), tracer.start_as_current_span("test") as span:
+        struct_logger.info("structlog message", key="value")
+        std_logger.info("logging message %s", "arg")
+    created = datetime.now(tz=timezone.utc)
+    handler.close()
+
+    # Assert
+    struct_log, std_log = [log for log in read_json_logs(capfd) if log["logger"] in ("testlogger", "stdlogger")]
+    trace_id = format_trace_id(span.get_span_context().trace_id)
+    for log in (struct_log, std_log):
+        assert_that(log).contains_entry(
+            {"request_id": "42"},
+            {"trace_id": trace_id},
+            {"func_name": "test_deferred_rendering_log"},
+            {"thread_name": "MainThread"},
+            {"level": "info"},
+        )
+        timestamp = datetime.strptime(log["timestamp"], "%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=timezone.utc)
+        assert_that(timestamp).is_less_than_or_equal_to(created)
+    assert_that(struct_log).contains_entry({"event": "structlog message"}, {"key": "value"}, {"logger": "testlogger"})
+    assert_that(std_log).contains_entry({"event": "logging message arg"}, {"logger": "stdlogger"})
+    assert_that(std_log).does_not_contain_key("_asgi_monitor_context")
+
+
+def test_deferred_rendering_exception_log(capfd: CaptureFixture) -> None:
+    # Arrange
+    queue = LogQueueConfig(max_size=10, deferred_rendering=True)
+    configure_logging(level=logging.INFO, json_format=True, include_trace=False, queue=queue)
+    logger = structlog.get_logger("testlogger")
+    (handler,) = [handler for handler in logging.getLogger().handlers if isinstance(handler, BoundedQueueHandler)]
+
+    # Act
+    try:
+        1 / 0  # noqa: B018
+    except ZeroDivisionError as exc:
+        logger.exception("exception message")
+        error = exc
+    logger.error("error message", exc_info=error)
+    handler.close()
+
+    # Assert
+    exception_log, error_log = read_json_logs(capfd)
+    for log in (exception_log, error_log):
+        assert_that(log["exception"]).starts_with("Traceback").contains("ZeroDivisionError: division by zero")
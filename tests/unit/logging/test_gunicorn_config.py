@@ -1,4 +1,5 @@
 import logging
+from pathlib import Path
 from typing import Any
 
 import pytest
@@ -11,6 +12,7 @@ from asgi_monitor.logging.uvicorn.worker import (
     StructlogTraceJSONLogUvicornWorker,
     StructlogTraceTextLogUvicornWorker,
 )
+from asgi_monitor.metrics.multiprocess import gunicorn_child_exit
 
 
 def gunicorn_app(worker_class: str) -> GunicornStandaloneApplication:
@@ -45,3 +47,25 @@ def test_uvicorn_text_worker(worker: str, expected: Any) -> None:
 
     # Assert
     assert gunicorn.cfg.worker_class == expected
+
+
+def test_child_exit_hook_multiprocess(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Arrange
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    # Act
+    gunicorn = gunicorn_app("asgi_monitor.logging.uvicorn.worker.StructlogTextLogUvicornWorker")
+
+    # Assert
+    assert gunicorn.cfg.child_exit is gunicorn_child_exit
+
+
+def test_child_exit_hook_without_multiprocess(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Arrange
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+    # Act
+    gunicorn = gunicorn_app("asgi_monitor.logging.uvicorn.worker.StructlogTextLogUvicornWorker")
+
+    # Assert
+    assert gunicorn.cfg.child_exit is not gunicorn_child_exit
@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+import pytest
+from assertpy import assert_that
+from structlog.processors import JSONRenderer
+
+from asgi_monitor.logging import _json
+from asgi_monitor.logging._json import _build_json_renderer
+
+
+class NotSerializable:
+    def __repr__(self) -> str:
+        return "<NotSerializable>"
+
+
+@pytest.fixture(params=["fast", "stdlib"])
+def renderer(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> JSONRenderer:
+    if request.param == "stdlib":
+        monkeypatch.setattr(_json, "_fast_dumps", None)
+    return _build_json_renderer()
+
+
+def test_render_event(renderer: JSONRenderer) -> None:
+    # Arrange
+    event_dict = {"event": "message", "count": 1, "ratio": 0.5, "tags": ["a", "b"], "nested": {"key": None}}
+
+    # Act
+    rendered = renderer(None, "info", event_dict)
+
+    # Assert
+    assert_that(rendered).is_instance_of(str)
+    assert_that(json.loads(rendered)).is_equal_to(event_dict)
+
+
+def test_render_compact_line(renderer: JSONRenderer) -> None:
+    # Arrange
+    event_dict = {"event": "привет", "count": 1, "tags": ["a", "b"], "nested": {"key": None}}
+
+    # Act
+    rendered = renderer(None, "info", event_dict)
+
+    # Assert
+    assert_that(rendered).is_equal_to('{"event":"привет","count":1,"tags":["a","b"],"nested":{"key":null}}')
+
+
+def test_render_not_serializable_values(renderer: JSONRenderer) -> None:
+    # Arrange
+    # The integer key is not a valid key of an event dict, but it is rendered as a string
+    event_dict: dict[Any, Any] = {"event": "message", "value": NotSerializable(), 1: "int key", "big": 2**70}
+
+    # Act
+    rendered = renderer(None, "info", event_dict)
+
+    # Assert
+    assert_that(json.loads(rendered)).is_equal_to(
+        {"event": "message", "value": "<NotSerializable>", "1": "int key", "big": 2**70},
+    )
+
+
+def test_render_with_orjson() -> None:
+    # Arrange
+    pytest.importorskip("orjson")
+    renderer = _build_json_renderer()
+    event_dict = {"event": "message", "time": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+
+    # Act
+    rendered = renderer(None, "info", event_dict)
+
+    # Assert
+    assert_that(_json._fast_dumps).is_not_none()
+    assert_that(rendered).is_equal_to('{"event":"message","time":"2024-01-01T00:00:00+00:00"}')
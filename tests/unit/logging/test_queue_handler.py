@@ -0,0 +1,137 @@
+import io
+import logging
+import threading
+from collections.abc import Iterator
+
+import pytest
+from assertpy import assert_that
+
+from asgi_monitor.logging import LogQueueConfig, get_dropped_records
+from asgi_monitor.logging.queue import BoundedQueueHandler
+from asgi_monitor.logging.uvicorn import build_uvicorn_log_config
+
+
+class SlowStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.released = threading.Event()
+        self.writing = threading.Event()
+
+    def write(self, s: str) -> int:
+        self.writing.set()
+        self.released.wait(5)
+        return super().write(s)
+
+
+@pytest.fixture
+def logger() -> Iterator[logging.Logger]:
+    logger = logging.getLogger("test_queue_handler")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield logger
+    logger.handlers.clear()
+
+
+def test_queue_handler_writes_from_thread(logger: logging.Logger) -> None:
+    # Arrange
+    stream = io.StringIO()
+    handler = BoundedQueueHandler(stream)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    logger.addHandler(handler)
+
+    # Act
+    logger.info("one %s", 1)
+    logger.warning("two")
+    handler.close()
+
+    # Assert
+    assert_that(stream.getvalue()).is_equal_to("INFO one 1\nWARNING two\n")
+
+
+def test_queue_handler_drops_records_when_full(logger: logging.Logger) -> None:
+    # Arrange
+    stream = SlowStream()
+    handler = BoundedQueueHandler(stream, max_size=2)
+    logger.addHandler(handler)
+    dropped = get_dropped_records()
+
+    # Act
+    logger.info("first")
+    stream.writing.wait(5)  # the listener is stuck on the first record
+    for i in range(5):
+        logger.info("record %d", i)
+    stream.released.set()
+    handler.close()
+
+    # Assert
+    assert_that(handler.dropped).is_equal_to(3)
+    assert_that(get_dropped_records() - dropped).is_equal_to(3)
+    assert_that(stream.getvalue().splitlines()).is_equal_to(["first", "record 0", "record 1"])
+
+
+def test_queue_handler_blocks_when_full(logger: logging.Logger) -> None:
+    # Arrange
+    stream = SlowStream()
+    handler = BoundedQueueHandler(stream, max_size=1, block=True)
+    logger.addHandler(handler)
+
+    # Act
+    logger.info("first")
+    stream.writing.wait(5)
+    logger.info("second")
+    writer = threading.Thread(target=logger.info, args=("third",))
+    writer.start()
+    writer.join(0.1)
+    is_blocked = writer.is_alive()
+    stream.released.set()
+    writer.join(5)
+    handler.close()
+
+    # Assert
+    assert_that(is_blocked).is_true()
+    assert_that(handler.dropped).is_zero()
+    assert_that(stream.getvalue().splitlines()).is_equal_to(["first", "second", "third"])
+
+
+def test_uvicorn_log_config_with_queue() -> None:
+    # Arrange
+    queue = LogQueueConfig(max_size=100, block=True)
+
+    # Act
+    log_config = build_uvicorn_log_config(json_format=True, include_trace=False, queue=queue)
+
+    # Assert
+    assert_that(log_config["handlers"]["default"]).is_equal_to(
+        {
+            "()": "asgi_monitor.logging.queue.BoundedQueueHandler",
+            "formatter": "default",
+            "stream": "ext://sys.stdout",
+            "max_size": 100,
+            "block": True,
+        },
+    )
+    assert_that(log_config["handlers"]["access"]).contains_entry(
+        {"()": "asgi_monitor.logging.queue.BoundedQueueHandler"},
+        {"formatter": "access"},
+    )
+
+
+def test_uvicorn_log_config_with_deferred_rendering() -> None:
+    # Arrange
+    queue = LogQueueConfig(max_size=100, deferred_rendering=True)
+
+    # Act
+    log_config = build_uvicorn_log_config(json_format=True, include_trace=True, queue=queue)
+
+    # Assert
+    assert_that(log_config["formatters"]).is_equal_to(
+        {
+            "default": {"()": "asgi_monitor.logging.uvicorn.log_config.UvicornDefaultJSONFormatter", "deferred": True},
+            "access": {
+                "()": "asgi_monitor.logging.uvicorn.log_config.TraceUvicornAccessJSONFormatter",
+                "deferred": True,
+            },
+        },
+    )
+    assert_that(log_config["handlers"]["default"]).contains_entry({"deferred": True}, {"include_trace": False})
+    assert_that(log_config["handlers"]["access"]).contains_entry({"deferred": True}, {"include_trace": True})
@@ -0,0 +1,146 @@
+import gzip
+import urllib.request
+from pathlib import Path
+
+import pytest
+from assertpy import assert_that
+
+from asgi_monitor.metrics.aggregator import MetricsAggregator, start_metrics_aggregator
+from asgi_monitor.metrics.server import MetricsServer
+from tests.utils import UnixHTTPConnection, fetch_metrics, write_multiprocess_value
+
+
+def test_aggregator_snapshot(tmp_path: Path) -> None:
+    # Arrange
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/"}, 1.0)
+    aggregator = MetricsAggregator(str(tmp_path))
+
+    # Act
+    before_refresh = aggregator.render()
+    write_multiprocess_value(tmp_path / "counter_2.db", "test_requests_total", {"path": "/"}, 2.0)
+    not_refreshed = aggregator.render()
+    aggregator.refresh()
+    refreshed = aggregator.render(accept_encoding="gzip")
+
+    # Assert
+    assert_that(before_refresh.payload.decode()).contains('test_requests_total{path="/"} 1.0')
+    assert not_refreshed.payload == before_refresh.payload
+    assert_that(refreshed.headers).contains_entry({"Content-Encoding": "gzip"})
+    assert_that(gzip.decompress(refreshed.payload).decode()).contains('test_requests_total{path="/"} 3.0')
+
+
+def test_aggregator_port(tmp_path: Path) -> None:
+    # Arrange
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/"}, 1.0)
+    aggregator, server = start_metrics_aggregator(str(tmp_path), host="127.0.0.1", port=0, interval=0.01)
+    host, port = server.address
+
+    # Act
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            status = response.status
+            content_type = response.headers["Content-Type"]
+            payload = response.read()
+    finally:
+        server.stop()
+        aggregator.stop()
+
+    # Assert
+    assert status == 200
+    assert content_type == "text/plain; version=0.0.4; charset=utf-8"
+    assert_that(payload.decode()).contains('test_requests_total{path="/"} 1.0')
+
+
+def test_aggregator_unix_socket(tmp_path: Path) -> None:
+    # Arrange
+    multiproc_dir = tmp_path / "multiproc"
+    multiproc_dir.mkdir()
+    unix_socket = str(tmp_path / "metrics.sock")
+    write_multiprocess_value(multiproc_dir / "counter_1.db", "test_requests_total", {"path": "/"}, 1.0)
+    aggregator, server = start_metrics_aggregator(str(multiproc_dir), unix_socket=unix_socket, openmetrics_format=True)
+
+    # Act
+    try:
+        connection = UnixHTTPConnection(unix_socket)
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        payload = response.read()
+        connection.close()
+    finally:
+        server.stop()
+        aggregator.stop()
+
+    # Assert
+    assert response.status == 200
+    assert response.headers["Content-Type"] == "application/openmetrics-text; version=1.0.0; charset=utf-8"
+    assert_that(payload.decode()).contains('test_requests_total{path="/"} 1.0').ends_with("# EOF\n")
+    assert not Path(unix_socket).exists()
+
+
+def test_metrics_server_requires_one_address(tmp_path: Path) -> None:
+    # Arrange
+    aggregator = MetricsAggregator(str(tmp_path))
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Exactly one of port or unix_socket must be specified"):
+        MetricsServer(aggregator.render)
+
+
+def test_aggregator_names(tmp_path: Path) -> None:
+    # Arrange
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/"}, 1.0)
+    write_multiprocess_value(tmp_path / "gauge_livesum_1.db", "test_requests_in_progress", {"path": "/"}, 2.0)
+    aggregator, server = start_metrics_aggregator(str(tmp_path), host="127.0.0.1", port=0)
+    host, port = server.address
+
+    # Act
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics?name[]=test_requests_in_progress") as response:
+            payload = response.read()
+    finally:
+        server.stop()
+        aggregator.stop()
+
+    # Assert
+    assert_that(payload.decode()).contains('test_requests_in_progress{path="/"} 2.0')
+    assert_that(payload.decode()).does_not_contain("test_requests_total")
+
+
+def test_aggregator_not_modified(tmp_path: Path) -> None:
+    # Arrange
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/"}, 1.0)
+    aggregator = MetricsAggregator(str(tmp_path))
+    etag = aggregator.render().headers["ETag"]
+
+    # Act
+    aggregator.refresh()
+    not_modified = aggregator.render(accept_encoding="gzip", if_none_match=etag)
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/"}, 2.0)
+    aggregator.refresh()
+    modified = aggregator.render(if_none_match=etag)
+
+    # Assert
+    assert not_modified.status_code == 304
+    assert not_modified.payload == b""
+    assert modified.status_code == 200
+    assert_that(modified.payload.decode()).contains('test_requests_total{path="/"} 2.0')
+
+
+def test_aggregator_server_not_modified(tmp_path: Path) -> None:
+    # Arrange
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/"}, 1.0)
+    aggregator, server = start_metrics_aggregator(str(tmp_path), host="127.0.0.1", port=0)
+
+    # Act
+    try:
+        _, first = fetch_metrics(server.address)
+        etag = aggregator.render().headers["ETag"]
+        status, payload = fetch_metrics(server.address, headers={"If-None-Match": etag})
+    finally:
+        server.stop()
+        aggregator.stop()
+
+    # Assert
+    assert_that(first.decode()).contains('test_requests_total{path="/"} 1.0')
+    assert status == 304
+    assert payload == b""
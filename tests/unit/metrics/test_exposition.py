@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, Info, Summary, generate_latest
+
+from asgi_monitor.metrics.container import MetricsContainer
+from asgi_monitor.metrics.exposition import TextExpositionEncoder
+from asgi_monitor.metrics.manager import MetricsManager
+
+
+def build_registry() -> CollectorRegistry:
+    registry = CollectorRegistry()
+    registry.set_target_info({"service": "test"})
+    manager = MetricsManager(app_name="asgi-monitor", container=MetricsContainer("test", registry))
+
+    manager.add_app_info()
+    manager.inc_requests_count(method="GET", path='/quote"back\\slash\nnewline')
+    manager.inc_responses_count(method="GET", path="/", status_code=200)
+    manager.add_request_in_progress(method="GET", path="/")
+    manager.observe_request_duration(method="GET", path="/", duration=0.3, exemplar=None)
+    manager.observe_request_duration(method="GET", path="/", duration=100.0, exemplar=None)
+    manager.inc_requests_exceptions_count(method="GET", path="/", exception_type="ValueError")
+
+    Counter("unlabelled", "Unlabelled \\ counter\nwith newline", registry=registry).inc()
+    Gauge("negative", "Negative gauge", ["kind"], registry=registry).labels(kind="a").set(-1.5e-10)
+    Histogram("negative_buckets", "Histogram", ["kind"], buckets=[-1, 0, 1], registry=registry).labels("a").observe(2)
+    Summary("summary", "Summary", ["kind"], registry=registry).labels(kind="a").observe(1)
+    Info("build", "Build information", registry=registry).info({"version": "1"})
+    Gauge("empty", "Gauge without children", ["kind"], registry=registry)
+    return registry
+
+
+def test_encoder_matches_generate_latest() -> None:
+    # Arrange
+    registry = build_registry()
+    encoder = TextExpositionEncoder()
+
+    # Act
+    first = encoder.encode(registry)
+    second = encoder.encode(registry)
+
+    # Assert
+    assert first == generate_latest(registry)
+    assert second == first
+
+
+def test_encoder_cached_children_changes() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    encoder = TextExpositionEncoder()
+    gauge = Gauge("test_gauge", "Gauge", ["path"], registry=registry)
+    gauge.labels(path="/").set(1)
+    gauge.labels(path="/removed").set(2)
+    encoder.encode(registry)
+
+    # Act
+    gauge.labels(path="/").set(12345678.9)
+    gauge.remove("/removed")
+    gauge.labels(path="/new").set(3)
+    payload = encoder.encode(registry)
+
+    # Assert
+    assert payload == generate_latest(registry)
+
+
+def test_encoder_without_created_series(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Arrange
+    monkeypatch.setattr("prometheus_client.metrics._use_created", False)
+    registry = build_registry()
+
+    # Act
+    payload = TextExpositionEncoder().encode(registry)
+
+    # Assert
+    assert payload == generate_latest(registry)
+
+
+def test_encoder_function_gauge() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    encoder = TextExpositionEncoder()
+    values = iter([1.0, 2.0])
+    gauge = Gauge("test_gauge", "Gauge", ["path"], registry=registry)
+    gauge.labels(path="/").set(5)
+    gauge.labels(path="/function").set_function(lambda: next(values))
+
+    # Act
+    first = encoder.encode(registry)
+    second = encoder.encode(registry)
+
+    # Assert
+    assert b'test_gauge{path="/function"} 1.0' in first
+    assert b'test_gauge{path="/function"} 2.0' in second
+    assert b'test_gauge{path="/"} 5.0' in second
+
+
+def test_encoder_concurrent_scrapes() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    encoder = TextExpositionEncoder()
+    gauge = Gauge("test_gauge", "Gauge", ["path"], registry=registry)
+
+    def scrape(index: int) -> bytes:
+        gauge.labels(path=f"/{index}").set(index)
+        payload = encoder.encode(registry)
+        gauge.remove(f"/{index}")
+        return payload
+
+    # Act
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        payloads = list(executor.map(scrape, range(2000)))
+
+    # Assert
+    assert len(payloads) == 2000
+    assert encoder.encode(registry) == generate_latest(registry)
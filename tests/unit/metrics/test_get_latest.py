@@ -1,23 +1,30 @@
+import gzip
 import multiprocessing
 import os
 from multiprocessing import Process
 from pathlib import Path
+from typing import Any
 
+import pytest
 from assertpy import assert_that
-from dirty_equals import IsBytes
+from dirty_equals import IsBytes, IsStr
 
 from asgi_monitor.metrics import get_latest_metrics
 from asgi_monitor.metrics.config import _build_default_registry
 from asgi_monitor.metrics.container import MetricsContainer
-from asgi_monitor.metrics.get_latest import MetricsResponse
+from asgi_monitor.metrics.get_latest import MetricsResponse, stream_latest_metrics
 from asgi_monitor.metrics.manager import MetricsManager
+from tests.utils import write_multiprocess_value
+
+# The headers of MetricsResponse are typed as str, the ETag is matched by the pattern
+ETAG: Any = IsStr(regex=r'W/"[0-9a-f]{16}"')
 
 
 def test_get_latest_openmetrics_false(manager: MetricsManager) -> None:
     # Arrange
     expected = MetricsResponse(
         status_code=200,
-        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8", "ETag": ETAG},
         payload=IsBytes,  # type: ignore[arg-type]
     )
     manager.add_app_info()
@@ -38,7 +45,7 @@ def test_get_latest_openmetrics_true(manager: MetricsManager) -> None:
     # Arrange
     expected = MetricsResponse(
         status_code=200,
-        headers={"Content-Type": "application/openmetrics-text; version=1.0.0; charset=utf-8"},
+        headers={"Content-Type": "application/openmetrics-text; version=1.0.0; charset=utf-8", "ETag": ETAG},
         payload=IsBytes,  # type: ignore[arg-type]
     )
     manager.add_app_info()
@@ -81,7 +88,7 @@ def test_get_latest_metrics_multiprocess(tmpdir: Path, manager: MetricsManager)
 
     expected = MetricsResponse(
         status_code=200,
-        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8", "ETag": ETAG},
         payload=IsBytes,  # type: ignore[arg-type]
     )
 
@@ -95,3 +102,199 @@ def test_get_latest_metrics_multiprocess(tmpdir: Path, manager: MetricsManager)
         'test_requests_total{app_name="asgi-monitor",method="GET",path="/token"} 100.0',
         'test_requests_total{app_name="asgi-monitor",method="GET",path="/login"} 100.0',
     )
+
+
+def test_get_latest_metrics_gzip(manager: MetricsManager) -> None:
+    # Arrange
+    expected = MetricsResponse(
+        status_code=200,
+        headers={
+            "Content-Type": "text/plain; version=0.0.4; charset=utf-8",
+            "Content-Encoding": "gzip",
+            "Vary": "Accept-Encoding",
+            "ETag": ETAG,
+        },
+        payload=IsBytes,  # type: ignore[arg-type]
+    )
+    manager.add_app_info()
+
+    # Act
+    response = get_latest_metrics(
+        manager._container._registry,
+        openmetrics_format=False,
+        accept_encoding="deflate, gzip;q=0.8, br",
+    )
+
+    # Assert
+    assert_that(response).is_equal_to(expected)
+    assert_that(gzip.decompress(response.payload).decode()).contains(
+        'test_app_info{app_name="asgi-monitor"} 1.0',
+    )
+
+
+@pytest.mark.parametrize("accept_encoding", ["", "identity", "gzip;q=0", "br, deflate", "*;q=0"])
+def test_get_latest_metrics_not_compressed(manager: MetricsManager, accept_encoding: str) -> None:
+    # Arrange
+    expected = MetricsResponse(
+        status_code=200,
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8", "Vary": "Accept-Encoding", "ETag": ETAG},
+        payload=IsBytes,  # type: ignore[arg-type]
+    )
+    manager.add_app_info()
+
+    # Act
+    response = get_latest_metrics(
+        manager._container._registry,
+        openmetrics_format=False,
+        accept_encoding=accept_encoding,
+    )
+
+    # Assert
+    assert_that(response).is_equal_to(expected)
+    assert_that(response.payload.decode()).contains('test_app_info{app_name="asgi-monitor"} 1.0')
+
+
+def test_get_latest_metrics_wildcard_encoding(manager: MetricsManager) -> None:
+    # Act
+    response = get_latest_metrics(manager._container._registry, openmetrics_format=True, accept_encoding="*")
+
+    # Assert
+    assert_that(response.headers).contains_entry({"Content-Encoding": "gzip"})
+    assert_that(gzip.decompress(response.payload).decode()).ends_with("# EOF\n")
+
+
+def test_get_latest_metrics_names(manager: MetricsManager) -> None:
+    # Arrange
+    manager.add_app_info()
+    manager.inc_requests_count(method="GET", path="/metrics")
+    manager.add_request_in_progress(method="GET", path="/metrics")
+
+    # Act
+    response = get_latest_metrics(
+        manager._container._registry,
+        openmetrics_format=False,
+        names=["test_requests_in_progress", "test_requests_total"],
+    )
+
+    # Assert
+    assert_that(response.payload.decode()).contains(
+        'test_requests_in_progress{app_name="asgi-monitor",method="GET",path="/metrics"} 1.0',
+        'test_requests_total{app_name="asgi-monitor",method="GET",path="/metrics"} 1.0',
+    )
+    assert_that(response.payload.decode()).does_not_contain("test_app_info", "test_requests_created")
+
+
+def test_get_latest_metrics_names_multiprocess(
+    tmp_path: Path,
+    manager: MetricsManager,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/"}, 1.0)
+    write_multiprocess_value(tmp_path / "gauge_livesum_1.db", "test_requests_in_progress", {"path": "/"}, 2.0)
+
+    # Act
+    response = get_latest_metrics(
+        manager._container._registry,
+        openmetrics_format=False,
+        names=["test_requests_in_progress"],
+    )
+
+    # Assert
+    assert_that(response.payload.decode()).contains('test_requests_in_progress{path="/"} 2.0')
+    assert_that(response.payload.decode()).does_not_contain("test_requests_total")
+
+
+@pytest.mark.parametrize("openmetrics_format", [True, False])
+def test_stream_latest_metrics(manager: MetricsManager, *, openmetrics_format: bool) -> None:
+    # Arrange
+    manager.add_app_info()
+    manager.inc_requests_count(method="GET", path="/metrics")
+    manager.observe_request_duration(method="GET", path="/metrics", duration=0.1, exemplar=None)
+    registry = manager._container._registry
+
+    # Act
+    response = stream_latest_metrics(registry, openmetrics_format=openmetrics_format)
+    chunks = list(response.chunks)
+
+    # Assert
+    assert len(chunks) > 1
+    assert b"".join(chunks) == get_latest_metrics(registry, openmetrics_format=openmetrics_format).payload
+    assert_that(response.headers).is_equal_to(
+        get_latest_metrics(registry, openmetrics_format=openmetrics_format).headers,
+        ignore="ETag",
+    )
+
+
+def test_stream_latest_metrics_gzip(manager: MetricsManager) -> None:
+    # Arrange
+    manager.add_app_info()
+    registry = manager._container._registry
+
+    # Act
+    response = stream_latest_metrics(registry, openmetrics_format=False, accept_encoding="gzip")
+
+    # Assert
+    assert_that(response.headers).contains_entry({"Content-Encoding": "gzip"}, {"Vary": "Accept-Encoding"})
+    assert gzip.decompress(b"".join(response.chunks)) == get_latest_metrics(registry, openmetrics_format=False).payload
+
+
+def test_stream_latest_metrics_names_multiprocess(
+    tmp_path: Path,
+    manager: MetricsManager,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/"}, 1.0)
+    write_multiprocess_value(tmp_path / "gauge_livesum_1.db", "test_requests_in_progress", {"path": "/"}, 2.0)
+
+    # Act
+    response = stream_latest_metrics(
+        manager._container._registry,
+        openmetrics_format=False,
+        names=["test_requests_total"],
+    )
+    payload = b"".join(response.chunks).decode()
+
+    # Assert
+    assert_that(payload).contains('test_requests_total{path="/"} 1.0')
+    assert_that(payload).does_not_contain("test_requests_in_progress")
+
+
+def test_get_latest_metrics_not_modified(manager: MetricsManager) -> None:
+    # Arrange
+    manager.add_app_info()
+    registry = manager._container._registry
+    etag = get_latest_metrics(registry, openmetrics_format=False).headers["ETag"]
+
+    # Act
+    not_modified = get_latest_metrics(registry, openmetrics_format=False, accept_encoding="gzip", if_none_match=etag)
+    manager.add_app_info()
+    modified = get_latest_metrics(registry, openmetrics_format=False, if_none_match=etag)
+
+    # Assert
+    assert not_modified.status_code == 304
+    assert not_modified.payload == b""
+    assert_that(not_modified.headers).contains_entry({"ETag": etag}, {"Vary": "Accept-Encoding"})
+    assert_that(not_modified.headers).does_not_contain_key("Content-Encoding")
+    assert modified.status_code == 200
+    assert modified.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("if_none_match", ["*", '"other", {etag}', "{strong_etag}"])
+def test_get_latest_metrics_if_none_match(manager: MetricsManager, if_none_match: str) -> None:
+    # Arrange
+    registry = manager._container._registry
+    etag = get_latest_metrics(registry, openmetrics_format=False).headers["ETag"]
+
+    # Act
+    response = get_latest_metrics(
+        registry,
+        openmetrics_format=False,
+        if_none_match=if_none_match.format(etag=etag, strong_etag=etag.removeprefix("W/")),
+    )
+
+    # Assert
+    assert response.status_code == 304
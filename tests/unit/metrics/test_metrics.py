@@ -1,13 +1,19 @@
 import time
 from datetime import datetime, timezone
+from typing import Any
 
+import pytest
 from assertpy import assert_that
 from dirty_equals import IsStr
 from freezegun import freeze_time
+from opentelemetry.sdk.metrics import MeterProvider
 from prometheus_client.metrics import Exemplar, Metric, Sample
 
+from asgi_monitor.metrics.config import BaseMetricsConfig
 from asgi_monitor.metrics.container import MetricsContainer
-from asgi_monitor.metrics.manager import MetricsManager
+from asgi_monitor.metrics.manager import MetricsManager, build_metrics_manager
+from asgi_monitor.metrics.shared_memory import SharedMemoryConfig
+from asgi_monitor.metrics.statsd import StatsdConfig
 
 FROZEN_DATETIME = datetime(year=2024, month=2, day=28, hour=0, minute=40, second=50, tzinfo=timezone.utc)
 FROZEN_TIMESTAMP = 1709080850.0
@@ -268,3 +274,23 @@ def test_requests_exceptions_count(container: MetricsContainer, manager: Metrics
     # Assert
     requests_exceptions_count = container.requests_exceptions_count().collect()
     assert_that(requests_exceptions_count).is_equal_to([expected])
+
+
+@pytest.mark.parametrize(
+    ("backends", "names"),
+    [
+        ({"shared_memory": SharedMemoryConfig(name="test"), "statsd": StatsdConfig()}, "shared_memory, statsd"),
+        ({"meter_provider": MeterProvider(), "statsd": StatsdConfig()}, "meter_provider, statsd"),
+        (
+            {"shared_memory": SharedMemoryConfig(name="test"), "meter_provider": MeterProvider()},
+            "shared_memory, meter_provider",
+        ),
+    ],
+)
+def test_build_metrics_manager_with_several_backends(backends: dict[str, Any], names: str) -> None:
+    # Arrange
+    config = BaseMetricsConfig(app_name="test", metrics_prefix="test", **backends)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match=f"Only one of the metrics backends can be configured, got {names}"):
+        build_metrics_manager(config)
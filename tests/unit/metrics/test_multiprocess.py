@@ -0,0 +1,148 @@
+from pathlib import Path
+
+from assertpy import assert_that
+from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from asgi_monitor.metrics.multiprocess import IncrementalMultiProcessCollector, compact_dead_process
+from tests.utils import write_multiprocess_value
+
+
+def expected_payload(path: Path) -> bytes:
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=str(path))
+    return generate_latest(registry)
+
+
+def test_incremental_collect_matches_multiprocess_collector(tmp_path: Path) -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    IncrementalMultiProcessCollector(str(tmp_path), registry=registry)
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/"}, 1.0)
+    write_multiprocess_value(tmp_path / "counter_2.db", "test_requests_total", {"path": "/"}, 2.0)
+    write_multiprocess_value(tmp_path / "gauge_livesum_1.db", "test_in_progress", {"path": "/"}, 3.0)
+
+    # Act
+    first = generate_latest(registry)
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/"}, 10.0)
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/login"}, 5.0)
+    second = generate_latest(registry)
+
+    # Assert
+    assert_that(first.decode()).contains(
+        'test_requests_total{path="/"} 3.0',
+        'test_in_progress{path="/"} 3.0',
+    )
+    assert_that(second.decode()).contains(
+        'test_requests_total{path="/"} 12.0',
+        'test_requests_total{path="/login"} 5.0',
+    )
+    assert second == expected_payload(tmp_path)
+
+
+def test_incremental_collect_removed_file(tmp_path: Path) -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    IncrementalMultiProcessCollector(str(tmp_path), registry=registry)
+    write_multiprocess_value(tmp_path / "gauge_livesum_1.db", "test_in_progress", {"path": "/"}, 3.0)
+    write_multiprocess_value(tmp_path / "gauge_livesum_2.db", "test_in_progress", {"path": "/"}, 4.0)
+
+    # Act
+    first = generate_latest(registry)
+    (tmp_path / "gauge_livesum_2.db").unlink()
+    second = generate_latest(registry)
+
+    # Assert
+    assert_that(first.decode()).contains('test_in_progress{path="/"} 7.0')
+    assert_that(second.decode()).contains('test_in_progress{path="/"} 3.0')
+    assert second == expected_payload(tmp_path)
+
+
+def test_incremental_collect_grown_file(tmp_path: Path) -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    IncrementalMultiProcessCollector(str(tmp_path), registry=registry)
+    write_multiprocess_value(tmp_path / "counter_1.db", "test_requests_total", {"path": "/0"}, 1.0)
+    generate_latest(registry)
+
+    # Act
+    mmaped_dict = MmapedDict(str(tmp_path / "counter_1.db"))
+    for i in range(1, 2000):  # more than the initial 64KB of the file
+        key = mmap_key("test_requests_total", "test_requests_total", ["path"], [f"/{i}"], "Test metric")
+        mmaped_dict.write_value(key, float(i), 0)
+    mmaped_dict.close()
+    payload = generate_latest(registry)
+
+    # Assert
+    assert (tmp_path / "counter_1.db").stat().st_size > 1 << 16
+    assert_that(payload.decode()).contains('test_requests_total{path="/1999"} 1999.0')
+    assert payload == expected_payload(tmp_path)
+
+
+def write_process_files(path: Path, pid: int) -> None:
+    write_multiprocess_value(path / f"counter_{pid}.db", "test_requests_total", {"path": "/"}, 1.0)
+    write_multiprocess_value(path / f"gauge_livesum_{pid}.db", "test_in_progress", {"path": "/"}, 1.0)
+    for le, value in (("0.1", 1.0), ("1.0", 2.0), ("+Inf", 0.0)):
+        write_multiprocess_value(
+            path / f"histogram_{pid}.db",
+            "test_duration_seconds_bucket",
+            {"path": "/", "le": le},
+            value,
+            metric_name="test_duration_seconds",
+        )
+    write_multiprocess_value(
+        path / f"histogram_{pid}.db",
+        "test_duration_seconds_sum",
+        {"path": "/"},
+        1.5,
+        metric_name="test_duration_seconds",
+    )
+
+
+def test_compact_dead_process(tmp_path: Path) -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    IncrementalMultiProcessCollector(str(tmp_path), registry=registry)
+    for pid in (1, 2, 3):
+        write_process_files(tmp_path, pid)
+    generate_latest(registry)
+
+    # Act
+    compact_dead_process(1, str(tmp_path))
+    compact_dead_process(2, str(tmp_path))
+    payload = generate_latest(registry)
+
+    # Assert
+    assert_that(sorted(path.name for path in tmp_path.glob("*.db"))).is_equal_to(
+        [
+            "counter_3.db",
+            "counter_archive.db",
+            "gauge_livesum_3.db",
+            "histogram_3.db",
+            "histogram_archive.db",
+        ],
+    )
+    assert_that(payload.decode()).contains(
+        'test_requests_total{path="/"} 3.0',
+        'test_in_progress{path="/"} 1.0',
+        'test_duration_seconds_bucket{le="0.1",path="/"} 3.0',
+        'test_duration_seconds_bucket{le="1.0",path="/"} 9.0',
+        'test_duration_seconds_bucket{le="+Inf",path="/"} 9.0',
+        'test_duration_seconds_count{path="/"} 9.0',
+        'test_duration_seconds_sum{path="/"} 4.5',
+    )
+    assert payload == expected_payload(tmp_path)
+
+
+def test_compact_unknown_process(tmp_path: Path) -> None:
+    # Arrange
+    write_process_files(tmp_path, 1)
+    before = expected_payload(tmp_path)
+
+    # Act
+    compact_dead_process(2, str(tmp_path))
+
+    # Assert
+    assert not (tmp_path / "counter_archive.db").exists()
+    assert expected_payload(tmp_path) == before
@@ -0,0 +1,99 @@
+import math
+
+import pytest
+from assertpy import assert_that
+from prometheus_client import CollectorRegistry, generate_latest
+
+from asgi_monitor.metrics.native_histogram import NativeHistogram
+
+
+@pytest.mark.parametrize("schema", [-4, -1, 0, 1, 3, 8])
+@pytest.mark.parametrize("value", [0.001, 0.5, 0.6, 1.0, 1.5, 2.0, 3.0, 1000.0])
+def test_native_histogram_bucket(schema: int, value: float) -> None:
+    # Arrange
+    histogram = NativeHistogram("test", "Test", registry=None, schema=schema)
+    base = 2.0 ** (2.0**-schema)
+
+    # Act
+    histogram.observe(value)
+    state = histogram.native_state()
+
+    # Assert
+    (index,) = state.positive
+    assert base ** (index - 1) < value * (1 + 1e-12)
+    assert value <= base**index * (1 + 1e-12)
+    assert state.positive == {index: 1}
+
+
+def test_native_histogram_state() -> None:
+    # Arrange
+    histogram = NativeHistogram("test", "Test", ["path"], registry=None, schema=0)
+
+    # Act
+    for value in (0.0, 0.75, 1.0, 3.0, -3.0):
+        histogram.labels(path="/").observe(value)
+    state = histogram.labels(path="/").native_state()
+
+    # Assert
+    assert state.schema == 0
+    assert state.zero_count == 1
+    assert state.count == 5
+    assert state.sum == 1.75
+    assert state.positive == {0: 2, 2: 1}
+    assert state.negative == {2: 1}
+    assert_that([count for _, count, _ in state.classic]).is_length(len(NativeHistogram.DEFAULT_BUCKETS))
+    assert sum(count for _, count, _ in state.classic) == 5
+
+
+def test_native_histogram_reduces_resolution() -> None:
+    # Arrange
+    histogram = NativeHistogram("test", "Test", registry=None, schema=3, max_buckets=4)
+
+    # Act
+    for exponent in range(8):
+        histogram.observe(2.0**exponent)
+    state = histogram.native_state()
+
+    # Assert
+    assert state.schema == -2
+    assert state.positive == {0: 1, 1: 4, 2: 3}
+
+
+def test_native_histogram_is_classic_histogram_in_text_format() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    histogram = NativeHistogram("test", "Test", ["path"], registry=registry, schema=1)
+
+    # Act
+    histogram.labels(path="/").observe(0.3)
+    payload = generate_latest(registry).decode()
+
+    # Assert
+    assert_that(payload).contains(
+        "# TYPE test histogram",
+        'test_bucket{le="0.5",path="/"} 1.0',
+        'test_count{path="/"} 1.0',
+        'test_sum{path="/"} 0.3',
+    )
+
+
+def test_native_histogram_invalid_schema() -> None:
+    # Act & Assert
+    with pytest.raises(ValueError, match="between -4 and 8"):
+        NativeHistogram("test", "Test", registry=None, schema=9)
+
+
+def test_native_histogram_zero_threshold() -> None:
+    # Arrange
+    histogram = NativeHistogram("test", "Test", registry=None, zero_threshold=0.01)
+
+    # Act
+    histogram.observe(0.005)
+    histogram.observe(-0.01)
+    histogram.observe(math.nextafter(0.01, 1))
+    state = histogram.native_state()
+
+    # Assert
+    assert state.zero_count == 2
+    assert sum(state.positive.values()) == 1
+    assert state.negative == {}
@@ -0,0 +1,178 @@
+from typing import Any
+
+from assertpy import assert_that
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest
+
+from asgi_monitor.metrics.config import BaseMetricsConfig
+from asgi_monitor.metrics.manager import build_metrics_manager
+from asgi_monitor.metrics.otel import OpenTelemetryMetricReader, OpenTelemetryMetricsContainer
+
+
+def collect(reader: InMemoryMetricReader) -> dict[str, list[tuple[dict[str, Any], Any]]]:
+    data = reader.get_metrics_data()
+    assert data is not None
+    return {
+        metric.name: [(dict(point.attributes or {}), point) for point in metric.data.data_points]
+        for resource_metrics in data.resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    }
+
+
+def test_otel_metrics() -> None:
+    # Arrange
+    reader = InMemoryMetricReader()
+    registry = CollectorRegistry()
+    config = BaseMetricsConfig(
+        app_name="test",
+        metrics_prefix="test",
+        registry=registry,
+        meter_provider=MeterProvider(metric_readers=[reader]),
+    )
+    manager = build_metrics_manager(config)
+    attributes = {"app_name": "test", "method": "GET", "path": "/"}
+
+    # Act
+    manager.add_app_info()
+    manager.inc_requests_count(method="GET", path="/")
+    manager.inc_requests_count(method="GET", path="/")
+    manager.add_request_in_progress(method="GET", path="/")
+    manager.observe_request_duration(method="GET", path="/", duration=0.3, exemplar=None)
+    manager.inc_responses_count(method="GET", path="/", status_code=200)
+    manager.remove_request_in_progress(method="GET", path="/")
+    manager.inc_requests_exceptions_count(method="GET", path="/", exception_type="ValueError")
+    metrics = collect(reader)
+
+    # Assert
+    assert_that(manager._container).is_instance_of(OpenTelemetryMetricsContainer)
+    assert_that(generate_latest(registry).decode()).does_not_contain("test_requests_total")
+    assert_that(metrics["test_app_info"][0][0]).is_equal_to({"app_name": "test"})
+    assert_that(metrics["test_app_info"][0][1].value).is_equal_to(1)
+    assert_that(metrics["test_requests_total"][0][0]).is_equal_to(attributes)
+    assert_that(metrics["test_requests_total"][0][1].value).is_equal_to(2)
+    assert_that(metrics["test_responses_total"][0][0]).is_equal_to({**attributes, "status_code": "200"})
+    assert_that(metrics["test_requests_in_progress"][0][1].value).is_equal_to(0)
+    assert_that(metrics["test_request_duration_milliseconds"][0][1].count).is_equal_to(1)
+    assert_that(metrics["test_request_duration_milliseconds"][0][1].sum).is_equal_to(300)
+    assert_that(metrics["test_requests_exceptions_total"][0][0]).is_equal_to(
+        {**attributes, "exception_type": "ValueError"},
+    )
+
+
+def test_otel_request_duration_buckets() -> None:
+    # Arrange
+    reader = InMemoryMetricReader()
+    config = BaseMetricsConfig(
+        app_name="test",
+        metrics_prefix="test",
+        meter_provider=MeterProvider(metric_readers=[reader]),
+    )
+    manager = build_metrics_manager(config)
+
+    # Act
+    for duration in (0.003, 0.02, 0.3, 1.5):
+        manager.observe_request_duration(method="GET", path="/", duration=duration, exemplar=None)
+    point = collect(reader)["test_request_duration_milliseconds"][0][1]
+
+    # Assert
+    buckets = dict(zip([*point.explicit_bounds, "+Inf"], point.bucket_counts, strict=True))
+    assert_that(buckets).contains_entry({5.0: 1}, {25.0: 1}, {500.0: 1}, {2500.0: 1})
+    assert_that(point.sum).is_close_to(1823, tolerance=1e-9)
+
+
+def test_otel_attributes_are_built_once_per_route() -> None:
+    # Arrange
+    container = OpenTelemetryMetricsContainer("test", CollectorRegistry(), MeterProvider())
+
+    # Act
+    first = container.request_count().labels(app_name="test", method="GET", path="/")
+    second = container.request_count().labels(app_name="test", method="GET", path="/")
+    other = container.request_count().labels(app_name="test", method="POST", path="/")
+
+    # Assert
+    assert_that(first).is_same_as(second)
+    assert_that(first._attributes).is_same_as(second._attributes)
+    assert_that(other).is_not_same_as(first)
+
+
+def test_otel_reader_exposes_metrics_through_registry() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    Counter("test_registry_total", "Registry counter", registry=registry).inc()
+    meter = MeterProvider(metric_readers=[OpenTelemetryMetricReader(registry)]).get_meter("test")
+    duration = meter.create_histogram("http.server.duration", unit="ms", description="Duration")
+    active = meter.create_up_down_counter("http.server.active_requests", description="Active")
+    requests = meter.create_counter("requests", description="Requests")
+
+    # Act
+    duration.record(7, {"http.route": "/"})
+    duration.record(70, {"http.route": "/"})
+    active.add(2, {"http.method": "GET"})
+    requests.add(3)
+    payload = generate_latest(registry).decode()
+
+    # Assert
+    assert_that(payload).contains(
+        "# TYPE test_registry_total counter",
+        "test_registry_total 1.0",
+        "# HELP http_server_duration_milliseconds Duration",
+        "# TYPE http_server_duration_milliseconds histogram",
+        'http_server_duration_milliseconds_bucket{http_route="/",le="5.0"} 0.0',
+        'http_server_duration_milliseconds_bucket{http_route="/",le="10.0"} 1.0',
+        'http_server_duration_milliseconds_bucket{http_route="/",le="+Inf"} 2.0',
+        'http_server_duration_milliseconds_count{http_route="/"} 2.0',
+        'http_server_duration_milliseconds_sum{http_route="/"} 77.0',
+        "# TYPE http_server_active_requests gauge",
+        'http_server_active_requests{http_method="GET"} 2.0',
+        "# TYPE requests_total counter",
+        "requests_total 3.0",
+    )
+
+
+def test_otel_reader_bucket_bounds_like_prometheus_client() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    bounds = (0.005, 1e6)
+    Histogram("test_native", "Native", buckets=bounds, registry=registry).observe(7)
+    view = View(instrument_name="test_otel", aggregation=ExplicitBucketHistogramAggregation(bounds))
+    meter = MeterProvider(metric_readers=[OpenTelemetryMetricReader(registry)], views=[view]).get_meter("test")
+    histogram = meter.create_histogram("test_otel", description="OpenTelemetry")
+
+    # Act
+    histogram.record(7)
+    payload = generate_latest(registry).decode()
+
+    # Assert
+    assert_that(payload).contains(
+        'test_native_bucket{le="0.005"} 0.0',
+        'test_native_bucket{le="1e+06"} 1.0',
+        'test_native_bucket{le="+Inf"} 1.0',
+        'test_otel_bucket{le="0.005"} 0.0',
+        'test_otel_bucket{le="1e+06"} 1.0',
+        'test_otel_bucket{le="+Inf"} 1.0',
+    )
+
+
+def test_otel_reader_with_container() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    meter_provider = MeterProvider(metric_readers=[OpenTelemetryMetricReader(registry)])
+    config = BaseMetricsConfig(app_name="test", metrics_prefix="test", registry=registry, meter_provider=meter_provider)
+    manager = build_metrics_manager(config)
+
+    # Act
+    manager.inc_requests_count(method="GET", path="/")
+    manager.observe_request_duration(method="GET", path="/", duration=0.3, exemplar=None)
+    payload = generate_latest(registry).decode()
+
+    # Assert
+    assert_that(payload).contains(
+        "# TYPE test_requests_total counter",
+        'test_requests_total{app_name="test",method="GET",path="/"} 1.0',
+        "# TYPE test_request_duration_milliseconds histogram",
+        'test_request_duration_milliseconds_count{app_name="test",method="GET",path="/"} 1.0',
+    )
+    assert_that(payload).does_not_contain("test_requests_total_total", "milliseconds_milliseconds")
@@ -0,0 +1,140 @@
+import pytest
+from assertpy import assert_that
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, Summary
+
+from asgi_monitor.metrics import get_latest_metrics
+from asgi_monitor.metrics.native_histogram import NativeHistogram
+from asgi_monitor.metrics.protobuf import CONTENT_TYPE_PROTOBUF, _accepts_protobuf, generate_latest_protobuf
+from tests.utils import decode_protobuf, split_delimited
+
+PROTOBUF = "application/vnd.google.protobuf;proto=io.prometheus.client.MetricFamily"
+PROMETHEUS_ACCEPT = (
+    "application/vnd.google.protobuf;proto=io.prometheus.client.MetricFamily;encoding=delimited;q=0.5,"
+    "application/openmetrics-text;version=1.0.0;q=0.4,text/plain;version=0.0.4;q=0.3,*/*;q=0.1"
+)
+
+
+def zigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def decode_families(payload: bytes) -> dict[str, dict[int, list]]:
+    families = {}
+    for message in split_delimited(payload):
+        family = decode_protobuf(message)
+        families[family[1][0].decode()] = family
+    return families
+
+
+def decode_labels(metric: dict[int, list]) -> dict[str, str]:
+    pairs = (decode_protobuf(pair) for pair in metric.get(1, []))
+    return {pair[1][0].decode(): pair[2][0].decode() for pair in pairs}
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        (None, False),
+        ("*/*", False),
+        ("text/plain;version=0.0.4", False),
+        (PROMETHEUS_ACCEPT, True),
+        ("application/vnd.google.protobuf;proto=io.prometheus.client.MetricFamily;encoding=delimited", True),
+        ("application/vnd.google.protobuf;proto=io.prometheus.client.MetricFamily;encoding=text", False),
+        (
+            "text/plain,application/vnd.google.protobuf;proto=io.prometheus.client.MetricFamily;encoding=delimited",
+            False,
+        ),
+        (
+            "text/plain;q=0.5,application/vnd.google.protobuf;proto=io.prometheus.client.MetricFamily;encoding=delimited",
+            True,
+        ),
+    ],
+)
+def test_accepts_protobuf(accept: str | None, *, expected: bool) -> None:
+    # Act & Assert
+    assert _accepts_protobuf(accept) is expected
+
+
+def test_protobuf_classic_families() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    Counter("test_requests", "Requests", ["path"], registry=registry).labels(path="/").inc(2)
+    Gauge("test_in_progress", "In progress", registry=registry).set(-1.5)
+    Histogram("test_duration", "Duration", buckets=[1], registry=registry).observe(0.5)
+    Summary("test_size", "Size", registry=registry).observe(3)
+
+    # Act
+    families = decode_families(generate_latest_protobuf(registry))
+
+    # Assert
+    assert_that(families).contains_only("test_requests_total", "test_in_progress", "test_duration", "test_size")
+
+    counter = families["test_requests_total"]
+    (counter_metric,) = (decode_protobuf(metric) for metric in counter[4])
+    assert counter[3] == [0]
+    assert decode_labels(counter_metric) == {"path": "/"}
+    assert decode_protobuf(counter_metric[3][0])[1] == [2.0]
+
+    gauge = families["test_in_progress"]
+    assert gauge[3] == [1]
+    assert decode_protobuf(decode_protobuf(gauge[4][0])[2][0])[1] == [-1.5]
+
+    histogram = decode_protobuf(decode_protobuf(families["test_duration"][4][0])[7][0])
+    buckets = [decode_protobuf(bucket) for bucket in histogram[3]]
+    assert families["test_duration"][3] == [4]
+    assert histogram[1] == [1]
+    assert histogram[2] == [0.5]
+    assert [(bucket[2][0], bucket[1][0]) for bucket in buckets] == [(1.0, 1), (float("inf"), 1)]
+    assert 5 not in histogram  # not a native histogram
+
+    summary = decode_protobuf(decode_protobuf(families["test_size"][4][0])[4][0])
+    assert families["test_size"][3] == [2]
+    assert summary[1] == [1]
+    assert summary[2] == [3.0]
+
+
+def test_protobuf_native_histogram() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    histogram = NativeHistogram("test_duration", "Duration", ["path"], buckets=[1], schema=0, registry=registry)
+    for value in (0.0, 0.75, 1.0, 3.0, 20.0, -3.0):
+        histogram.labels(path="/").observe(value)
+
+    # Act
+    families = decode_families(generate_latest_protobuf(registry))
+
+    # Assert
+    metric = decode_protobuf(families["test_duration"][4][0])
+    native = decode_protobuf(metric[7][0])
+    positive_spans = [decode_protobuf(span) for span in native[12]]
+    negative_spans = [decode_protobuf(span) for span in native[9]]
+
+    assert decode_labels(metric) == {"path": "/"}
+    assert native[1] == [6]
+    assert native[2] == [21.75]
+    assert len(native[3]) == 2  # the classic buckets are kept for the text fallback
+    assert zigzag(native[5][0]) == 0
+    assert native[7] == [1]
+    # The buckets 0, 2 and 5 have the counts 2, 1 and 1
+    assert [(zigzag(span[1][0]), span[2][0]) for span in positive_spans] == [(0, 1), (1, 1), (2, 1)]
+    assert [zigzag(delta) for delta in native[13]] == [2, -1, 0]
+    assert [(zigzag(span[1][0]), span[2][0]) for span in negative_spans] == [(2, 1)]
+    assert [zigzag(delta) for delta in native[10]] == [1]
+
+
+def test_get_latest_metrics_protobuf() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    Gauge("test_in_progress", "In progress", registry=registry).set(1)
+
+    # Act
+    response = get_latest_metrics(registry, openmetrics_format=False, accept=PROMETHEUS_ACCEPT, accept_encoding="")
+    text_response = get_latest_metrics(registry, openmetrics_format=False, accept="text/plain")
+
+    # Assert
+    assert response.status_code == 200
+    assert_that(response.headers).contains_entry({"Content-Type": CONTENT_TYPE_PROTOBUF})
+    assert_that(response.headers).contains_entry({"Vary": "Accept, Accept-Encoding"})
+    assert_that(decode_families(response.payload)).contains_only("test_in_progress")
+    assert_that(text_response.headers).contains_entry({"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+    assert_that(text_response.payload.decode()).contains("test_in_progress 1.0")
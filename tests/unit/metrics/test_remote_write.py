@@ -0,0 +1,166 @@
+import os
+import time
+
+import pytest
+from assertpy import assert_that
+from prometheus_client import CollectorRegistry, Counter, Gauge
+
+from asgi_monitor.metrics._snappy import _pure_snappy_compress
+from asgi_monitor.metrics.remote_write import RemoteWriteConfig, RemoteWriteExporter
+from tests.utils import RemoteWriteReceiver, decode_protobuf, snappy_decompress
+
+
+def build_registry() -> CollectorRegistry:
+    registry = CollectorRegistry()
+    Counter("test_requests", "Requests", ["path"], registry=registry).labels(path="/").inc(2)
+    Gauge("test_in_progress", "In progress", registry=registry).set(1)
+    return registry
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b"",
+        b"a",
+        b"abcd" * 1000,
+        b"x" * 131,
+        bytes(range(256)) * 700,
+        os.urandom(70000),
+    ],
+)
+def test_snappy_compress(payload: bytes) -> None:
+    # Act
+    compressed = _pure_snappy_compress(payload)
+
+    # Assert
+    assert snappy_decompress(compressed) == payload
+
+
+def test_remote_write() -> None:
+    # Arrange
+    registry = build_registry()
+
+    with RemoteWriteReceiver() as receiver:
+        config = RemoteWriteConfig(url=receiver.url, external_labels={"job": "test"})
+        exporter = RemoteWriteExporter(registry, config)
+        before_ms = int(time.time() * 1000)
+
+        # Act
+        exporter.collect()
+        delivered = exporter.flush()
+
+    # Assert
+    headers, payload = receiver.requests[0]
+    metadata = [decode_protobuf(item) for item in decode_protobuf(payload)[3]]
+
+    assert delivered is True
+    assert_that(headers).contains_entry(
+        {"Content-Encoding": "snappy"},
+        {"Content-Type": "application/x-protobuf"},
+        {"X-Prometheus-Remote-Write-Version": "0.1.0"},
+    )
+    assert_that(receiver.series()).is_length(2)
+    assert_that(receiver.series()[0]).contains_entry(
+        {"labels": [("__name__", "test_requests_total"), ("job", "test"), ("path", "/")]},
+        {"value": 2.0},
+    )
+    assert_that(receiver.series()[1]).contains_entry(
+        {"labels": [("__name__", "test_in_progress"), ("job", "test")]},
+        {"value": 1.0},
+    )
+    assert receiver.series()[0]["timestamp"] >= before_ms
+    assert [(item[1], item[2], item[4]) for item in metadata] == [
+        ([1], [b"test_requests"], [b"Requests"]),
+        ([2], [b"test_in_progress"], [b"In progress"]),
+    ]
+
+
+def test_remote_write_batches() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    gauge = Gauge("test_gauge", "Gauge", ["index"], registry=registry)
+    for index in range(5):
+        gauge.labels(index=str(index)).set(index)
+
+    with RemoteWriteReceiver() as receiver:
+        exporter = RemoteWriteExporter(registry, RemoteWriteConfig(url=receiver.url, max_series_per_request=2))
+
+        # Act
+        exporter.collect()
+        exporter.flush()
+
+    # Assert
+    batches = [decode_protobuf(payload) for _, payload in receiver.requests]
+    assert [len(batch[1]) for batch in batches] == [2, 2, 1]
+    assert [3 in batch for batch in batches] == [True, False, False]
+    assert [series["value"] for series in receiver.series()] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_remote_write_retries() -> None:
+    # Arrange
+    registry = build_registry()
+
+    with RemoteWriteReceiver(statuses=[503, 429]) as receiver:
+        exporter = RemoteWriteExporter(registry, RemoteWriteConfig(url=receiver.url, retry_backoff=0))
+
+        # Act
+        exporter.collect()
+        delivered = exporter.flush()
+
+    # Assert
+    assert delivered is True
+    assert exporter.pending_requests == 0
+    assert len(receiver.requests) == 3
+
+
+def test_remote_write_rejected_request_is_dropped() -> None:
+    # Arrange
+    registry = build_registry()
+
+    with RemoteWriteReceiver(statuses=[400]) as receiver:
+        exporter = RemoteWriteExporter(registry, RemoteWriteConfig(url=receiver.url, retry_backoff=0))
+
+        # Act
+        exporter.collect()
+        delivered = exporter.flush()
+
+    # Assert
+    assert delivered is True
+    assert exporter.pending_requests == 0
+    assert len(receiver.requests) == 1
+
+
+def test_remote_write_bounded_queue() -> None:
+    # Arrange
+    registry = build_registry()
+
+    with RemoteWriteReceiver(statuses=[500] * 9) as receiver:
+        config = RemoteWriteConfig(url=receiver.url, max_retries=2, retry_backoff=0, max_pending_requests=2)
+        exporter = RemoteWriteExporter(registry, config)
+
+        # Act
+        for _ in range(3):
+            exporter.collect()
+            delivered = exporter.flush()
+
+    # Assert
+    assert delivered is False
+    assert exporter.pending_requests == 2
+    assert len(receiver.requests) == 9
+
+
+async def test_remote_write_shutdown_pushes_final_state() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    counter = Counter("test_requests", "Requests", registry=registry)
+
+    with RemoteWriteReceiver() as receiver:
+        exporter = RemoteWriteExporter(registry, RemoteWriteConfig(url=receiver.url, interval=60))
+        exporter.start()
+
+        # Act
+        counter.inc(3)
+        await exporter.shutdown()
+
+    # Assert
+    assert_that(receiver.series()).extracting("value").is_equal_to([3.0])
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+from collections.abc import Iterable
+
+import pytest
+from assertpy import assert_that
+from prometheus_client import CollectorRegistry
+from prometheus_client.metrics_core import GaugeMetricFamily, Metric
+
+from asgi_monitor.metrics.renderer import build_metrics_renderer
+
+
+class ThreadNameCollector:
+    def __init__(self) -> None:
+        self.thread_names: list[str] = []
+
+    def collect(self) -> Iterable[Metric]:
+        self.thread_names.append(threading.current_thread().name)
+        yield GaugeMetricFamily("thread_name_collector", "Test collector", value=1)
+
+
+async def test_render_outside_event_loop_thread() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    collector = ThreadNameCollector()
+    registry.register(collector)  # type: ignore[arg-type]
+    renderer = build_metrics_renderer(registry, metrics_prefix="test", openmetrics_format=False)
+
+    # Act
+    response = await renderer.render()
+
+    # Assert
+    assert response.status_code == 200
+    assert_that(response.payload.decode()).contains("thread_name_collector 1.0")
+    assert_that(collector.thread_names).is_length(1)
+    assert_that(collector.thread_names[0]).starts_with("asgi-monitor-metrics")
+
+
+async def test_render_observes_scrape_duration() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    renderer = build_metrics_renderer(registry, metrics_prefix="test", openmetrics_format=False)
+
+    # Act
+    await renderer.render()
+    response = await renderer.render(accept_encoding="identity")
+
+    # Assert
+    assert registry.get_sample_value("test_metrics_scrape_duration_seconds_count") == 2.0
+    assert_that(response.payload.decode()).contains("test_metrics_scrape_duration_seconds_count 1.0")
+
+
+async def test_render_observes_waiting_for_the_pool() -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    renderer = build_metrics_renderer(registry, metrics_prefix="test", openmetrics_format=False)
+    loop = asyncio.get_running_loop()
+    busy = loop.run_in_executor(renderer._executor, time.sleep, 0.2)
+
+    # Act
+    await renderer.render()
+    await busy
+
+    # Assert
+    scrape_duration = registry.get_sample_value("test_metrics_scrape_duration_seconds_sum")
+    assert_that(scrape_duration).is_greater_than_or_equal_to(0.2)
+
+
+async def test_render_close() -> None:
+    # Arrange
+    renderer = build_metrics_renderer(CollectorRegistry(), metrics_prefix="test", openmetrics_format=False)
+    await renderer.render()
+
+    # Act
+    renderer.close()
+
+    # Assert
+    with pytest.raises(RuntimeError, match="after shutdown"):
+        await renderer.render()
@@ -0,0 +1,181 @@
+import multiprocessing
+import sys
+import threading
+import uuid
+from collections.abc import Iterator
+
+import pytest
+from assertpy import assert_that
+from prometheus_client import CollectorRegistry, generate_latest
+
+from asgi_monitor.metrics.manager import MetricsManager
+from asgi_monitor.metrics.shared_memory import (
+    SharedMemoryConfig,
+    SharedMemoryMetricsContainer,
+    unlink_shared_memory,
+)
+
+
+@pytest.fixture
+def config() -> Iterator[SharedMemoryConfig]:
+    config = SharedMemoryConfig(name=f"asgi-monitor-{uuid.uuid4().hex[:8]}", capacity=64, max_processes=4)
+    yield config
+    unlink_shared_memory(config.name)
+
+
+def build_manager(config: SharedMemoryConfig, registry: CollectorRegistry | None = None) -> MetricsManager:
+    container = SharedMemoryMetricsContainer("test", registry or CollectorRegistry(), config)
+    return MetricsManager(app_name="test", container=container)
+
+
+def handle_requests(config: SharedMemoryConfig, count: int) -> None:
+    manager = build_manager(config)
+    for _ in range(count):
+        manager.inc_requests_count(method="GET", path="/")
+    manager.add_request_in_progress(method="GET", path="/")
+
+
+def test_shared_memory_metrics(config: SharedMemoryConfig) -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    manager = build_manager(config, registry)
+
+    # Act
+    manager.add_app_info()
+    manager.inc_requests_count(method="GET", path="/")
+    manager.inc_requests_count(method="GET", path="/")
+    manager.add_request_in_progress(method="GET", path="/")
+    manager.observe_request_duration(method="GET", path="/", duration=0.3, exemplar=None)
+    manager.inc_responses_count(method="GET", path="/", status_code=200)
+    payload = generate_latest(registry).decode()
+
+    # Assert
+    assert_that(payload).contains(
+        "# TYPE test_app_info gauge",
+        'test_app_info{app_name="test"} 1.0',
+        "# TYPE test_requests_total counter",
+        'test_requests_total{app_name="test",method="GET",path="/"} 2.0',
+        'test_responses_total{app_name="test",method="GET",path="/",status_code="200"} 1.0',
+        'test_requests_in_progress{app_name="test",method="GET",path="/"} 1.0',
+        "# TYPE test_request_duration_seconds histogram",
+        'test_request_duration_seconds_bucket{app_name="test",le="0.25",method="GET",path="/"} 0.0',
+        'test_request_duration_seconds_bucket{app_name="test",le="0.5",method="GET",path="/"} 1.0',
+        'test_request_duration_seconds_bucket{app_name="test",le="+Inf",method="GET",path="/"} 1.0',
+        'test_request_duration_seconds_count{app_name="test",method="GET",path="/"} 1.0',
+        'test_request_duration_seconds_sum{app_name="test",method="GET",path="/"} 0.3',
+    )
+
+
+def test_shared_memory_metrics_are_summed_between_processes(config: SharedMemoryConfig) -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    manager = build_manager(config, registry)
+    context = multiprocessing.get_context("spawn")
+
+    # Act
+    manager.inc_requests_count(method="GET", path="/")
+    manager.add_request_in_progress(method="GET", path="/")
+    processes = [context.Process(target=handle_requests, args=(config, count)) for count in (2, 3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    payload = generate_latest(registry).decode()
+
+    # Assert
+    assert_that(payload).contains(
+        'test_requests_total{app_name="test",method="GET",path="/"} 6.0',
+        # The gauges of the exited processes are dropped
+        'test_requests_in_progress{app_name="test",method="GET",path="/"} 1.0',
+    )
+
+
+def test_shared_memory_lanes_of_one_segment(config: SharedMemoryConfig) -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    first = build_manager(config, registry)
+    second = build_manager(config)
+
+    # Act
+    first.inc_requests_count(method="GET", path="/")
+    second.inc_requests_count(method="GET", path="/")
+    second.inc_requests_count(method="POST", path="/")
+    payload = generate_latest(registry).decode()
+
+    # Assert
+    assert_that(payload).contains(
+        'test_requests_total{app_name="test",method="GET",path="/"} 2.0',
+        'test_requests_total{app_name="test",method="POST",path="/"} 1.0',
+    )
+
+
+def test_shared_memory_full_segment_drops_series(config: SharedMemoryConfig) -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    manager = build_manager(config, registry)
+
+    # Act
+    for index in range(config.capacity + 1):
+        manager.inc_requests_count(method="GET", path=f"/{index}")
+    payload = generate_latest(registry).decode()
+
+    # Assert
+    assert_that(payload).contains(f'path="/{config.capacity - 1}"}} 1.0')
+    assert_that(payload).does_not_contain(f'path="/{config.capacity}"')
+
+
+def test_shared_memory_full_segment_drops_whole_histogram(config: SharedMemoryConfig) -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    manager = build_manager(config, registry)
+    free_slots = 4  # fewer than the buckets and the sum of a histogram
+
+    # Act
+    for index in range(config.capacity - free_slots):
+        manager.inc_requests_count(method="GET", path=f"/{index}")
+    manager.observe_request_duration(method="GET", path="/", duration=0.3, exemplar=None)
+    manager.inc_requests_count(method="POST", path="/")
+    payload = generate_latest(registry).decode()
+
+    # Assert
+    assert_that(payload).does_not_contain("test_request_duration_seconds_bucket")
+    assert_that(payload).contains('test_requests_total{app_name="test",method="POST",path="/"} 1.0')
+
+
+def test_shared_memory_concurrent_threads(config: SharedMemoryConfig) -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    manager = build_manager(config, registry)
+    threads_count, increments = 8, 5000
+    switch_interval = sys.getswitchinterval()
+
+    def handle() -> None:
+        for _ in range(increments):
+            manager.inc_requests_count(method="GET", path="/")
+
+    # Act
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=handle) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    payload = generate_latest(registry).decode()
+
+    # Assert
+    assert_that(payload).contains(
+        f'test_requests_total{{app_name="test",method="GET",path="/"}} {float(threads_count * increments)}',
+    )
+
+
+def test_shared_memory_different_layout(config: SharedMemoryConfig) -> None:
+    # Arrange
+    build_manager(config)
+    other = SharedMemoryConfig(name=config.name, capacity=config.capacity * 2, max_processes=config.max_processes)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="different layout"):
+        build_manager(other)
@@ -0,0 +1,185 @@
+import socket
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from assertpy import assert_that
+from prometheus_client import CollectorRegistry, generate_latest
+
+from asgi_monitor.metrics.config import BaseMetricsConfig
+from asgi_monitor.metrics.manager import MetricsManager, build_metrics_manager
+from asgi_monitor.metrics.statsd import StatsdConfig, StatsdMetricsContainer
+
+
+@pytest.fixture
+def agent() -> Iterator[socket.socket]:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(5)
+    yield sock
+    sock.close()
+
+
+def build_container(agent: socket.socket, **kwargs: object) -> StatsdMetricsContainer:
+    config = StatsdConfig(host="127.0.0.1", port=agent.getsockname()[1], flush_interval=60, **kwargs)  # type: ignore[arg-type]
+    return StatsdMetricsContainer("test", CollectorRegistry(), config)
+
+
+def receive_lines(agent: socket.socket) -> list[str]:
+    return agent.recv(65535).decode().split("\n")
+
+
+def test_statsd_metrics(agent: socket.socket) -> None:
+    # Arrange
+    container = build_container(agent)
+    manager = MetricsManager(app_name="test", container=container)
+
+    # Act
+    manager.add_app_info()
+    manager.inc_requests_count(method="GET", path="/")
+    manager.add_request_in_progress(method="GET", path="/")
+    manager.observe_request_duration(method="GET", path="/", duration=0.25, exemplar=None)
+    manager.inc_responses_count(method="GET", path="/", status_code=200)
+    manager.remove_request_in_progress(method="GET", path="/")
+    manager.inc_requests_exceptions_count(method="GET", path="/", exception_type="ValueError")
+    container.flush()
+
+    # Assert
+    assert_that(receive_lines(agent)).is_equal_to(
+        [
+            "test_app_info:1|g|#app_name:test",
+            "test_requests_total:1|c|#app_name:test,method:GET,path:/",
+            "test_requests_in_progress:+1|g|#app_name:test,method:GET,path:/",
+            "test_request_duration:250|ms|#app_name:test,method:GET,path:/",
+            "test_responses_total:1|c|#app_name:test,method:GET,path:/,status_code:200",
+            "test_requests_in_progress:-1|g|#app_name:test,method:GET,path:/",
+            "test_requests_exceptions_total:1|c|#app_name:test,method:GET,path:/,exception_type:ValueError",
+        ],
+    )
+    container._client.close()
+
+
+def test_statsd_influxdb_tags(agent: socket.socket) -> None:
+    # Arrange
+    container = build_container(agent, dogstatsd=False)
+    manager = MetricsManager(app_name="test", container=container)
+
+    # Act
+    manager.inc_requests_count(method="GET", path="/a,b|c")
+    manager.observe_request_duration(method="GET", path="/", duration=0.0125, exemplar=None)
+    container.flush()
+
+    # Assert
+    assert_that(receive_lines(agent)).is_equal_to(
+        [
+            "test_requests_total,app_name=test,method=GET,path=/a_b_c:1|c",
+            "test_request_duration,app_name=test,method=GET,path=/:12.5|ms",
+        ],
+    )
+    container._client.close()
+
+
+def test_statsd_batches_lines_into_datagrams(agent: socket.socket) -> None:
+    # Arrange
+    container = build_container(agent, max_packet_size=200)
+    manager = MetricsManager(app_name="test", container=container)
+    line = "test_requests_total:1|c|#app_name:test,method:GET,path:/"
+
+    # Act
+    for _ in range(10):
+        manager.inc_requests_count(method="GET", path="/")
+    container.flush()
+    datagrams = [agent.recv(65535) for _ in range(4)]
+
+    # Assert
+    assert_that([len(datagram) for datagram in datagrams]).is_equal_to([len(line) * 3 + 2] * 3 + [len(line)])
+    assert_that(b"\n".join(datagrams).decode().split("\n")).is_equal_to([line] * 10)
+    container._client.close()
+
+
+def test_statsd_flushes_on_interval(agent: socket.socket) -> None:
+    # Arrange
+    config = StatsdConfig(host="127.0.0.1", port=agent.getsockname()[1], flush_interval=0.01)
+    manager = MetricsManager(app_name="test", container=StatsdMetricsContainer("test", CollectorRegistry(), config))
+
+    # Act
+    manager.inc_requests_count(method="GET", path="/")
+
+    # Assert
+    assert_that(receive_lines(agent)).is_equal_to(["test_requests_total:1|c|#app_name:test,method:GET,path:/"])
+    manager._container._client.close()  # type: ignore[attr-defined]
+
+
+def test_statsd_drops_lines_without_agent() -> None:
+    # Arrange
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    config = StatsdConfig(host="127.0.0.1", port=port, max_packet_size=60, flush_interval=60)
+    manager = MetricsManager(app_name="test", container=StatsdMetricsContainer("test", CollectorRegistry(), config))
+
+    # Act
+    for _ in range(10):
+        manager.inc_requests_count(method="GET", path="/")
+
+    # Assert
+    assert_that(manager._container._client.dropped).is_greater_than(0)  # type: ignore[attr-defined]
+    manager._container._client.close()  # type: ignore[attr-defined]
+
+
+def test_statsd_reconnects_to_unix_socket(tmp_path: Path) -> None:
+    # Arrange
+    path = str(tmp_path / "dsd.socket")
+    config = StatsdConfig(unix_socket=path, flush_interval=60)
+    container = StatsdMetricsContainer("test", CollectorRegistry(), config)
+    manager = MetricsManager(app_name="test", container=container)
+
+    # Act
+    manager.inc_requests_count(method="GET", path="/")
+    container.flush()  # the agent is not started yet
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as agent:
+        agent.bind(path)
+        agent.settimeout(5)
+        manager.inc_requests_count(method="POST", path="/")
+        container.flush()
+        lines = receive_lines(agent)
+    container.close()
+
+    # Assert
+    assert_that(lines).is_equal_to(["test_requests_total:1|c|#app_name:test,method:POST,path:/"])
+    assert_that(container._client.dropped).is_equal_to(1)
+
+
+def test_statsd_close(agent: socket.socket) -> None:
+    # Arrange
+    container = build_container(agent)
+    manager = MetricsManager(app_name="test", container=container)
+
+    # Act
+    manager.inc_requests_count(method="GET", path="/")
+    manager.close()
+
+    # Assert
+    assert_that(receive_lines(agent)).is_equal_to(["test_requests_total:1|c|#app_name:test,method:GET,path:/"])
+    assert_that(container._client._socket).is_none()
+
+
+def test_build_metrics_manager_with_statsd(agent: socket.socket) -> None:
+    # Arrange
+    registry = CollectorRegistry()
+    config = BaseMetricsConfig(
+        app_name="test",
+        metrics_prefix="test",
+        registry=registry,
+        statsd=StatsdConfig(host="127.0.0.1", port=agent.getsockname()[1], flush_interval=60),
+    )
+
+    # Act
+    manager = build_metrics_manager(config)
+    manager.inc_requests_count(method="GET", path="/")
+
+    # Assert
+    assert_that(manager._container).is_instance_of(StatsdMetricsContainer)
+    assert_that(generate_latest(registry).decode()).does_not_contain("test_requests_total")
+    manager._container._client.close()  # type: ignore[attr-defined]
@@ -1,12 +1,20 @@
 import contextlib
+import http.client
 import json
+import socket
+import struct
+import threading
+from collections import defaultdict
 from collections.abc import Iterator, MutableMapping
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from json import JSONDecodeError
+from pathlib import Path
 from typing import Any
 
 import pytest
 import structlog
 from _pytest.capture import CaptureFixture
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
 from structlog.testing import LogCapture
 
 
@@ -57,3 +65,192 @@ def read_console_logs(capfd: CaptureFixture[str]) -> list[str]:
 
     records: list[str] = out.strip().split("\n")
     return records
+
+
+def write_multiprocess_value(
+    path: Path,
+    name: str,
+    labels: dict[str, str],
+    value: float,
+    *,
+    metric_name: str | None = None,
+) -> None:
+    """
+    Writes a value in the prometheus_client multiprocess file format.
+    """
+
+    mmaped_dict = MmapedDict(str(path))
+    key = mmap_key(metric_name or name, name, list(labels.keys()), list(labels.values()), "Test metric")
+    mmaped_dict.write_value(key, value, 0)
+    mmaped_dict.close()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str) -> None:
+        super().__init__("localhost")
+        self.unix_socket = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_socket)
+
+
+def fetch_metrics(address: Any, headers: dict[str, str] | None = None) -> tuple[int, bytes]:
+    """
+    Requests /metrics from a metrics server bound to a unix socket path or a (host, port) tuple.
+    """
+
+    if isinstance(address, str):
+        connection: http.client.HTTPConnection = UnixHTTPConnection(address)
+    else:
+        connection = http.client.HTTPConnection(address[0], address[1])
+
+    try:
+        connection.request("GET", "/metrics", headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def _read_varint(payload: bytes, position: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = payload[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            return value, position
+
+
+def decode_protobuf(payload: bytes) -> dict[int, list[Any]]:
+    """Decodes the fields of a protobuf message without a schema, the nested messages are left as bytes."""
+    fields: dict[int, list[Any]] = defaultdict(list)
+    position = 0
+
+    while position < len(payload):
+        key, position = _read_varint(payload, position)
+        field, wire_type = key >> 3, key & 0x07
+
+        if wire_type == 0:
+            value, position = _read_varint(payload, position)
+        elif wire_type == 1:
+            value = struct.unpack_from("<d", payload, position)[0]
+            position += 8
+        else:
+            length, position = _read_varint(payload, position)
+            value = payload[position : position + length]
+            position += length
+
+        fields[field].append(value)
+
+    return dict(fields)
+
+
+def split_delimited(payload: bytes) -> list[bytes]:
+    """Splits the length-delimited protobuf messages."""
+    messages = []
+    position = 0
+
+    while position < len(payload):
+        length, position = _read_varint(payload, position)
+        messages.append(payload[position : position + length])
+        position += length
+
+    return messages
+
+
+def snappy_decompress(payload: bytes) -> bytes:
+    """Decompresses the snappy block format."""
+    size, position = _read_varint(payload, 0)
+    out = bytearray()
+
+    while position < len(payload):
+        tag = payload[position]
+        position += 1
+        kind = tag & 0x03
+
+        if kind == 0:
+            length = tag >> 2
+            if length >= 60:
+                extra = length - 59
+                length = int.from_bytes(payload[position : position + extra], "little")
+                position += extra
+            length += 1
+            out += payload[position : position + length]
+            position += length
+            continue
+
+        if kind == 1:
+            length = ((tag >> 2) & 0x07) + 4
+            offset = (tag >> 5) << 8 | payload[position]
+            position += 1
+        else:
+            length = (tag >> 2) + 1
+            width = 2 if kind == 2 else 4
+            offset = int.from_bytes(payload[position : position + width], "little")
+            position += width
+
+        for _ in range(length):
+            out.append(out[-offset])
+
+    assert len(out) == size
+    return bytes(out)
+
+
+class RemoteWriteReceiver:
+    """
+    A local stand-in of a remote-write endpoint, which records the decoded requests.
+    The statuses are returned to the requests in order, then the requests are accepted with 204.
+    """
+
+    def __init__(self, statuses: list[int] | None = None) -> None:
+        self.statuses = list(statuses or [])
+        self.requests: list[tuple[dict[str, str], bytes]] = []
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                status = receiver.statuses.pop(0) if receiver.statuses else 204
+                receiver.requests.append((dict(self.headers), snappy_decompress(body)))
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}/api/v1/write"
+
+    def __enter__(self) -> "RemoteWriteReceiver":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def series(self) -> list[dict[str, Any]]:
+        """Returns the labels and the values of all received series."""
+        series = []
+        for _, payload in self.requests:
+            for timeseries in decode_protobuf(payload).get(1, []):
+                fields = decode_protobuf(timeseries)
+                labels = [decode_protobuf(label) for label in fields[1]]
+                sample = decode_protobuf(fields[2][0])
+                series.append(
+                    {
+                        "labels": [(label[1][0].decode(), label[2][0].decode()) for label in labels],
+                        "value": sample[1][0],
+                        "timestamp": sample[2][0],
+                    },
+                )
+        return series